@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory of harvest candidates and validation results as plain
+dicts/dataclasses vs the slotted, interned records (records.py).
+
+Builds synthetic candidates the way a harvest sees them: each paper's
+citation (peptide name, title, authors, year, URL, query) is decoded once
+from its own search response and shared by every sentence scored from that
+paper, so the dict baseline already shares those strings within a paper;
+only the sentences, scores and sections are per candidate. Measures the
+traced allocations (tracemalloc) of holding them as proposal dicts and as
+Candidate records, checks that `to_dict()` gives back the same dicts, and
+does the same for validation results (an unslotted copy of ValidationResult
+vs the slotted one).
+
+Run:
+  python3 scripts/bench_records.py --candidates 50000
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from .records import Candidate  # type: ignore
+    from .scholar_integration import PEPTIDE_SYNONYMS  # type: ignore
+    from .validate_quotes import ValidationResult  # type: ignore
+except Exception:
+    from records import Candidate  # type: ignore
+    from scholar_integration import PEPTIDE_SYNONYMS  # type: ignore
+    from validate_quotes import ValidationResult  # type: ignore
+
+WORDS = (
+    "treatment improved outcomes in adults with reduced body weight and better glycemic control over the "
+    "trial period compared with placebo while patients reported fewer symptoms and higher quality of life"
+).split()
+
+PlainResult = make_dataclass("PlainResult", [(f.name, f.type) for f in fields(ValidationResult)])
+
+
+def synthetic_harvest(n: int, seed: int = 1) -> Tuple[List[str], List[Tuple[int, Dict[str, Any]]]]:
+    """(one JSON citation per paper, (paper index, sentence fields) per candidate); ~20 candidates per paper."""
+    rng = random.Random(seed)
+    peptides = list(PEPTIDE_SYNONYMS)
+    papers = [
+        json.dumps({
+            "peptide_name": rng.choice(peptides),
+            "paper_title": " ".join(rng.choice(WORDS) for _ in range(12)).capitalize(),
+            "authors": ", ".join(f"A{rng.randint(1, 999)} Author" for _ in range(5)),
+            "year": str(rng.randint(1995, 2024)),
+            "url": f"https://www.ncbi.nlm.nih.gov/pmc/articles/PMC{rng.randint(10 ** 6, 10 ** 7)}/",
+            "query": f"{rng.choice(peptides)} randomized trial",
+        })
+        for _ in range(max(1, n // 20))
+    ]
+    sentences = [
+        (i % len(papers), {
+            "replacement_quote": " ".join(rng.choice(WORDS) for _ in range(rng.randint(15, 45))) + ".",
+            "positivity_score": round(rng.uniform(1.0, 6.0), 2),
+            "section": rng.choice(("abstract", "conclusion", "results")),
+        })
+        for i in range(n)
+    ]
+    return papers, sentences
+
+
+def build_candidates(
+    papers: List[str], sentences: List[Tuple[int, Dict[str, Any]]], make: Callable[..., Any]
+) -> List[Any]:
+    """make(**citation, **sentence) per candidate, decoding each paper's citation once."""
+    citations = [json.loads(p) for p in papers]
+    out = [make(**citations[i], **json.loads(json.dumps(sentence))) for i, sentence in sentences]
+    del citations
+    return out
+
+
+def synthetic_results(candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    out = []
+    for i, doc in enumerate(candidates):
+        out.append({
+            "id": i, "source": doc["url"], "source_type": "academic",
+            "exact_match": i % 3 == 0, "fuzzy_score": 0.9, "matched_excerpt": doc["replacement_quote"][:200],
+            "content_type": "text/html; charset=UTF-8", "status": "verified", "notes": None,
+            "file": "src/data/peptide-quotes.final.json",
+        })
+    return out
+
+
+def traced(build: Callable[[], List[Any]]) -> Tuple[List[Any], int]:
+    """(objects, bytes still allocated while holding them)."""
+    gc.collect()
+    tracemalloc.start()
+    objs = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return objs, size
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark record memory")
+    ap.add_argument("--candidates", type=int, default=50000, help="Synthetic candidates (and validation results)")
+    args = ap.parse_args(argv)
+
+    papers, sentences = synthetic_harvest(args.candidates)
+    dicts, d_size = traced(lambda: build_candidates(papers, sentences, dict))
+    cands, c_size = traced(lambda: build_candidates(papers, sentences, Candidate))
+    if [c.to_dict() for c in cands] != dicts:
+        print("MISMATCH: Candidate.to_dict() differs from the proposal dict")
+        return 1
+    del cands
+
+    rows = synthetic_results(dicts)
+    del dicts
+    plain, p_size = traced(lambda: [PlainResult(**json.loads(json.dumps(r))) for r in rows])
+    slotted, s_size = traced(lambda: [ValidationResult(**json.loads(json.dumps(r))) for r in rows])
+    if [r.to_dict() for r in slotted] != rows:
+        print("MISMATCH: ValidationResult.to_dict() differs from the input row")
+        return 1
+    del plain, slotted
+
+    mb = 1024 * 1024
+    print(f"{args.candidates} harvest candidates, {args.candidates} validation results; to_dict() round-trips identical")
+    print(f"candidates  dict:      {d_size / mb:8.1f} MB")
+    print(f"candidates  Candidate: {c_size / mb:8.1f} MB  ({d_size / c_size:.1f}x less)")
+    print(f"results     plain:     {p_size / mb:8.1f} MB")
+    print(f"results     slotted:   {s_size / mb:8.1f} MB  ({p_size / s_size:.1f}x less)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
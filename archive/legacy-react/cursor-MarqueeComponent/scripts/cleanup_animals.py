@@ -1,6 +1,15 @@
 #!/usr/bin/env python3
+"""
+Drop animal-context quotes from the final and staging quote files.
+
+With --store PATH, matching rows are deleted from the SQLite quote store
+(quote_store.py) instead of rewriting the JSON files.
+
+Removed quotes are subtracted from the coverage index (quote_coverage.py)
+and peptide-quotes.progress.json is refreshed.
+"""
 from __future__ import annotations
-import json, re
+import argparse, json, re
 from pathlib import Path
 
 DATA = Path('src/data')
@@ -14,28 +23,71 @@ ANIMAL_TERMS = [
     ' sprague-dawley', ' c57bl/6', ' in rats', ' in mice', ' in yaks',
 ]
 
-def cleanse_file(path: Path) -> int:
+def is_animal(q):
+    s = (q.get('quote') or '').lower()
+    return any(term in s for term in ANIMAL_TERMS)
+
+def cleanse_doc(j, coverage=None, collection=None) -> int:
+    """Drop animal-context quotes from a loaded quotes document in place.
+
+    With a coverage index, the removed quotes are subtracted from `collection`.
+    """
+    quotes = j.get('quotes', [])
+    j['quotes'] = [q for q in quotes if not is_animal(q)]
+    if coverage is not None and len(j['quotes']) != len(quotes):
+        coverage.remove(collection, [q for q in quotes if is_animal(q)])
+    return len(quotes) - len(j['quotes'])
+
+def cleanse_file(path: Path, coverage=None, collection=None) -> int:
     if not path.exists():
         return 0
     j = json.loads(path.read_text(encoding='utf-8'))
     if 'quotes' not in j:
         return 0
-    before = len(j['quotes'])
-    def is_animal(q):
-        s = (q.get('quote') or '').lower()
-        return any(term in s for term in ANIMAL_TERMS)
-    j['quotes'] = [q for q in j['quotes'] if not is_animal(q)]
-    after = len(j['quotes'])
-    if after != before:
+    removed = cleanse_doc(j, coverage, collection)
+    if removed:
         path.write_text(json.dumps(j, indent=2), encoding='utf-8')
-    print(f"Cleaned {path}: removed {before-after} animal-context quotes")
-    return before - after
+        if coverage is not None:
+            coverage.mark_written(collection, path)
+    print(f"Cleaned {path}: removed {removed} animal-context quotes")
+    return removed
+
+def cleanse_store(store, collection: str) -> int:
+    # LIKE narrows the scan in SQLite; is_animal() keeps the exact matching rule
+    where = ' OR '.join('lower(quote) LIKE ?' for _ in ANIMAL_TERMS)
+    params = tuple(f'%{t}%' for t in ANIMAL_TERMS)
+    removed = 0
+    with store.transaction():
+        for rowid, q in store.quotes(collection, where, params):
+            if is_animal(q):
+                store.delete(rowid)
+                removed += 1
+    print(f"Cleaned {store.path} [{collection}]: removed {removed} animal-context quotes")
+    return removed
 
-def main() -> int:
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--store', default=None, help='Operate on this SQLite quote store instead of the JSON files')
+    args = ap.parse_args(argv)
+    if args.store:
+        try:
+            from .quote_store import QuoteStore  # type: ignore
+        except Exception:
+            from quote_store import QuoteStore  # type: ignore
+        with QuoteStore(Path(args.store)) as store:
+            removed = cleanse_store(store, 'final') + cleanse_store(store, 'staging')
+        print('Total removed:', removed)
+        return 0
+    try:
+        from .quote_coverage import CoverageIndex, update_progress  # type: ignore
+    except Exception:
+        from quote_coverage import CoverageIndex, update_progress  # type: ignore
+    coverage = CoverageIndex.load()
     removed = 0
-    removed += cleanse_file(FINAL)
-    removed += cleanse_file(STAGING)
+    removed += cleanse_file(FINAL, coverage, 'final')
+    removed += cleanse_file(STAGING, coverage, 'staging')
     print('Total removed:', removed)
+    update_progress(coverage)
     return 0
 
 if __name__ == '__main__':
@@ -0,0 +1,175 @@
+"""
+DOI -> final publisher URL resolution with a persistent cache.
+
+Sources classified as `doi_landing` (https://doi.org/10.xxx/...) only name
+their publisher at the end of the doi.org redirect chain. DoiResolver
+follows the redirects once (HEAD, falling back to GET when the publisher refuses HEAD; the body is
+never read) and keeps {doi: {url, domain, at}} in .cache/doi-resolved.json,
+so later fetches go straight to the final URL and callers can classify it
+(classify_source) before downloading:
+
+  - validate_quotes.py resolves all DOI sources of a file concurrently
+    (`resolve_many`) before fetching; fetch_source() then uses the final URL
+  - the Scholar harvest classifies/prunes the final URL of DOI results
+    before they are fetched
+
+A publisher that answers the resolved URL with an error (403 to bots is
+common) still tells us where the DOI points, so that final URL is cached
+too. Lookups that fail before reaching a publisher are not written to the
+cache file, but are remembered for the life of the resolver so a run asks
+doi.org about each DOI at most once.
+
+Resolution requests go through the active HTTP cassette (method "RESOLVE",
+the final URL as the recorded body), so replayed runs resolve offline.
+Scripts enable the resolver with `use_resolver(DoiResolver(path))`; without
+one, `resolve_url` returns URLs unchanged.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+
+try:
+    from . import metrics  # type: ignore
+    from .http_cassette import FetchResult, cassette_fetch  # type: ignore
+    from .validate_quotes import FETCH_TIMEOUT, USER_AGENT  # type: ignore
+except Exception:  # when run as a script without package context
+    import metrics  # type: ignore
+    from http_cassette import FetchResult, cassette_fetch  # type: ignore
+    from validate_quotes import FETCH_TIMEOUT, USER_AGENT  # type: ignore
+
+try:
+    import urllib.request as urllib_request
+    import urllib.error as urllib_error
+except Exception:  # pragma: no cover
+    urllib_request = None  # type: ignore
+    urllib_error = None  # type: ignore
+
+DOI_CACHE_PATH = Path('.cache/doi-resolved.json')
+RESOLVE_TTL_DAYS = 180.0
+RESOLVE_CONCURRENCY = 8
+
+_DOI_URL_RE = re.compile(r"^https?://(?:dx\.)?doi\.org/(10\.\d{4,9}/\S+)$", re.I)
+
+_ACTIVE: Optional["DoiResolver"] = None
+
+
+def doi_from_url(url: str) -> Optional[str]:
+    """The DOI of a doi.org URL (lowercased, unquoted), else None."""
+    m = _DOI_URL_RE.match((url or "").strip())
+    if not m:
+        return None
+    return urllib.parse.unquote(m.group(1)).rstrip("/").lower()
+
+
+def _resolve_live(doi_url: str) -> FetchResult:
+    """Follow the redirect chain of `doi_url`; the final URL is returned as the body."""
+    if urllib_request is None:
+        return None, None, "urllib not available"
+    last_error = "resolve_error"
+    for method in ("HEAD", "GET"):
+        req = urllib_request.Request(doi_url, headers={"User-Agent": USER_AGENT}, method=method)
+        try:
+            with urllib_request.urlopen(req, timeout=FETCH_TIMEOUT) as resp:
+                return resp.geturl().encode("utf-8"), None, "ok"
+        except urllib_error.HTTPError as e:  # type: ignore[union-attr]
+            final = e.geturl() or ""
+            if final and metrics.host_of(final) not in ("doi.org", "dx.doi.org"):
+                # the publisher answered (often 403/405 to HEAD); we still know where the DOI points
+                return final.encode("utf-8"), None, f"ok (HTTP {e.code} at publisher)"
+            last_error = f"resolve_error: HTTP Error {e.code}"
+        except Exception as e:  # pragma: no cover - network issues
+            last_error = f"resolve_error: {e}"
+    return None, None, last_error
+
+
+class DoiResolver:
+    def __init__(self, path: Optional[Path] = DOI_CACHE_PATH, ttl_days: float = RESOLVE_TTL_DAYS) -> None:
+        self.path = Path(path) if path is not None else None
+        self.ttl = ttl_days * 86400.0
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # DOIs that failed to resolve during this run (not persisted)
+        self.failed: Set[str] = set()
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding='utf-8')).get('dois', {})
+            except Exception:
+                pass
+
+    def lookup(self, doi: str) -> Optional[str]:
+        with self._lock:
+            e = self.entries.get(doi)
+        if not e or time.time() - float(e.get('at', 0)) > self.ttl:
+            return None
+        return e.get('url')
+
+    def resolve(self, url: str) -> str:
+        """Final URL for a doi.org `url` (cached), or `url` itself when it is not a DOI or cannot be resolved."""
+        doi = doi_from_url(url)
+        if doi is None:
+            return url
+        hit = self.lookup(doi)
+        with self._lock:
+            failed = doi in self.failed
+        metrics.inc("quotes_cache_requests_total", cache="doi", result="hit" if hit or failed else "miss")
+        if hit:
+            return hit
+        if failed:
+            return url
+        body, _, status = cassette_fetch(f"https://doi.org/{doi}", _resolve_live, method="RESOLVE")
+        if not body:
+            with self._lock:
+                self.failed.add(doi)
+            return url
+        final = body.decode("utf-8", errors="ignore").strip()
+        with self._lock:
+            self.entries[doi] = {'url': final, 'domain': metrics.host_of(final), 'at': time.time(), 'status': status}
+        return final
+
+    def resolve_many(self, urls: Iterable[str], concurrency: int = RESOLVE_CONCURRENCY) -> Dict[str, str]:
+        """{url: final URL} for every DOI URL in `urls`, resolving uncached ones concurrently."""
+        dois = {u: d for u in set(urls) if (d := doi_from_url(u)) is not None}
+        with self._lock:
+            failed = set(self.failed)
+        todo = [u for u, d in dois.items() if d not in failed and self.lookup(d) is None]
+        if len(todo) > 1 and concurrency > 1:
+            with ThreadPoolExecutor(max_workers=min(concurrency, len(todo))) as pool:
+                list(pool.map(self.resolve, todo))
+        else:
+            for u in todo:
+                self.resolve(u)
+        return {u: self.lookup(d) or u for u, d in dois.items()}
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            doc = {'dois': dict(self.entries)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + '.tmp')
+        tmp.write_text(json.dumps(doc, indent=1, sort_keys=True), encoding='utf-8')
+        os.replace(tmp, self.path)
+
+
+def use_resolver(resolver: Optional[DoiResolver]) -> None:
+    global _ACTIVE
+    _ACTIVE = resolver
+
+
+def active_resolver() -> Optional[DoiResolver]:
+    return _ACTIVE
+
+
+def resolve_url(url: str) -> str:
+    """Final URL for a DOI source via the active resolver; other URLs (or no resolver) unchanged."""
+    if _ACTIVE is None or not url:
+        return url
+    return _ACTIVE.resolve(url)
@@ -0,0 +1,150 @@
+"""
+Batched Europe PMC metadata lookups for PMC and PubMed sources.
+
+Instead of scraping one article page per quote, PMCIDs/PMIDs are pulled out
+of `pmc.ncbi.nlm.nih.gov` / `pubmed.ncbi.nlm.nih.gov` URLs and resolved in
+bulk through the Europe PMC REST search, OR-ing up to `batch_size` terms
+(`PMCID:PMC123`, `(EXT_ID:456 AND SRC:MED)`) into a single request.
+
+Each resolved article carries authors, title, year, abstract and DOI. Used by:
+  - validate_quotes.py: quotes found in the abstract are validated without
+    downloading the article page.
+  - update_authors.py: first authors for placeholder scientists.
+
+The endpoint can be pointed at a local stub with the EPMC_SEARCH_URL
+environment variable or the `base_url` argument. Requests go through
+validate_quotes.fetch_url, so they are also recorded/replayed by cassettes.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import urllib.parse
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .validate_quotes import fetch_url  # type: ignore
+except Exception:  # when run as a script without package context
+    from validate_quotes import fetch_url  # type: ignore
+
+EPMC_SEARCH_URL = os.environ.get(
+    "EPMC_SEARCH_URL", "https://www.ebi.ac.uk/europepmc/webservices/rest/search"
+)
+BATCH_SIZE = 40
+
+_PMC_RE = re.compile(r"(?:pmc\.ncbi\.nlm\.nih\.gov|ncbi\.nlm\.nih\.gov/pmc)/articles/(PMC\d+)", re.I)
+_PUBMED_RE = re.compile(r"pubmed\.ncbi\.nlm\.nih\.gov/(\d+)", re.I)
+
+ArticleKey = Tuple[str, str]  # ("pmcid", "PMC123") or ("pmid", "456")
+
+
+@dataclass
+class ArticleMetadata:
+    pmcid: Optional[str]
+    pmid: Optional[str]
+    title: Optional[str]
+    year: Optional[str]
+    authors: List[str] = field(default_factory=list)
+    abstract: str = ""
+    doi: Optional[str] = None
+
+    @property
+    def first_author(self) -> Optional[str]:
+        return self.authors[0] if self.authors else None
+
+
+def article_key(url: str) -> Optional[ArticleKey]:
+    """Extract a PMCID or PMID from a PMC/PubMed article URL."""
+    if not url:
+        return None
+    m = _PMC_RE.search(url)
+    if m:
+        return ("pmcid", m.group(1).upper())
+    m = _PUBMED_RE.search(url)
+    if m:
+        return ("pmid", m.group(1))
+    return None
+
+
+def _query_term(key: ArticleKey) -> str:
+    kind, ident = key
+    if kind == "pmcid":
+        return f"PMCID:{ident}"
+    return f"(EXT_ID:{ident} AND SRC:MED)"
+
+
+def _strip_tags(s: str) -> str:
+    s = re.sub(r"<[^>]+>", " ", s or "")
+    return re.sub(r"\s+", " ", s).strip()
+
+
+def _parse_result(r: Dict[str, Any]) -> ArticleMetadata:
+    authors = [
+        (a.get("fullName") or "").strip()
+        for a in (r.get("authorList") or {}).get("author", [])
+        if (a.get("fullName") or "").strip()
+    ]
+    if not authors and r.get("authorString"):
+        authors = [a.strip().rstrip(".") for a in r["authorString"].split(",") if a.strip()]
+    return ArticleMetadata(
+        pmcid=r.get("pmcid"),
+        pmid=r.get("pmid"),
+        title=r.get("title"),
+        year=r.get("pubYear"),
+        authors=authors,
+        abstract=_strip_tags(r.get("abstractText") or ""),
+        doi=r.get("doi"),
+    )
+
+
+def fetch_batch(keys: List[ArticleKey], base_url: Optional[str] = None) -> Dict[ArticleKey, ArticleMetadata]:
+    """Resolve one batch of article keys with a single OR'd search request."""
+    if not keys:
+        return {}
+    query = " OR ".join(_query_term(k) for k in keys)
+    url = (
+        f"{base_url or EPMC_SEARCH_URL}?query={urllib.parse.quote(query)}"
+        f"&resultType=core&pageSize={len(keys)}&format=json"
+    )
+    body, _, _ = fetch_url(url)
+    if not body:
+        return {}
+    try:
+        results = json.loads(body.decode("utf-8", errors="ignore")).get("resultList", {}).get("result", [])
+    except Exception:
+        return {}
+    wanted = set(keys)
+    out: Dict[ArticleKey, ArticleMetadata] = {}
+    for r in results:
+        meta = _parse_result(r)
+        for key in (("pmcid", (meta.pmcid or "").upper()), ("pmid", meta.pmid or "")):
+            if key in wanted:
+                out[key] = meta
+    return out
+
+
+def resolve_metadata(
+    urls: Iterable[str],
+    batch_size: int = BATCH_SIZE,
+    base_url: Optional[str] = None,
+) -> Dict[str, ArticleMetadata]:
+    """Map every resolvable PMC/PubMed URL to its Europe PMC metadata.
+
+    URLs that are not PMC/PubMed articles, or that Europe PMC does not know,
+    are simply absent from the result.
+    """
+    by_key: Dict[ArticleKey, List[str]] = {}
+    for url in urls:
+        key = article_key(url)
+        if key is not None:
+            by_key.setdefault(key, []).append(url)
+    keys = list(by_key)
+    resolved: Dict[str, ArticleMetadata] = {}
+    for i in range(0, len(keys), max(1, batch_size)):
+        batch = keys[i : i + max(1, batch_size)]
+        for key, meta in fetch_batch(batch, base_url).items():
+            for url in by_key[key]:
+                resolved[url] = meta
+    return resolved
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Export the final quotes for the frontend as compact, content-hashed shards.
+
+peptide-quotes.final.json is one indent=2 file that promote_quotes.py
+rewrites on every run, so the site build and the CDN see a "new" file even
+when no quote changed. This step writes, into public/data/quotes/:
+
+  <peptide-slug>.<hash>.json      one shard per peptide: minified, keys sorted,
+                                  quotes in final-file order
+  <peptide-slug>.<hash>.json.gz   pre-compressed variants (gzip with a zeroed
+  <peptide-slug>.<hash>.json.br   timestamp; brotli when the module is installed)
+  manifest.json (+ .gz/.br)       {peptide: {file, hash, count, bytes}} and the
+                                  final file's metadata
+
+`hash` is the first 12 hex digits of the SHA-256 of the shard bytes, so a
+shard's name changes exactly when its content does and can be served with an
+immutable cache policy; only manifest.json needs revalidation. A shard whose
+file already exists is not rewritten, the manifest is rewritten only when it
+changed, and shards no longer referenced are removed (--keep-stale keeps
+them for clients still holding the previous manifest).
+
+Run (after promote_quotes.py / maintain.py):
+  python3 scripts/export_quotes.py
+  python3 scripts/export_quotes.py --out dist/data/quotes --no-compress
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import brotli  # type: ignore
+except Exception:  # pragma: no cover - optional
+    brotli = None  # type: ignore
+
+DATA_DIR = Path('src/data')
+FINAL = DATA_DIR / 'peptide-quotes.final.json'
+OUT_DIR = Path('public/data/quotes')
+MANIFEST = 'manifest.json'
+HASH_LEN = 12
+UNASSIGNED = 'unassigned'
+
+_SHARD_RE = re.compile(r'^[a-z0-9-]+\.[0-9a-f]{%d}\.json(\.gz|\.br)?$' % HASH_LEN)
+
+
+def dumps_compact(obj: Any) -> bytes:
+    """Minified JSON with sorted keys: equal content always gives equal bytes."""
+    return json.dumps(obj, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LEN]
+
+
+def slugify(name: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', (name or '').lower()).strip('-') or UNASSIGNED
+
+
+def shard_quotes(quotes: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """{peptide_name: quotes}, in first-appearance order, quotes in file order."""
+    shards: Dict[str, List[Dict[str, Any]]] = {}
+    for q in quotes:
+        shards.setdefault(q.get('peptide_name') or '', []).append(q)
+    return shards
+
+
+def _variants(data: bytes, compress: bool) -> List[Tuple[str, bytes]]:
+    out = [('', data)]
+    if compress:
+        out.append(('.gz', gzip.compress(data, compresslevel=9, mtime=0)))
+        if brotli is not None:
+            out.append(('.br', brotli.compress(data, quality=11)))
+    return out
+
+
+def _write_if_changed(path: Path, data: bytes) -> bool:
+    if path.exists() and path.read_bytes() == data:
+        return False
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+
+def export(final: Dict[str, Any], out_dir: Path, compress: bool = True, keep_stale: bool = False) -> Dict[str, int]:
+    """Write the shards and manifest for a loaded final document; returns file counts."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    counts = {'written': 0, 'unchanged': 0, 'removed': 0, 'bytes': 0}
+    entries: Dict[str, Dict[str, Any]] = {}
+    slugs: Dict[str, str] = {}
+    keep = set()
+    for peptide, quotes in shard_quotes(final.get('quotes', [])).items():
+        slug = slugify(peptide)
+        if slug in slugs and slugs[slug] != peptide:
+            # two names with the same slug (e.g. "NAD" and "NAD+")
+            slug = f"{slug}-{content_hash(peptide.encode('utf-8'))[:6]}"
+        slugs[slug] = peptide
+        data = dumps_compact({'peptide': peptide or None, 'quotes': quotes})
+        digest = content_hash(data)
+        name = f'{slug}.{digest}.json'
+        for ext, blob in _variants(data, compress):
+            path = out_dir / (name + ext)
+            keep.add(path.name)
+            # content-addressed: an existing file of this name already holds these bytes
+            if path.exists():
+                counts['unchanged'] += 1
+            else:
+                _write_if_changed(path, blob)
+                counts['written'] += 1
+        counts['bytes'] += len(data)
+        entries[peptide or UNASSIGNED] = {'file': name, 'hash': digest, 'count': len(quotes), 'bytes': len(data)}
+
+    manifest = dumps_compact({'metadata': final.get('metadata', {}), 'peptides': entries})
+    for ext, blob in _variants(manifest, compress):
+        keep.add(MANIFEST + ext)
+        if _write_if_changed(out_dir / (MANIFEST + ext), blob):
+            counts['written'] += 1
+        else:
+            counts['unchanged'] += 1
+
+    if not keep_stale:
+        for path in out_dir.iterdir():
+            # includes manifest variants not produced this run (a stale .gz after --no-compress)
+            if (_SHARD_RE.match(path.name) or path.name.startswith(MANIFEST)) and path.name not in keep:
+                path.unlink()
+                counts['removed'] += 1
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description='Export final quotes as per-peptide, content-hashed JSON shards')
+    ap.add_argument('--src', default=str(FINAL), help='Final quotes JSON')
+    ap.add_argument('--out', default=str(OUT_DIR), help='Output directory (served as static assets)')
+    ap.add_argument('--no-compress', action='store_true', help='Do not write .gz/.br variants')
+    ap.add_argument('--keep-stale', action='store_true', help='Keep shards no longer referenced by the manifest')
+    args = ap.parse_args(argv)
+
+    src = Path(args.src)
+    final = json.loads(src.read_text(encoding='utf-8'))
+    counts = export(final, Path(args.out), compress=not args.no_compress, keep_stale=args.keep_stale)
+    if not args.no_compress and brotli is None:
+        print('brotli not installed: .br variants skipped (pip install brotli)')
+    print(
+        f"Exported {len(final.get('quotes', []))} quotes to {args.out}: {counts['written']} file(s) written, "
+        f"{counts['unchanged']} unchanged, {counts['removed']} stale removed; "
+        f"{counts['bytes']} bytes of shards vs {src.stat().st_size} in {src.name}"
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,132 @@
+"""
+Parallel SequenceMatcher window scan for best_fuzzy_contains.
+
+The fuzzy fallback in validate_quotes.best_fuzzy_contains slides a window
+over the normalized article text and scores each window with difflib; for
+quotes that are not found verbatim this is pure-Python CPU work on one core.
+`scan_windows` spreads the window starts over a process pool:
+
+  - the normalized haystack is written once into a
+    multiprocessing.shared_memory block (UTF-32-LE, fixed 4 bytes per
+    character, so workers slice by character index without decoding it all);
+    tasks only carry the block name and a range of window starts
+  - the first 4 bytes of the block are a stop flag: a worker that finds a
+    window scoring >= `threshold` sets it, and every worker checks it before
+    each window, so the scan ends as soon as one window is acceptable
+
+Without early stop (threshold=None) the result equals the serial scan. With a
+threshold the returned window is one that clears it, not necessarily the best
+one, which is all the validator needs to accept a quote.
+
+Enabled with validate_quotes.py --fuzzy-workers N (configure()). The pool is
+only used by the process that configured it, so worker processes of the
+fetch pipeline (--fetch-concurrency) keep scanning serially.
+"""
+from __future__ import annotations
+
+import atexit
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from difflib import SequenceMatcher
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+MIN_WINDOWS_PER_WORKER = 4  # below this, pool overhead outweighs the scan
+
+_workers = 0
+_threshold: Optional[float] = None
+_owner_pid: Optional[int] = None
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def configure(workers: int, threshold: Optional[float] = None) -> None:
+    """Enable the parallel scan with `workers` processes (<= 1 disables it)."""
+    global _workers, _threshold, _owner_pid
+    _workers = workers if workers > 1 else 0
+    _threshold = threshold
+    _owner_pid = os.getpid()
+
+
+def enabled() -> bool:
+    return _workers > 1 and _owner_pid == os.getpid()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=_workers)
+        atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+    return _pool
+
+
+def scan_windows(needle: str, haystack: str, step: int, window: int) -> Optional[Tuple[float, int]]:
+    """(best ratio, window start) over the sliding windows, or None to scan serially."""
+    starts = range(0, len(haystack), step)
+    if not enabled() or len(starts) < _workers * MIN_WINDOWS_PER_WORKER:
+        return None
+    shm = shared_memory.SharedMemory(create=True, size=4 + 4 * len(haystack))
+    try:
+        shm.buf[:4] = b"\0\0\0\0"
+        data = haystack.encode("utf-32-le")
+        shm.buf[4 : 4 + len(data)] = data
+        chunks = _chunks(len(starts), _workers * 4)
+        pool = _get_pool()
+        pending = {
+            pool.submit(_scan_chunk, shm.name, len(haystack), needle, starts[a], starts[b - 1] + 1, step, window, _threshold)
+            for a, b in chunks
+        }
+        results: List[Tuple[float, int]] = []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            results.extend(f.result() for f in done)
+            if shm.buf[0]:
+                for f in pending:
+                    f.cancel()
+                # running chunks see the flag and return promptly
+                results.extend(f.result() for f in pending if not f.cancelled())
+                break
+    finally:
+        shm.close()
+        shm.unlink()
+    # highest ratio, earliest start on ties (same as the serial scan)
+    return max((r for r in results if r[1] >= 0), key=lambda r: (r[0], -r[1]), default=(0.0, -1))
+
+
+def _chunks(n: int, parts: int) -> List[Tuple[int, int]]:
+    size = max(1, -(-n // max(1, parts)))
+    return [(a, min(n, a + size)) for a in range(0, n, size)]
+
+
+def _scan_chunk(
+    name: str,
+    length: int,
+    needle: str,
+    first: int,
+    stop: int,
+    step: int,
+    window: int,
+    threshold: Optional[float],
+) -> Tuple[float, int]:
+    shm = shared_memory.SharedMemory(name=name)
+    buf = shm.buf
+    try:
+        best, best_i = 0.0, -1
+        # same argument order as the serial scan: ratio() is not symmetric (autojunk on seq2)
+        matcher = SequenceMatcher(None, needle, "")
+        for i in range(first, stop, step):
+            if buf[0]:
+                break
+            end = min(i + window, length)
+            matcher.set_seq2(bytes(buf[4 + 4 * i : 4 + 4 * end]).decode("utf-32-le"))
+            ratio = matcher.ratio()
+            if ratio > best:
+                best, best_i = ratio, i
+            if threshold is not None and ratio >= threshold:
+                buf[0] = 1
+                break
+        return best, best_i
+    finally:
+        # release the view first, also when the scan raised, so close() cannot
+        # fail with BufferError and hide the original exception
+        del buf
+        shm.close()
@@ -3,7 +3,8 @@
 Harvest positive academic quotes per peptide using Google Scholar.
 
 Reads peptide list from src/data/peptide-compounds.json, focuses on peptides
-with zero quotes in the current dataset (P0), and attempts to collect at least
+with fewer than three quotes in the final set (least covered first, from the
+coverage index in scripts/quote_coverage.py), and attempts to collect at least
 three peer-reviewed candidate quotes per peptide. Results are written to:
 
 - src/data/harvested-proposals.json: aggregated proposed quotes per peptide
@@ -13,20 +14,83 @@ Run:
   python3 scripts/harvest_quotes.py --min 3 --limit 15 --max-peptides 5
 
 Requires: scholarly, beautifulsoup4
+
+Network traffic (Scholar, Europe PMC, article pages) can be recorded with
+--record DIR and replayed offline with --replay DIR or --replay-or-fetch DIR.
+
+Article URLs rejected on earlier runs (non-academic, no usable sentences) are
+remembered in .cache/seen-urls.json and not downloaded again; pass
+--no-seen-cache to ignore that file for one run.
+
+Scholar query templates are ordered (and never-productive ones pruned) by the
+yield statistics in .cache/query-stats.json; --deterministic keeps the
+built-in template order for reproducible runs.
+
+PMC articles are read from the Europe PMC JATS XML (scripts/jats.py) when it
+is available, and from the article HTML page otherwise. --hedge-after SECONDS
+(off by default) requests the next mirror (PMC page, DOI) when one is slow;
+a DOI body is only used when it carries the article text (scripts/mirrors.py).
+
+--metrics-out PATH writes run metrics (fetch latency, cache hit rates,
+proposals accepted per article) to PATH.prom and PATH.json (scripts/metrics.py).
 """
 from __future__ import annotations
 
 import argparse
+import functools
 import json
+from contextlib import closing
 from pathlib import Path
-from collections import defaultdict
 from typing import Any, Dict, List, Optional
 
+try:
+    from .http_cassette import add_cassette_args, configure_from_args  # type: ignore
+except Exception:
+    from http_cassette import add_cassette_args, configure_from_args  # type: ignore
+
+try:
+    from .pipeline import imap  # type: ignore
+except Exception:
+    from pipeline import imap  # type: ignore
+
+try:
+    from . import metrics, mirrors  # type: ignore
+except Exception:
+    import metrics  # type: ignore
+    import mirrors  # type: ignore
+
+try:
+    from .seen_urls import SEEN_PATH, SeenUrls  # type: ignore
+except Exception:
+    from seen_urls import SEEN_PATH, SeenUrls  # type: ignore
+
+try:
+    from .query_stats import STATS_PATH, QueryStats, load_peptide_classes  # type: ignore
+except Exception:
+    from query_stats import STATS_PATH, QueryStats, load_peptide_classes  # type: ignore
+
+try:
+    from .doi_resolver import DOI_CACHE_PATH, DoiResolver, use_resolver  # type: ignore
+except Exception:
+    from doi_resolver import DOI_CACHE_PATH, DoiResolver, use_resolver  # type: ignore
+
+try:
+    from .quote_coverage import CoverageIndex, update_progress, peptide_names as coverage_peptide_names  # type: ignore
+except Exception:
+    from quote_coverage import CoverageIndex, update_progress, peptide_names as coverage_peptide_names  # type: ignore
+
+try:
+    from .records import Candidate  # type: ignore
+except Exception:
+    from records import Candidate  # type: ignore
+
 HERE = Path(__file__).resolve().parent
 ROOT = HERE.parent
 DATA_DIR = ROOT / "src" / "data"
 STAGING_PATH = DATA_DIR / "peptide-quotes.staging.json"
 FINAL_PATH = DATA_DIR / "peptide-quotes.final.json"
+PROGRESS_PATH = DATA_DIR / "peptide-quotes.progress.json"
+COMPOUNDS_PATH = DATA_DIR / "peptide-compounds.json"
 ALLOWED = set()
 try:
     comp = json.loads((DATA_DIR / 'peptide-compounds.json').read_text(encoding='utf-8'))
@@ -45,31 +109,26 @@ def main() -> int:
     ap.add_argument("--limit", type=int, default=15, help="Max papers to scan per peptide")
     ap.add_argument("--max-peptides", type=int, default=5, help="Max number of peptides to process (focus on those with <3 verified)")
     ap.add_argument("--peptides", type=str, default="", help="Optional comma-separated peptide names to target explicitly")
+    ap.add_argument("--lookahead", type=int, default=4, help="Scholar results to read and download ahead while scoring (0 = serial)")
+    ap.add_argument("--fetch-concurrency", type=int, default=1, help="Concurrent article fetches for the Europe PMC fallback; above 1, parsing runs in a process pool")
+    ap.add_argument("--workers", type=int, default=None, help="Worker processes for sentence extraction (default: CPU count)")
+    ap.add_argument("--seen-urls", type=str, default=str(SEEN_PATH), help="Seen-URL store / negative cache of rejected sources")
+    ap.add_argument("--no-seen-cache", action="store_true", help="Do not read or write the seen-URL store (within-run dedup still applies)")
+    ap.add_argument("--query-stats", type=str, default=str(STATS_PATH), help="Per-template/domain yield statistics file")
+    ap.add_argument("--deterministic", action="store_true", help="Ignore yield statistics: built-in query order, no pruning")
+    ap.add_argument("--metrics-out", type=str, default=None, help="Write run metrics to PATH.prom (Prometheus text file) and PATH.json")
+    ap.add_argument("--doi-cache", type=str, default=str(DOI_CACHE_PATH), help="DOI -> final URL cache; DOI results are classified by their publisher URL before download")
+    ap.add_argument("--hedge-after", type=float, default=0.0, help="Seconds before a slow article fetch is hedged to the next mirror (JATS XML, PMC page, DOI); 0 disables")
+    add_cassette_args(ap)
     args = ap.parse_args()
+    configure_from_args(args)
+    mirrors.configure(args.hedge_after)
+    if args.metrics_out:
+        metrics.configure("harvest_quotes")
 
-    compounds = load_json(DATA_DIR / "peptide-compounds.json")
-    peptide_names = [p["name"] for p in compounds.get("peptides", [])]
-
-    try:
-        all_quotes = load_json(DATA_DIR / "peptide-specific-quotes.json").get("quotes", [])
-    except FileNotFoundError:
-        all_quotes = []
-    try:
-        verified_quotes = load_json(DATA_DIR / "peptide-specific-quotes.verified.json").get("quotes", [])
-    except FileNotFoundError:
-        verified_quotes = []
-
-    # Count existing quotes per peptide
-    counts = defaultdict(int)
-    for q in all_quotes:
-        n = q.get("peptide_name")
-        if n:
-            counts[n] += 1
-    vcounts = defaultdict(int)
-    for q in verified_quotes:
-        n = q.get("peptide_name")
-        if n:
-            vcounts[n] += 1
+    peptide_names = coverage_peptide_names(COMPOUNDS_PATH)
+    # verified/staged counts per peptide come from the coverage index, not a rescan of the quote files
+    coverage = CoverageIndex.load(files={"final": FINAL_PATH, "staging": STAGING_PATH})
 
     # Build target set
     if args.peptides.strip():
@@ -79,12 +138,8 @@ def main() -> int:
         if not target:
             target = requested  # fallback to requested if names differ slightly
     else:
-        # Focus on peptides with <3 verified quotes
-        focus = [n for n in peptide_names if vcounts.get(n, 0) < 3]
-        # Sort by (verified asc, total asc) to prioritize least-covered first
-        focus.sort(key=lambda n: (vcounts.get(n, 0), counts.get(n, 0)))
-        # Limit to max-peptides
-        target = focus[: max(1, args.max_peptides)]
+        # Focus on peptides with <3 verified quotes, least covered first
+        target = coverage.targets(peptide_names, args.max_peptides, target=3)
 
     # Import harvester
     try:
@@ -111,15 +166,55 @@ def main() -> int:
     # expose helpers for fallback
     global html_to_text, fetch_url, classify_source
 
-    harvested: Dict[str, List[Dict[str, Any]]] = {}
+    # Near-duplicate index over the final set, shared with promote_quotes.py
+    try:
+        from .near_dup import index_for_quotes  # type: ignore
+    except Exception:
+        from near_dup import index_for_quotes  # type: ignore
+    try:
+        final_quotes = load_json(FINAL_PATH).get("quotes", [])
+    except FileNotFoundError:
+        final_quotes = []
+    final_index = index_for_quotes(final_quotes)
+    seen_urls = SeenUrls(None if args.no_seen_cache else Path(args.seen_urls))
+    resolver = DoiResolver(Path(args.doi_cache))
+    use_resolver(resolver)
+    stats = QueryStats(
+        Path(args.query_stats),
+        deterministic=args.deterministic,
+        classes=load_peptide_classes(DATA_DIR / "peptide-compounds.json"),
+    )
+
+    harvested: Dict[str, List[Candidate]] = {}
     for name in target:
-        res: Optional[List[Dict[str, Any]]] = harvest_peptide_quotes(name, min_quotes=args.min, max_papers=args.limit)
+        res: Optional[List[Candidate]] = harvest_peptide_quotes(
+            name,
+            min_quotes=args.min,
+            max_papers=args.limit,
+            known=final_index,
+            lookahead=args.lookahead,
+            seen_urls=seen_urls,
+            stats=stats,
+        )
         if not res:
             # Europe PMC fallback: search OA full text on PMC
-            proposals = harvest_via_epmc(name, min_quotes=args.min)
+            proposals = harvest_via_epmc(
+                name,
+                min_quotes=args.min,
+                fetch_concurrency=args.fetch_concurrency,
+                workers=args.workers,
+                known=final_index,
+                seen_urls=seen_urls,
+            )
             res = proposals
         if res:
             harvested[name] = res
+    seen_urls.save()
+    stats.save()
+    resolver.save()
+    if args.metrics_out:
+        prom, _ = metrics.write(Path(args.metrics_out))
+        print(f"Wrote metrics to {prom} (+ .json)")
 
     # Curate marketing value: remove weak/non-benefit sentences
     curated = curate_marketing_value(harvested)
@@ -136,25 +231,33 @@ def main() -> int:
         "quotes": staging_quotes,
     }
     STAGING_PATH.write_text(json.dumps(staging_doc, indent=2), encoding="utf-8")
+    coverage.replace("staging", staging_quotes)
+    coverage.mark_written("staging", STAGING_PATH)
+    update_progress(coverage, PROGRESS_PATH, COMPOUNDS_PATH)
 
     # Skip writing any additional files; we maintain only staging + final quote files
     print(f"Wrote staging quotes to {STAGING_PATH}")
     return 0
 
 
-def harvest_via_epmc(peptide: str, min_quotes: int = 3) -> Optional[List[Dict[str, Any]]]:
-    # local import to avoid module-level package context issues
+def harvest_via_epmc(
+    peptide: str,
+    min_quotes: int = 3,
+    fetch_concurrency: int = 1,
+    workers: Optional[int] = None,
+    known: Optional[Any] = None,
+    seen_urls: Optional[Any] = None,
+) -> Optional[List[Candidate]]:
+    import urllib.parse, json as _json
     try:
-        from .scholar_integration import extract_marketing_sentences  # type: ignore
+        from .epmc_metadata import EPMC_SEARCH_URL as base  # type: ignore
     except Exception:
-        from scholar_integration import extract_marketing_sentences  # type: ignore
-    import urllib.request, urllib.parse, json as _json
-    base = "https://www.ebi.ac.uk/europepmc/webservices/rest/search"
+        from epmc_metadata import EPMC_SEARCH_URL as base  # type: ignore
     # Expand with synonyms for better recall
     try:
-        from .scholar_integration import PEPTIDE_SYNONYMS  # type: ignore
+        from .scholar_integration import PEPTIDE_SYNONYMS, record_harvest_fetch  # type: ignore
     except Exception:
-        from scholar_integration import PEPTIDE_SYNONYMS  # type: ignore
+        from scholar_integration import PEPTIDE_SYNONYMS, record_harvest_fetch  # type: ignore
     syns = PEPTIDE_SYNONYMS.get(peptide.lower(), [])
     terms = [peptide] + syns
     term_query = " OR ".join(terms)
@@ -165,11 +268,11 @@ def harvest_via_epmc(peptide: str, min_quotes: int = 3) -> Optional[List[Dict[st
         extra += " AND (hair OR skin OR dermal OR dermis)"
     query = f"({term_query}) AND OPEN_ACCESS:y{extra}"
     url = f"{base}?query={urllib.parse.quote(query)}&resultType=core&pageSize=25&format=json"
-    try:
-        with urllib.request.urlopen(url, timeout=30) as resp:
-            data = resp.read().decode("utf-8", errors="ignore")
-    except Exception:
+    # fetch_url goes through the active HTTP cassette, if any
+    body, _, _ = fetch_url(url)
+    if body is None:
         return None
+    data = body.decode("utf-8", errors="ignore")
     try:
         j = _json.loads(data)
     except Exception:
@@ -177,48 +280,101 @@ def harvest_via_epmc(peptide: str, min_quotes: int = 3) -> Optional[List[Dict[st
     results = j.get("resultList", {}).get("result", [])
     if not results:
         return None
-    proposals: List[Dict[str, Any]] = []
-    seen = set()
-    for r in results:
-        pmcid = r.get("pmcid")
-        if not pmcid:
-            continue
-        pmc_url = f"https://pmc.ncbi.nlm.nih.gov/articles/{pmcid}/"
-        body, ctype, status = fetch_url(pmc_url)
-        if not body:
-            continue
-        stype = classify_source(pmc_url, None)
-        if stype not in {"pmc_html", "journal_html"}:
-            continue
-        html = body.decode("utf-8", errors="ignore")
-        candidates = extract_marketing_sentences(html, peptide, positive_only=True)
-        for s, score, section in candidates:
-            key = (s.lower()[:400])
-            if key in seen:
+    try:
+        from .near_dup import NearDupIndex  # type: ignore
+    except Exception:
+        from near_dup import NearDupIndex  # type: ignore
+    proposals: List[Candidate] = []
+    seen = NearDupIndex()
+    with_pmcid = [r for r in results if r.get("pmcid")]
+    if seen_urls is not None:
+        # skip articles already scanned for this peptide (e.g. via Scholar) or rejected before
+        with_pmcid = [r for r in with_pmcid if seen_urls.should_skip(_pmc_url(r), peptide) is None]
+        for r in with_pmcid:
+            seen_urls.mark_seen(_pmc_url(r), peptide)
+    if fetch_concurrency > 1:
+        # overlap article downloads with sentence extraction in worker processes
+        pages = imap(
+            with_pmcid,
+            _fetch_pmc_page,
+            functools.partial(_epmc_candidates, peptide),
+            fetch_concurrency=fetch_concurrency,
+            workers=workers,
+        )
+    else:
+        pages = (_epmc_candidates(peptide, r, _fetch_pmc_page(r)) for r in with_pmcid)
+    with closing(pages):
+        for r, candidates in zip(with_pmcid, pages):
+            pmc_url = _pmc_url(r)
+            if candidates is None:
                 continue
-            seen.add(key)
-            proposals.append({
-                "peptide_name": peptide,
-                "replacement_quote": s.strip()[:600],
-                "paper_title": r.get("title"),
-                "authors": r.get("authorString"),
-                "year": r.get("pubYear"),
-                "url": pmc_url,
-                "source": "EuropePMC",
-                "positivity_score": round(float(score), 2),
-                "section": section,
-            })
+            if not candidates and seen_urls is not None:
+                seen_urls.reject(pmc_url, "no_sentences", peptide)
+            before = len(proposals)
+            for s, score, section in candidates:
+                if known is not None and known.query(s, peptide) is not None:
+                    continue
+                if not seen.add_if_new(s, peptide):
+                    continue
+                proposals.append(Candidate(
+                    peptide_name=peptide,
+                    replacement_quote=s.strip()[:600],
+                    paper_title=r.get("title"),
+                    authors=r.get("authorString"),
+                    year=r.get("pubYear"),
+                    url=pmc_url,
+                    source="EuropePMC",
+                    positivity_score=round(float(score), 2),
+                    section=section,
+                ))
+                if len(proposals) >= min_quotes:
+                    break
+            record_harvest_fetch(len(proposals) - before)
             if len(proposals) >= min_quotes:
                 return proposals
     return proposals or None
 
 
+def _pmc_url(result: Dict[str, Any]) -> str:
+    return f"https://pmc.ncbi.nlm.nih.gov/articles/{result.get('pmcid')}/"
+
+
+def _fetch_pmc_page(result: Dict[str, Any]):
+    """Europe PMC JATS XML for the article, or the PMC HTML page when there is none."""
+    try:
+        from .jats import fetch_article  # type: ignore
+    except Exception:
+        from jats import fetch_article  # type: ignore
+    doi = result.get("doi")
+    return fetch_article(_pmc_url(result), alternates=[f"https://doi.org/{doi}"] if doi else ())
+
+
+def _epmc_candidates(peptide: str, result: Dict[str, Any], fetched) -> Optional[List[Any]]:
+    """Parse one fetched PMC page into ranked candidate sentences (runs in a worker process).
+
+    Returns None when the page could not be downloaded.
+    """
+    try:
+        from .scholar_integration import extract_article_sentences  # type: ignore
+        from .validate_quotes import classify_source as _classify  # type: ignore
+    except Exception:
+        from scholar_integration import extract_article_sentences  # type: ignore
+        from validate_quotes import classify_source as _classify  # type: ignore
+    body, ctype, status = fetched
+    if not body:
+        return None
+    stype = _classify(_pmc_url(result), None)
+    if stype not in {"pmc_html", "journal_html"}:
+        return []
+    return extract_article_sentences(body, ctype, peptide, positive_only=True)
+
+
 def split_sentences(text: str) -> List[str]:
     import re as _re
     return _re.split(r"(?<=[.!?])\s+", text)
 
 
-def sanitize_proposals(harvested: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+def sanitize_proposals(harvested: Dict[str, List[Candidate]]) -> Dict[str, List[Candidate]]:
     import re as _re
     def clean_text(t: str) -> str:
         # remove bracket citations and lingering nav text patterns
@@ -232,28 +388,26 @@ def sanitize_proposals(harvested: Dict[str, List[Dict[str, Any]]]) -> Dict[str,
         if t and t[-1] not in ".!?":
             t += "."
         return t
-    out: Dict[str, List[Dict[str, Any]]] = {}
+    out: Dict[str, List[Candidate]] = {}
     for pep, items in harvested.items():
         cleaned = []
         for it in items:
-            it = dict(it)
-            q = it.get("replacement_quote", "")
-            it["replacement_quote"] = clean_text(q)
-            cleaned.append(it)
+            # Candidate(**it) also accepts a proposal loaded back from JSON as a plain dict
+            cleaned.append(Candidate(**{**it, "replacement_quote": clean_text(it.get("replacement_quote", ""))}))
         out[pep] = cleaned
     return out
 
 
-def curate_marketing_value(harvested: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+def curate_marketing_value(harvested: Dict[str, List[Candidate]]) -> Dict[str, List[Candidate]]:
     """Filter to benefit-focused proposals with adequate positivity score and readable text."""
     # import benefit/exclude lexicons
     try:
         from .scholar_integration import BENEFIT_TERMS, EXCLUDE_TERMS, ANIMAL_TERMS  # type: ignore
     except Exception:
         from scholar_integration import BENEFIT_TERMS, EXCLUDE_TERMS, ANIMAL_TERMS  # type: ignore
-    curated: Dict[str, List[Dict[str, Any]]] = {}
+    curated: Dict[str, List[Candidate]] = {}
     for pep, items in harvested.items():
-        keep: List[Dict[str, Any]] = []
+        keep: List[Candidate] = []
         for it in items or []:
             qt = (it.get("replacement_quote", "") or "").strip()
             sl = qt.lower()
@@ -274,7 +428,7 @@ def curate_marketing_value(harvested: Dict[str, List[Dict[str, Any]]]) -> Dict[s
     return curated
 
 
-def curated_to_quotes(curated: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+def curated_to_quotes(curated: Dict[str, List[Candidate]]) -> List[Dict[str, Any]]:
     """Flatten curated proposals into a quotes[] list compatible with peptide-specific schema."""
     quotes: List[Dict[str, Any]] = []
     next_id = 1
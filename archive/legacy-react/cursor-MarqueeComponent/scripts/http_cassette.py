@@ -0,0 +1,221 @@
+"""
+Record/replay layer for network calls ("HTTP cassettes").
+
+Every fetch in the quote pipeline (validate_quotes.fetch_url,
+update_authors.fetch, the Europe PMC search in harvest_quotes and the
+Google Scholar result stream) can be routed through a cassette directory so
+runs become reproducible and the CPU stages can be profiled offline.
+
+Modes:
+  - record:           fetch live and save every request/response
+  - replay:           serve only from the cassette; misses fail like a fetch error
+  - replay-or-fetch:  serve from the cassette when present, else fetch live and record
+
+Only responses worth replaying are saved: those with a body, and HTTP 4xx
+errors that will not change (a 404 stays a 404). Timeouts, 408 and 429
+answers, 5xx and connection errors are not recorded, so a transient failure
+is retried live on the next run instead of being replayed forever.
+
+Layout of a cassette directory:
+  <key>.json    request/response metadata (url, status, content type)
+  <key>.body    raw response bytes (absent when the request failed)
+  <key>.jsonl   one Scholar result per line for a recorded search, ending with
+                an {"__end__": true} line once the stream was read to the end
+
+Usage from a script:
+  add_cassette_args(parser)
+  args = parser.parse_args()
+  configure_from_args(args)
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+try:
+    from . import metrics  # type: ignore
+except Exception:  # when run as a script without package context
+    import metrics  # type: ignore
+
+MODES = ("record", "replay", "replay-or-fetch")
+
+FetchResult = Tuple[Optional[bytes], Optional[str], str]
+
+STREAM_END = {"__end__": True}
+_HTTP_STATUS_RE = re.compile(r"HTTP Error (\d{3})")
+# 4xx answers that say "not now" rather than "never": timeouts, throttling
+TRANSIENT_4XX = frozenset({408, 425, 429})
+
+_ACTIVE: Optional["Cassette"] = None
+
+
+def permanent_failure(status: str) -> bool:
+    """Whether a fetch status is a client error that will not change on retry (404, 410...)."""
+    m = _HTTP_STATUS_RE.search(status or "")
+    if not m:
+        return False
+    code = int(m.group(1))
+    return 400 <= code < 500 and code not in TRANSIENT_4XX
+
+
+def replayable(result: FetchResult) -> bool:
+    """Whether a live result may be recorded: it has a body, or failed permanently."""
+    data, _, status = result
+    return data is not None or permanent_failure(status)
+
+
+class Cassette:
+    def __init__(self, directory: Path, mode: str) -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def key(self, method: str, url: str) -> str:
+        return hashlib.sha256(f"{method.upper()} {url}".encode("utf-8")).hexdigest()[:32]
+
+    def _write(self, path: Path, data: bytes) -> None:
+        tmp = path.with_name(path.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def load(self, url: str, method: str = "GET") -> Optional[FetchResult]:
+        key = self.key(method, url)
+        meta_path = self.directory / f"{key}.json"
+        if not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        body_path = self.directory / f"{key}.body"
+        body = body_path.read_bytes() if body_path.exists() else None
+        return body, meta.get("content_type"), meta.get("status") or "ok"
+
+    def save(self, url: str, result: FetchResult, method: str = "GET", **extra: Any) -> None:
+        data, content_type, status = result
+        key = self.key(method, url)
+        meta: Dict[str, Any] = {
+            "method": method.upper(),
+            "url": url,
+            "status": status,
+            "content_type": content_type,
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        meta.update(extra)
+        with self._lock:
+            body_path = self.directory / f"{key}.body"
+            if data is not None:
+                self._write(body_path, data)
+            elif body_path.exists():
+                body_path.unlink()
+            self._write(self.directory / f"{key}.json", json.dumps(meta, indent=2).encode("utf-8"))
+
+    def fetch(self, url: str, live: Callable[[str], FetchResult], method: str = "GET") -> FetchResult:
+        """Serve `url` according to the cassette mode, calling `live(url)` when needed."""
+        if self.mode != "record":
+            hit = self.load(url, method)
+            metrics.inc("quotes_cache_requests_total", cache="cassette", result="hit" if hit is not None else "miss")
+            if hit is not None:
+                return hit
+            if self.mode == "replay":
+                return None, None, f"fetch_error: cassette miss for {url}"
+        result = live(url)
+        if replayable(result):
+            self.save(url, result, method)
+        return result
+
+    def search_pubs(self, query: str, live: Callable[[str], Iterator[Any]]) -> Iterator[Any]:
+        """Replay or record a Scholar result stream for `query`.
+
+        Results are appended as they are consumed, so a caller that stops early
+        records only what it actually read; the end marker is written only when
+        the live stream is exhausted. Replaying a recording without the marker
+        serves the recorded prefix and then, in replay-or-fetch mode, continues
+        with the live stream past that prefix (extending the recording).
+        """
+        path = self.directory / f"{self.key('SCHOLAR', query)}.jsonl"
+        if self.mode != "record" and path.exists():
+            return self._replay_stream(path, query, live)
+        if self.mode == "replay":
+            raise LookupError(f"cassette miss for Scholar query: {query}")
+        return self._record_stream(path, live(query))
+
+    def _replay_stream(self, path: Path, query: str, live: Callable[[str], Iterator[Any]]) -> Iterator[Any]:
+        items = []
+        complete = False
+        with path.open("r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if line:
+                    item = json.loads(line)
+                    if item == STREAM_END:
+                        complete = True
+                    else:
+                        items.append(item)
+        yield from items
+        if complete or self.mode == "replay":
+            return
+        stream = live(query)
+        next(itertools.islice(stream, len(items), len(items)), None)  # skip the recorded prefix
+        yield from self._record_stream(path, stream, append=True)
+
+    def _record_stream(self, path: Path, stream: Iterator[Any], append: bool = False) -> Iterator[Any]:
+        with path.open("a" if append else "w", encoding="utf-8") as fh:
+            for item in stream:
+                fh.write(json.dumps(item, default=str) + "\n")
+                fh.flush()
+                yield item
+            fh.write(json.dumps(STREAM_END) + "\n")
+
+
+def use_cassette(cassette: Optional[Cassette]) -> None:
+    global _ACTIVE
+    _ACTIVE = cassette
+
+
+def active_cassette() -> Optional[Cassette]:
+    return _ACTIVE
+
+
+def replaying() -> bool:
+    """True when every request is served from a cassette (no politeness delays needed)."""
+    return _ACTIVE is not None and _ACTIVE.mode == "replay"
+
+
+def cassette_fetch(url: str, live: Callable[[str], FetchResult], method: str = "GET") -> FetchResult:
+    """Fetch through the active cassette if one is configured, else call `live` directly."""
+    if _ACTIVE is None:
+        return live(url)
+    return _ACTIVE.fetch(url, live, method)
+
+
+def cassette_search_pubs(query: str, live: Callable[[str], Iterator[Any]]) -> Iterator[Any]:
+    """Scholar search through the active cassette if one is configured."""
+    if _ACTIVE is None:
+        return live(query)
+    return _ACTIVE.search_pubs(query, live)
+
+
+def add_cassette_args(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--record", metavar="DIR", default=None, help="Record every network request/response to this cassette directory")
+    group.add_argument("--replay", metavar="DIR", default=None, help="Serve network requests only from this cassette directory")
+    group.add_argument("--replay-or-fetch", metavar="DIR", default=None, help="Serve from this cassette directory, fetching and recording misses")
+
+
+def configure_from_args(args: argparse.Namespace) -> Optional[Cassette]:
+    for mode in MODES:
+        directory = getattr(args, mode.replace("-", "_"), None)
+        if directory:
+            cassette = Cassette(Path(directory), mode)
+            use_cassette(cassette)
+            return cassette
+    return None
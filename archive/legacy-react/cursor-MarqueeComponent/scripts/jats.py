@@ -0,0 +1,204 @@
+"""
+JATS XML ingestion for PMC open-access articles.
+
+The PMC article page is several hundred KB of navigation, reference popups
+and scripts around the text we actually read. Europe PMC serves the same
+open-access article as JATS XML (`/{PMCID}/fullTextXML`), which is a
+fraction of the size and already labelled: <abstract>, <sec> with <title>
+(or sec-type), <p>. `parse_jats` streams it with ElementTree.iterparse,
+clearing each paragraph once read, and returns the same SectionMap as
+section_segmenter.segment():
+
+  abstract     each <abstract> (graphical/teaser abstracts skipped)
+  results      \
+  discussion    } <sec> whose title or sec-type names the section; nested
+  conclusion   /  <sec>s without a recognised title inherit their parent's
+  fulltext     article title, abstract and body paragraphs
+
+Tables, figures, formulas and the back matter (references, acknowledgements)
+are skipped. A structured abstract's "Conclusions" <sec> counts for both
+abstract and conclusion, like the HTML segmenter.
+
+`fetch_article(url)` fetches PMC article URLs as JATS first and falls back
+to the HTML page when Europe PMC has no full text for the article (non-OA,
+404) or the download fails; other URLs are fetched as before. The JATS XML,
+the PMC page and any registered equivalent (the article's DOI) are mirrors
+of one article: a slow one is hedged to the next (mirrors.py) when hedging
+is enabled. An equivalent's body only wins if it carries the article text
+(`carries_article_text`, or the caller's `accept`, e.g. "the quote matches"):
+a DOI often lands on a publisher abstract or paywall page. Callers tell
+the two apart with `is_jats(body, content_type)`. Requests go through
+validate_quotes.fetch_url, so they are recorded/replayed by cassettes. The
+endpoint can be pointed elsewhere with EPMC_FULLTEXT_URL.
+"""
+from __future__ import annotations
+
+import io
+import os
+import re
+import xml.etree.ElementTree as ET
+from typing import Callable, List, Optional, Sequence, Tuple
+
+try:
+    from . import mirrors  # type: ignore
+    from .doi_resolver import resolve_url  # type: ignore
+    from .epmc_metadata import article_key  # type: ignore
+    from .section_segmenter import SectionMap, heading_section, select_sections  # type: ignore
+    from .validate_quotes import fetch_url  # type: ignore
+except Exception:  # when run as a script without package context
+    import mirrors  # type: ignore
+    from doi_resolver import resolve_url  # type: ignore
+    from epmc_metadata import article_key  # type: ignore
+    from section_segmenter import SectionMap, heading_section, select_sections  # type: ignore
+    from validate_quotes import fetch_url  # type: ignore
+
+EPMC_FULLTEXT_URL = os.environ.get(
+    "EPMC_FULLTEXT_URL", "https://www.ebi.ac.uk/europepmc/webservices/rest/{pmcid}/fullTextXML"
+)
+JATS_CONTENT_TYPE = "application/jats+xml"
+
+_SKIP = {"table-wrap", "fig", "disp-formula", "inline-formula", "back", "ref-list", "supplementary-material"}
+_SKIP_ABSTRACT_TYPES = {"graphical", "teaser", "toc", "precis"}
+_WS_RE = re.compile(r"\s+")
+
+Fetched = Tuple[Optional[bytes], Optional[str], str]
+
+
+def fulltext_xml_url(pmcid: str) -> str:
+    return EPMC_FULLTEXT_URL.format(pmcid=pmcid)
+
+
+def is_jats(body: Optional[bytes], content_type: Optional[str]) -> bool:
+    if not body:
+        return False
+    if content_type and "jats" in content_type:
+        return True
+    head = body[:512].lstrip()
+    return head.startswith(b"<?xml") and b"<article" in body[:4096]
+
+
+def _fetch_jats(pmcid: str) -> Fetched:
+    body, ctype, status = fetch_url(fulltext_xml_url(pmcid))
+    if body and is_jats(body, ctype):
+        return body, JATS_CONTENT_TYPE, status
+    # no open-access full text: not an answer, so the next mirror is tried
+    return None, ctype, status if not body else "not_jats"
+
+
+def carries_article_text(body: bytes, content_type: Optional[str]) -> bool:
+    """Whether a fetched body is the article itself: JATS, a PDF, or HTML with an abstract or conclusion."""
+    if is_jats(body, content_type):
+        return True
+    if "pdf" in (content_type or "") or body[:5] == b"%PDF-":
+        return True
+    html = body.decode("utf-8", errors="replace")
+    return any(name != "fulltext" for name, _ in select_sections(html))
+
+
+def fetch_article(
+    url: str,
+    alternates: Sequence[str] = (),
+    accept: Optional[Callable[[bytes, Optional[str]], bool]] = None,
+) -> Fetched:
+    """fetch_url(url), trying the Europe PMC JATS XML first for PMC article URLs.
+
+    `alternates` (e.g. the DOI of the article) are further mirrors, tried
+    or hedged to after the JATS XML and `url` (see mirrors.py). A body from
+    an alternate wins only if `accept(body, content_type)` holds (default:
+    carries_article_text); otherwise the next mirror is tried, and the body
+    is kept only as a last resort.
+    """
+    check = accept or carries_article_text
+
+    def accepted(name: str, result: Fetched) -> bool:
+        return name in ("jats", "primary") or check(result[0] or b"", result[1])
+
+    attempts: List[mirrors.Attempt] = []
+    key = article_key(url)
+    if key is not None and key[0] == "pmcid":
+        attempts.append(("jats", lambda: _fetch_jats(key[1])))
+    attempts.append(("primary", lambda: fetch_url(url)))
+    for alt in alternates:
+        attempts.append(("doi" if "doi.org/" in alt else "alternate", lambda alt=alt: fetch_url(resolve_url(alt))))
+    return mirrors.hedged(attempts, accept=accepted)
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1] if "}" in tag else tag
+
+
+def _text(elem: ET.Element) -> str:
+    return _WS_RE.sub(" ", "".join(elem.itertext())).strip()
+
+
+def _clear(elem: ET.Element) -> None:
+    # keep the tail: it is the parent's text after an inline element
+    tail = elem.tail
+    elem.clear()
+    elem.tail = tail
+
+
+def parse_jats(data: bytes) -> SectionMap:
+    """Section name -> text spans for one JATS article (see module docstring)."""
+    sections: SectionMap = {}
+    fulltext: List[str] = []
+    # open <sec>/<abstract> scopes: [label or None, paragraphs]
+    scopes: List[List] = []
+    path: List[str] = []
+    skip_depth: Optional[int] = None
+    try:
+        for event, elem in ET.iterparse(io.BytesIO(data), events=("start", "end")):
+            tag = _local(elem.tag)
+            if event == "start":
+                path.append(tag)
+                if skip_depth is not None:
+                    continue
+                if tag in _SKIP or (tag == "abstract" and elem.get("abstract-type") in _SKIP_ABSTRACT_TYPES):
+                    skip_depth = len(path)
+                elif tag == "abstract":
+                    scopes.append(["abstract", []])
+                elif tag == "sec":
+                    label = heading_section(elem.get("sec-type") or "")
+                    inherited = scopes[-1][0] if scopes else None
+                    scopes.append([label or (inherited if inherited != "abstract" else None), []])
+                continue
+
+            depth = len(path)
+            path.pop()
+            if skip_depth is not None:
+                if depth == skip_depth:
+                    skip_depth = None
+                    _clear(elem)
+                continue
+            parent = path[-1] if path else ""
+            if tag == "title" and parent == "sec" and scopes:
+                label = heading_section(_text(elem))
+                if label is not None and label != "abstract":
+                    scopes[-1][0] = label
+                _clear(elem)
+            elif tag == "article-title" and "title-group" in path:
+                fulltext.append(_text(elem))
+            elif tag == "p":
+                text = _text(elem)
+                _clear(elem)
+                if text:
+                    fulltext.append(text)
+                    for scope in scopes:
+                        scope[1].append(text)
+            elif tag in ("abstract", "sec") and scopes:
+                label, parts = scopes.pop()
+                if label and parts:
+                    # a nested <sec> with the same label is already part of its parent's span
+                    if not (scopes and scopes[-1][0] == label):
+                        sections.setdefault(label, []).append(" ".join(parts))
+                _clear(elem)
+    except ET.ParseError:
+        if not fulltext:
+            return {}
+    sections["fulltext"] = ["\n".join(fulltext)]
+    return sections
+
+
+def jats_text(data: bytes) -> str:
+    """Plain article text (title, abstract, body paragraphs) of a JATS document."""
+    return "\n".join(parse_jats(data).get("fulltext", []))
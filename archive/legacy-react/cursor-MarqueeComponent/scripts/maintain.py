@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Single-load maintenance run over the staging and final quote files.
+
+Replaces running cleanup_animals.py, update_authors.py and promote_quotes.py
+one after another (each of which parses and rewrites both files). Here both
+files are loaded once, the passes run as in-memory transforms in the chosen
+order, and the files are written once at the end (atomically, and only if
+their content changed). Nothing on disk is ever half-processed.
+
+Passes:
+  cleanup   drop animal-context quotes          (cleanup_animals.cleanse_doc)
+  authors   normalize 'scientist' to 1st author (update_authors.normalize_quotes)
+  promote   move approved staging -> final      (promote_quotes.promote)
+
+The coverage index (quote_coverage.py) follows the cleanup and promote
+passes; it and peptide-quotes.progress.json are saved with the files.
+
+Run:
+  python3 scripts/maintain.py                          # cleanup,authors,promote
+  python3 scripts/maintain.py --passes authors,promote --dry-run
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from . import cleanup_animals, promote_quotes, update_authors  # type: ignore
+    from .http_cassette import add_cassette_args, configure_from_args  # type: ignore
+    from .quote_coverage import CoverageIndex, update_progress  # type: ignore
+except Exception:
+    import cleanup_animals, promote_quotes, update_authors  # type: ignore
+    from http_cassette import add_cassette_args, configure_from_args  # type: ignore
+    from quote_coverage import CoverageIndex, update_progress  # type: ignore
+
+DATA_DIR = Path('src/data')
+FILES = {
+    'final': DATA_DIR / 'peptide-quotes.final.json',
+    'staging': DATA_DIR / 'peptide-quotes.staging.json',
+}
+DEFAULT_PASSES = ['cleanup', 'authors', 'promote']
+
+Docs = Dict[str, Dict[str, Any]]
+
+
+def cleanup_pass(docs: Docs, args: argparse.Namespace) -> int:
+    return sum(cleanup_animals.cleanse_doc(docs[name], args.coverage, name) for name in ('final', 'staging'))
+
+
+def authors_pass(docs: Docs, args: argparse.Namespace) -> int:
+    quotes = docs['final'].get('quotes', []) + docs['staging'].get('quotes', [])
+    cache = {} if args.no_cache else update_authors.load_author_cache()
+    authors = update_authors.resolve_first_authors(
+        update_authors.placeholder_sources(quotes),
+        cache,
+        concurrency=args.concurrency,
+        use_epmc=not args.no_epmc,
+    )
+    if not args.no_cache and not args.dry_run:
+        update_authors.save_author_cache(cache)
+    return update_authors.normalize_quotes(quotes, authors)
+
+
+def promote_pass(docs: Docs, args: argparse.Namespace) -> int:
+    return promote_quotes.promote(docs['staging'], docs['final'], save_index=not args.dry_run, coverage=args.coverage)
+
+
+PASSES: Dict[str, Callable[[Docs, argparse.Namespace], int]] = {
+    'cleanup': cleanup_pass,
+    'authors': authors_pass,
+    'promote': promote_pass,
+}
+
+
+def load_docs() -> Docs:
+    docs: Docs = {}
+    for name, path in FILES.items():
+        docs[name] = json.loads(path.read_text(encoding='utf-8')) if path.exists() else {'metadata': {}, 'quotes': []}
+    return docs
+
+
+def write_docs(docs: Docs) -> List[Path]:
+    """Write changed documents via temp file + rename; returns the paths written."""
+    written: List[Path] = []
+    for name, path in FILES.items():
+        text = json.dumps(docs[name], indent=2)
+        if path.exists() and path.read_text(encoding='utf-8') == text:
+            continue
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        tmp.write_text(text, encoding='utf-8')
+        os.replace(tmp, path)
+        written.append(path)
+    return written
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--passes', default=','.join(DEFAULT_PASSES), help=f"Comma-separated passes in run order (available: {', '.join(PASSES)})")
+    ap.add_argument('--dry-run', action='store_true', help='Run the passes and report, but do not write any files')
+    ap.add_argument('--report-json', default=None, help='Also write per-pass timings and change counts to this file')
+    ap.add_argument('--concurrency', type=int, default=8, help='Concurrent source fetches for the authors pass')
+    ap.add_argument('--no-cache', action='store_true', help='Ignore and do not update the author cache')
+    ap.add_argument('--no-epmc', action='store_true', help='Do not batch-resolve authors via Europe PMC')
+    add_cassette_args(ap)
+    args = ap.parse_args(argv)
+    configure_from_args(args)
+
+    order = [p.strip() for p in args.passes.split(',') if p.strip()]
+    unknown = [p for p in order if p not in PASSES]
+    if unknown:
+        ap.error(f"unknown pass(es): {', '.join(unknown)}")
+
+    timings: List[Tuple[str, int, float]] = []
+    t0 = time.perf_counter()
+    # synced with the files before any pass changes them; the passes apply their deltas
+    args.coverage = CoverageIndex.load(files=FILES)
+    docs = load_docs()
+    timings.append(('load', 0, time.perf_counter() - t0))
+    for name in order:
+        t0 = time.perf_counter()
+        changes = PASSES[name](docs, args)
+        timings.append((name, changes, time.perf_counter() - t0))
+    t0 = time.perf_counter()
+    written = [] if args.dry_run else write_docs(docs)
+    if not args.dry_run:
+        for name, path in FILES.items():
+            args.coverage.mark_written(name, path)
+        update_progress(args.coverage)
+    timings.append(('write', len(written), time.perf_counter() - t0))
+
+    print(f"{'pass':<10} {'changes':>8} {'seconds':>9}")
+    for name, changes, secs in timings:
+        print(f"{name:<10} {changes:>8} {secs:>9.3f}")
+    for path in written:
+        print(f"Wrote {path}")
+    if args.dry_run:
+        print('Dry run: no files written')
+    if args.report_json:
+        report = {'passes': [{'pass': n, 'changes': c, 'seconds': round(s, 4)} for n, c, s in timings]}
+        Path(args.report_json).write_text(json.dumps(report, indent=2), encoding='utf-8')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
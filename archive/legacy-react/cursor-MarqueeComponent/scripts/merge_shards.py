@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Merge the reports of a sharded validate_quotes.py run.
+
+Each machine validates one shard of the same --files set:
+
+  python3 scripts/validate_quotes.py --files src/data/scientific-quotes.json \
+    src/data/peptide-specific-quotes.json --shard 1/3 --out report.1.json
+  ...                                            --shard 3/3 --out report.3.json
+
+and this script combines the shard reports into the usual
+validation_report.json, rows back in input-file order, and writes the
+.verified.json / .verified.proposed.json outputs exactly as a single run
+would (validate_quotes.write_outputs, reading the original quote files):
+
+  python3 scripts/merge_shards.py report.*.json --out validation_report.json \
+    --verified-out-dir src/data --proposed-out-dir src/data
+
+All reports must come from the same file set and shard count; a missing or
+duplicated shard is an error unless --allow-partial is given (the merged
+report then simply lacks the missing shards' quotes).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    from .validate_quotes import write_outputs  # type: ignore
+except Exception:  # when run as a script without package context
+    from validate_quotes import write_outputs  # type: ignore
+
+
+def merge_reports(reports: List[Dict[str, Any]], allow_partial: bool = False) -> Dict[str, Any]:
+    """One validation report from shard reports; raises ValueError on inconsistent or incomplete shards."""
+    if not reports:
+        raise ValueError("no shard reports given")
+    files = reports[0].get("files", [])
+    count = (reports[0].get("shard") or {}).get("count")
+    seen: Dict[int, int] = {}
+    for n, rep in enumerate(reports):
+        shard = rep.get("shard")
+        if not shard:
+            raise ValueError(f"report #{n + 1} is not a shard report (run validate_quotes.py with --shard i/N)")
+        if shard.get("count") != count:
+            raise ValueError(f"report #{n + 1} is shard {shard.get('index')}/{shard.get('count')}, expected .../{count}")
+        if rep.get("files", []) != files:
+            raise ValueError(f"report #{n + 1} was run on a different --files set")
+        seen[shard["index"]] = seen.get(shard["index"], 0) + 1
+    duplicated = sorted(i for i, c in seen.items() if c > 1)
+    if duplicated:
+        raise ValueError(f"shard(s) given more than once: {duplicated}")
+    missing = sorted(set(range(1, count + 1)) - set(seen))
+    if missing and not allow_partial:
+        raise ValueError(f"missing shard(s) {missing} of {count} (use --allow-partial to merge anyway)")
+
+    order = {f["file"]: n for n, f in enumerate(files)}
+    rows = [r for rep in reports for r in rep.get("results", [])]
+    rows.sort(key=lambda r: (order.get(r.get("file"), len(order)), r.get("position", 0)))
+    results = []
+    for r in rows:
+        r = dict(r)
+        r.pop("position", None)
+        results.append(r)
+    merged: Dict[str, Any] = {"files": files, "results": results}
+    deferred = [d for rep in reports for d in rep.get("deferred", [])]
+    if any("deferred" in rep for rep in reports):
+        merged["deferred"] = deferred
+    if missing:
+        merged["missing_shards"] = {"count": count, "missing": missing}
+    return merged
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Merge validate_quotes.py --shard reports")
+    p.add_argument("reports", nargs="+", help="Shard reports (validate_quotes.py --shard i/N --out ...)")
+    p.add_argument("--out", default="validation_report.json", help="Merged report path")
+    p.add_argument("--min-score", type=float, default=0.9, help="Minimum fuzzy score to accept as verified if not exact (as in the shard runs)")
+    p.add_argument("--verified-out-dir", default=None, help="If set, emit filtered high-quality JSONs here with .verified.json suffix")
+    p.add_argument("--proposed-out-dir", default=None, help="If set, emit a parallel .verified.proposed.json from the shards' Scholar suggestions")
+    p.add_argument("--allow-partial", action="store_true", help="Merge even when shards are missing")
+    args = p.parse_args(argv)
+
+    try:
+        reports = [json.loads(Path(r).read_text(encoding="utf-8")) for r in args.reports]
+        merged = merge_reports(reports, allow_partial=args.allow_partial)
+    except (OSError, ValueError) as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    counts = {f["file"]: f["count"] for f in merged["files"]}
+    for f, n in counts.items():
+        got = sum(1 for r in merged["results"] if r.get("file") == f)
+        if got != n and "missing_shards" not in merged:
+            print(f"{f}: {got} results for {n} quotes", file=sys.stderr)
+
+    out_path = Path(args.out)
+    out_path.write_text(json.dumps(merged, indent=2), encoding="utf-8")
+    print(f"Merged {len(reports)} shard report(s), {len(merged['results'])} results; wrote {out_path}")
+    write_outputs(merged, list(counts), args.min_score, args.verified_out_dir, args.proposed_out_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
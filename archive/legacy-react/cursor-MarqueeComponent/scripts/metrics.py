@@ -0,0 +1,266 @@
+"""
+Run metrics for the scheduled quote jobs, exported as Prometheus text and JSON.
+
+A module-level registry collects counters, gauges and histograms from the
+fetch, parse, match and harvest stages:
+
+  quotes_fetch_seconds{host}                  histogram of live fetch latency
+  quotes_fetch_bytes_total{host}              bytes downloaded
+  quotes_fetch_errors_total{host,kind}        failed fetches (http_4xx, http_5xx, timeout, other)
+  quotes_fetch_throttled_total{host}          HTTP 429/503 answers
+  quotes_fetch_hedges_total{mirror}           hedged requests started for a slow mirror
+  quotes_fetch_mirror_wins_total{mirror}      hedged fetches won, by mirror
+  quotes_cache_requests_total{cache,result}   hit/miss for the cassette, DOI and seen-URL caches
+  quotes_documents_parsed_total{kind}         html / jats / pdf documents turned into text
+  quotes_parse_seconds{kind}                  histogram of text extraction time
+  quotes_match_seconds                        histogram of fuzzy matching time per quote
+  quotes_validated_total{via,outcome}         validate_quotes results validated this run (via metadata/fetch)
+  quotes_deferred_total                       quotes left to a later run by --deadline/--budget (their
+                                              report rows carry the previous result)
+  quotes_harvest_fetches_total                articles scored by the harvest
+  quotes_harvest_accepted_total               proposals accepted from them
+  quotes_harvest_accepted_per_fetch           histogram of proposals per scored article
+  quotes_scholar_fallback_total{outcome}      validate_quotes Scholar searches (suggested, none, timed_out, skipped)
+
+`finish()` adds run-level gauges (duration, documents parsed per second,
+quotes validated per minute, proposals per fetch), and `write(path)` stores
+<path>.prom (for the node_exporter textfile collector) and <path>.json.
+Scripts call configure(job) and write() when --metrics-out is given;
+recording is cheap and always on.
+
+Work done in pipeline process pools is recorded in a fresh registry inside
+the worker (`call_collecting`) and merged back into the parent, so
+--fetch-concurrency runs report the same numbers as serial ones.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+FAST_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10)
+
+# name -> (type, help, buckets)
+METRICS: Dict[str, Tuple[str, str, Sequence[float]]] = {
+    "quotes_fetch_seconds": ("histogram", "Live fetch latency per host", LATENCY_BUCKETS),
+    "quotes_fetch_bytes_total": ("counter", "Bytes downloaded per host", ()),
+    "quotes_fetch_errors_total": ("counter", "Failed fetches per host and kind", ()),
+    "quotes_fetch_throttled_total": ("counter", "HTTP 429/503 answers per host", ()),
+    "quotes_fetch_hedges_total": ("counter", "Hedged requests started after the latency threshold, by mirror", ()),
+    "quotes_fetch_mirror_wins_total": ("counter", "Hedged fetches by the mirror that answered first", ()),
+    "quotes_cache_requests_total": ("counter", "Cache lookups by cache and hit/miss", ()),
+    "quotes_documents_parsed_total": ("counter", "Documents turned into text by kind", ()),
+    "quotes_parse_seconds": ("histogram", "Text extraction time by document kind", FAST_BUCKETS),
+    "quotes_match_seconds": ("histogram", "Fuzzy matching time per quote", FAST_BUCKETS),
+    "quotes_validated_total": ("counter", "Validation results by path and outcome", ()),
+    "quotes_deferred_total": ("counter", "Quotes deferred to a later run (budget spent)", ()),
+    "quotes_harvest_fetches_total": ("counter", "Articles scored by the harvest", ()),
+    "quotes_harvest_accepted_total": ("counter", "Harvest proposals accepted", ()),
+    "quotes_harvest_accepted_per_fetch": ("histogram", "Proposals accepted per scored article", COUNT_BUCKETS),
+    "quotes_scholar_fallback_total": ("counter", "Scholar fallback searches by outcome", ()),
+    "quotes_run_duration_seconds": ("gauge", "Wall-clock duration of the run", ()),
+    "quotes_run_timestamp_seconds": ("gauge", "Unix time the run finished", ()),
+    "quotes_documents_parsed_per_second": ("gauge", "Documents parsed per second of run time", ()),
+    "quotes_validated_per_minute": ("gauge", "Quotes validated per minute of run time", ()),
+    "quotes_harvest_accepted_per_fetch_ratio": ("gauge", "Harvest proposals accepted per scored article", ()),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def host_of(url: str) -> str:
+    """Lowercased host of `url` without a leading "www.", "" if it has none.
+
+    The one host normaliser of the scripts: metric labels, DOI publisher
+    domains, query-stats domains, validation timings and shard planning all
+    key hosts this way.
+    """
+    host = (urllib.parse.urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.values: Dict[str, Dict[Labels, float]] = {}
+        # histogram series: [count per bucket..., +Inf count, sum]
+        self.hists: Dict[str, Dict[Labels, List[float]]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self.values.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        with self._lock:
+            self.values.setdefault(name, {})[_labels(labels)] = float(value)
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        buckets = METRICS[name][2]
+        key = _labels(labels)
+        with self._lock:
+            h = self.hists.setdefault(name, {}).setdefault(key, [0.0] * (len(buckets) + 2))
+            for i, b in enumerate(buckets):
+                if value <= b:
+                    h[i] += 1
+                    break
+            else:
+                h[len(buckets)] += 1
+            h[-1] += value
+
+    def total(self, name: str) -> float:
+        with self._lock:
+            if name in self.hists:
+                return sum(sum(h[:-1]) for h in self.hists[name].values())
+            return sum(self.values.get(name, {}).values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "values": {n: [[list(map(list, k)), v] for k, v in s.items()] for n, s in self.values.items()},
+                "hists": {n: [[list(map(list, k)), list(h)] for k, h in s.items()] for n, s in self.hists.items()},
+            }
+
+    def merge(self, snap: Dict[str, Any]) -> None:
+        with self._lock:
+            for name, series in snap.get("values", {}).items():
+                kind = METRICS.get(name, ("counter",))[0]
+                dst = self.values.setdefault(name, {})
+                for k, v in series:
+                    key = tuple(tuple(p) for p in k)
+                    dst[key] = v if kind == "gauge" else dst.get(key, 0.0) + v
+            for name, series in snap.get("hists", {}).items():
+                dst_h = self.hists.setdefault(name, {})
+                for k, h in series:
+                    key = tuple(tuple(p) for p in k)
+                    cur = dst_h.setdefault(key, [0.0] * len(h))
+                    for i, x in enumerate(h):
+                        cur[i] += x
+
+    # --- export -------------------------------------------------------------
+
+    def to_prometheus(self, const_labels: Optional[Dict[str, str]] = None) -> str:
+        const = _labels(const_labels or {})
+
+        def fmt(labels: Labels, extra: Labels = ()) -> str:
+            items = const + labels + extra
+            if not items:
+                return ""
+            inner = ",".join('{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in items)
+            return "{" + inner + "}"
+
+        def num(x: float) -> str:
+            if math.isinf(x):
+                return "+Inf"
+            return repr(float(x)) if x != int(x) else str(int(x))
+
+        lines: List[str] = []
+        snap = self.snapshot()
+        for name in sorted(set(snap["values"]) | set(snap["hists"])):
+            kind, help_text, buckets = METRICS.get(name, ("untyped", name, ()))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for k, v in sorted((tuple(tuple(p) for p in k), v) for k, v in snap["values"].get(name, [])):
+                lines.append(f"{name}{fmt(k)} {num(v)}")
+            for k, h in sorted((tuple(tuple(p) for p in k), h) for k, h in snap["hists"].get(name, [])):
+                cum = 0.0
+                for b, c in zip(list(buckets) + [math.inf], h[:-1]):
+                    cum += c
+                    lines.append(f"{name}_bucket{fmt(k, (('le', num(b)),))} {num(cum)}")
+                lines.append(f"{name}_sum{fmt(k)} {num(h[-1])}")
+                lines.append(f"{name}_count{fmt(k)} {num(cum)}")
+        return "\n".join(lines) + "\n"
+
+    def to_json(self, const_labels: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        snap = self.snapshot()
+        out: Dict[str, Any] = {"labels": const_labels or {}, "metrics": {}}
+        for name, series in snap["values"].items():
+            out["metrics"][name] = [{"labels": dict(k), "value": v} for k, v in series]
+        for name, series in snap["hists"].items():
+            buckets = [str(b) for b in METRICS[name][2]] + ["+Inf"]
+            out["metrics"][name] = [
+                {"labels": dict(k), "buckets": dict(zip(buckets, h[:-1])), "count": sum(h[:-1]), "sum": h[-1]}
+                for k, h in series
+            ]
+        return out
+
+
+REGISTRY = Registry()
+_job: Optional[str] = None
+_started = time.time()
+
+
+def configure(job: str) -> None:
+    """Start a run for `job` (the script name); resets the registry and the run clock."""
+    global REGISTRY, _job, _started
+    REGISTRY = Registry()
+    _job = job
+    _started = time.time()
+
+
+def enabled() -> bool:
+    return _job is not None
+
+
+def inc(name: str, value: float = 1.0, **labels: Any) -> None:
+    REGISTRY.inc(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels: Any) -> None:
+    REGISTRY.observe(name, value, **labels)
+
+
+def call_collecting(fn: Callable[..., Any], *args: Any) -> Tuple[Any, Dict[str, Any]]:
+    """Run fn(*args) in a worker process with a fresh registry; returns (result, metrics snapshot)."""
+    global REGISTRY
+    saved, REGISTRY = REGISTRY, Registry()
+    try:
+        result = fn(*args)
+        return result, REGISTRY.snapshot()
+    finally:
+        REGISTRY = saved
+
+
+def merge(snap: Dict[str, Any]) -> None:
+    REGISTRY.merge(snap)
+
+
+def finish() -> None:
+    """Set the run-level gauges from the collected counters."""
+    now = time.time()
+    duration = max(1e-9, now - _started)
+    REGISTRY.set("quotes_run_duration_seconds", duration)
+    REGISTRY.set("quotes_run_timestamp_seconds", now)
+    REGISTRY.set("quotes_documents_parsed_per_second", REGISTRY.total("quotes_documents_parsed_total") / duration)
+    validated = REGISTRY.total("quotes_validated_total")
+    if validated:
+        REGISTRY.set("quotes_validated_per_minute", validated * 60.0 / duration)
+    fetches = REGISTRY.total("quotes_harvest_fetches_total")
+    if fetches:
+        REGISTRY.set("quotes_harvest_accepted_per_fetch_ratio", REGISTRY.total("quotes_harvest_accepted_total") / fetches)
+
+
+def write(path: Path) -> Tuple[Path, Path]:
+    """finish() and write <path>.prom and <path>.json atomically; returns both paths."""
+    finish()
+    path = Path(path)
+    const = {"job": _job} if _job else {}
+    prom, js = path.with_suffix(".prom"), path.with_suffix(".json")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for dst, text in ((prom, REGISTRY.to_prometheus(const)), (js, json.dumps(REGISTRY.to_json(const), indent=2))):
+        tmp = dst.with_name(dst.name + ".tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, dst)
+    return prom, js
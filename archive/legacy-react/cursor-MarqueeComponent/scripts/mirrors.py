@@ -0,0 +1,146 @@
+"""
+Hedged fetches across the mirrors of an article.
+
+The same article is often reachable at several places: the Europe PMC JATS
+XML, the PMC article page (pmc.ncbi.nlm.nih.gov; the legacy
+www.ncbi.nlm.nih.gov/pmc/articles/ URLs redirect there, so they count as
+the same mirror) and the publisher page behind its DOI. Tried one after
+another, a slow or throttled host holds the fetch for up to FETCH_TIMEOUT
+(30 s) before the next mirror is asked.
+
+`hedged(attempts)` starts the first attempt and, when it has not answered
+within `hedge_after` seconds, starts the next one alongside it; an attempt
+that fails starts the next one immediately. The first attempt returning an
+acceptable body wins: with `accept`, a body it rejects (a DOI landing or
+paywall page instead of the article text) counts as a miss, and is returned
+only if no attempt does better (the earliest such body, whatever the
+timing). Attempts not started yet are cancelled; one already in flight
+cannot be interrupted (urllib has no cancellation) and finishes in the
+background, its result ignored. With a single attempt, or hedging disabled,
+attempts run one after another in the caller's thread, each one only after
+the previous one failed.
+
+Hedging is off by default (HEDGE_AFTER = 0): a hedge is a second request,
+possibly to the same host (NCBI serves both the JATS XML and the PMC page),
+on top of the --delay politeness and shard plan. Scripts enable it with
+--hedge-after SECONDS.
+
+Equivalents that are only known from metadata (the DOI of a PMC article,
+from the Europe PMC search) are registered with `register(url, *others)`
+and looked up with `equivalents(url)`. jats.fetch_article builds the
+attempt list; scripts set the delay with `configure(hedge_after)`.
+"""
+from __future__ import annotations
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    from . import metrics  # type: ignore
+except Exception:  # when run as a script without package context
+    import metrics  # type: ignore
+
+HEDGE_AFTER = 0.0  # opt-in: --hedge-after
+POOL_SIZE = 32
+
+Fetched = Tuple[Optional[bytes], Optional[str], str]
+Attempt = Tuple[str, Callable[[], Fetched]]  # (mirror name, fetch)
+Accept = Callable[[str, Fetched], bool]  # (mirror name, result with a body) -> is it the article?
+
+_hedge_after = HEDGE_AFTER
+_equivalents: Dict[str, List[str]] = {}
+_lock = threading.Lock()
+_pool: Optional[ThreadPoolExecutor] = None
+
+
+def configure(hedge_after: Optional[float]) -> None:
+    """Seconds to wait for a mirror before hedging to the next; 0 or None disables hedging."""
+    global _hedge_after
+    _hedge_after = float(hedge_after or 0.0)
+
+
+def register(url: str, *others: str) -> None:
+    """Record `others` as equivalent sources of the article at `url`."""
+    with _lock:
+        known = _equivalents.setdefault(url, [])
+        known.extend(o for o in others if o and o != url and o not in known)
+
+
+def equivalents(url: str) -> List[str]:
+    with _lock:
+        return list(_equivalents.get(url, ()))
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="hedge")
+        return _pool
+
+
+def _call(fetch: Callable[[], Fetched]) -> Fetched:
+    try:
+        return fetch()
+    except Exception as e:  # pragma: no cover - fetchers report errors as a status
+        return None, None, f"fetch_error: {e}"
+
+
+def hedged(attempts: Sequence[Attempt], hedge_after: Optional[float] = None, accept: Optional[Accept] = None) -> Fetched:
+    """Result of the first attempt to return an accepted body, hedging slow ones.
+
+    Failing that, the body of the earliest attempt that returned one, else the last failure.
+    """
+    delay = _hedge_after if hedge_after is None else hedge_after
+    last: Fetched = (None, None, "fetch_error: no mirror")
+    weak: Dict[int, Fetched] = {}
+
+    def answers(index: int, result: Fetched) -> bool:
+        if not result[0]:
+            return False
+        if accept is None or accept(attempts[index][0], result):
+            return True
+        weak[index] = result
+        return False
+
+    if len(attempts) <= 1 or delay <= 0:
+        for index, (name, fetch) in enumerate(attempts):
+            last = _call(fetch)
+            if answers(index, last):
+                return last
+        return weak[min(weak)] if weak else last
+
+    pool = _executor()
+    names: Dict[Future, int] = {}
+    pending: Set[Future] = set()
+    started = 0
+
+    def start() -> None:
+        nonlocal started
+        fetch = attempts[started][1]
+        fut = pool.submit(_call, fetch)
+        names[fut] = started
+        pending.add(fut)
+        started += 1
+
+    start()
+    while pending:
+        done, _ = wait(pending, timeout=delay if started < len(attempts) else None, return_when=FIRST_COMPLETED)
+        if not done:
+            # nothing back within the threshold: hedge to the next mirror
+            metrics.inc("quotes_fetch_hedges_total", mirror=attempts[started][0])
+            start()
+            continue
+        for fut in done:
+            pending.discard(fut)
+            result = fut.result()
+            if answers(names[fut], result):
+                for other in pending:
+                    other.cancel()
+                metrics.inc("quotes_fetch_mirror_wins_total", mirror=attempts[names[fut]][0])
+                return result
+            last = result
+        if not pending and started < len(attempts):
+            start()
+    return weak[min(weak)] if weak else last
@@ -0,0 +1,200 @@
+"""
+Near-duplicate quote detection with MinHash + locality-sensitive hashing.
+
+Exact keys (`s.lower()[:400]`, `(peptide_name, quote.strip())`) let slightly
+reworded sentences, or the same sentence scraped from PMC and from the
+publisher copy, slip through. This index compares quotes by the Jaccard
+similarity of their character 5-gram shingles instead:
+
+  - each quote gets a 64-value MinHash signature
+  - signatures are split into 16 bands of 4 rows; quotes sharing any band
+    bucket become candidates, and candidates whose estimated similarity
+    reaches `threshold` count as duplicates
+  - lookups touch only the matching buckets, so they stay constant-time as
+    the final set grows
+
+Entries are namespaced (by peptide name) so the same sentence may still be
+used for two different peptides. The index for the final quote set is
+persisted in .cache/near-dup-index.json and re-synced with the final file on
+load, so only new quotes are hashed.
+
+Used by harvest_quotes.py / scholar_integration.py (reject candidates that
+duplicate each other or the final set) and promote_quotes.py.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import random
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - optional
+    np = None  # type: ignore
+
+INDEX_PATH = Path('.cache/near-dup-index.json')
+NUM_PERM = 64
+BANDS = 16
+THRESHOLD = 0.8
+SHINGLE_SIZE = 5
+
+_PRIME = 4294967291  # largest prime below 2**32
+_rng = random.Random(20250910)
+_PERMS: List[Tuple[int, int]] = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+def normalize_quote(text: str) -> str:
+    t = (text or '').lower()
+    t = re.sub(r"\[[^\]]+\]", " ", t)
+    t = re.sub(r"[^a-z0-9%]+", " ", t)
+    return re.sub(r"\s+", " ", t).strip()
+
+
+def quote_key(namespace: Optional[str], text: str) -> str:
+    raw = f"{(namespace or '').lower()}\x00{normalize_quote(text)}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> Set[int]:
+    t = normalize_quote(text)
+    if len(t) <= k:
+        grams = {t} if t else set()
+    else:
+        grams = {t[i : i + k] for i in range(len(t) - k + 1)}
+    return {int.from_bytes(hashlib.blake2b(g.encode('utf-8'), digest_size=4).digest(), 'big') for g in grams}
+
+
+def minhash(hashes: Set[int]) -> Tuple[int, ...]:
+    if not hashes:
+        return tuple([_PRIME] * NUM_PERM)
+    if np is not None:
+        x = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+        a = np.array([p[0] for p in _PERMS], dtype=np.uint64)[:, None]
+        b = np.array([p[1] for p in _PERMS], dtype=np.uint64)[:, None]
+        return tuple(int(v) for v in ((a * x + b) % np.uint64(_PRIME)).min(axis=1))
+    return tuple(min((a * x + b) % _PRIME for x in hashes) for a, b in _PERMS)
+
+
+def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / float(len(sig_a))
+
+
+class NearDupIndex:
+    def __init__(self, threshold: float = THRESHOLD) -> None:
+        self.threshold = threshold
+        self.entries: Dict[str, Tuple[str, Tuple[int, ...]]] = {}
+        self._buckets: Dict[Tuple[str, int, Tuple[int, ...]], Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def _bands(self, sig: Tuple[int, ...]) -> Iterable[Tuple[int, Tuple[int, ...]]]:
+        rows = NUM_PERM // BANDS
+        for b in range(BANDS):
+            yield b, sig[b * rows : (b + 1) * rows]
+
+    def _insert(self, key: str, ns: str, sig: Tuple[int, ...]) -> None:
+        self.entries[key] = (ns, sig)
+        for b, band in self._bands(sig):
+            self._buckets.setdefault((ns, b, band), set()).add(key)
+
+    def remove(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        ns, sig = entry
+        for b, band in self._bands(sig):
+            bucket = self._buckets.get((ns, b, band))
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[(ns, b, band)]
+
+    def query_signature(self, sig: Tuple[int, ...], namespace: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        ns = (namespace or '').lower()
+        best: Optional[Tuple[str, float]] = None
+        seen: Set[str] = set()
+        for b, band in self._bands(sig):
+            for key in self._buckets.get((ns, b, band), ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                sim = similarity(sig, self.entries[key][1])
+                if sim >= self.threshold and (best is None or sim > best[1]):
+                    best = (key, sim)
+        return best
+
+    def query(self, text: str, namespace: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """Return (key, similarity) of the closest near-duplicate, or None."""
+        return self.query_signature(minhash(shingles(text)), namespace)
+
+    def add(self, text: str, namespace: Optional[str] = None, key: Optional[str] = None) -> str:
+        key = key or quote_key(namespace, text)
+        if key not in self.entries:
+            self._insert(key, (namespace or '').lower(), minhash(shingles(text)))
+        return key
+
+    def add_if_new(self, text: str, namespace: Optional[str] = None) -> bool:
+        """Add `text` unless it near-duplicates an indexed quote; True if added."""
+        sig = minhash(shingles(text))
+        if self.query_signature(sig, namespace) is not None:
+            return False
+        self._insert(quote_key(namespace, text), (namespace or '').lower(), sig)
+        return True
+
+    def sync(self, quotes: Iterable[Dict[str, Any]]) -> None:
+        """Make the index mirror `quotes` (peptide_name/quote), hashing only new entries."""
+        wanted: Dict[str, Tuple[str, str]] = {}
+        for q in quotes:
+            text = (q.get('quote') or '').strip()
+            if text:
+                ns = q.get('peptide_name') or ''
+                wanted[quote_key(ns, text)] = (ns, text)
+        for key in [k for k in self.entries if k not in wanted]:
+            self.remove(key)
+        for key, (ns, text) in wanted.items():
+            if key not in self.entries:
+                self.add(text, ns, key)
+
+    @classmethod
+    def load(cls, path: Path = INDEX_PATH, threshold: float = THRESHOLD) -> 'NearDupIndex':
+        index = cls(threshold)
+        try:
+            doc = json.loads(Path(path).read_text(encoding='utf-8'))
+        except Exception:
+            return index
+        if doc.get('num_perm') != NUM_PERM or doc.get('bands') != BANDS or doc.get('shingle') != SHINGLE_SIZE:
+            return index
+        for key, e in doc.get('entries', {}).items():
+            index._insert(key, e['ns'], tuple(e['sig']))
+        return index
+
+    def save(self, path: Path = INDEX_PATH) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        doc = {
+            'num_perm': NUM_PERM,
+            'bands': BANDS,
+            'shingle': SHINGLE_SIZE,
+            'entries': {k: {'ns': ns, 'sig': list(sig)} for k, (ns, sig) in self.entries.items()},
+        }
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        tmp.write_text(json.dumps(doc, separators=(',', ':')), encoding='utf-8')
+        os.replace(tmp, path)
+
+
+def index_for_quotes(quotes: List[Dict[str, Any]], path: Path = INDEX_PATH, save: bool = True) -> NearDupIndex:
+    """Load the persisted index, sync it with `quotes` and write it back."""
+    index = NearDupIndex.load(path)
+    index.sync(quotes)
+    if save:
+        index.save(path)
+    return index
@@ -0,0 +1,288 @@
+"""
+Staged fetch -> parse/match pipeline shared by the validator and harvester.
+
+Network I/O and CPU work overlap instead of alternating on one thread:
+
+  items --> [async fetch stage] --> bounded queue --> [process pool] --> ordered results
+
+- The fetch stage runs `fetch(item)` on a small thread pool driven by asyncio
+  (urllib is blocking, so each fetch is awaited through run_in_executor).
+- Fetched payloads wait in a bounded asyncio.Queue; when the CPU stage falls
+  behind, fetching pauses (backpressure).
+- `work(item, fetched)` runs in a ProcessPoolExecutor, so it must be a
+  module-level (picklable) function. Pass workers=0 to run it in a thread
+  instead, e.g. for debugging.
+- Results are yielded in input order. At most `fetch_concurrency + queue_size`
+  items are in flight, so a consumer that stops early (closing the generator)
+  wastes little work; remaining fetches and pending CPU tasks are cancelled.
+
+Usage:
+  for result in imap(quotes, fetch_quote_source, analyze_fetched, fetch_concurrency=4):
+      ...
+
+`prefetch()` is the lighter variant for loops that score on the calling
+thread: it only reads ahead and downloads in the background.
+`prefetch_windows()` yields the downloads that are ready as one list, so
+such a loop can score them as a batch.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import queue
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from . import metrics  # type: ignore
+except Exception:  # when run as a script without package context
+    import metrics  # type: ignore
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, exc: BaseException) -> None:
+        self.exc = exc
+
+
+def imap(
+    items: Iterable[Any],
+    fetch: Callable[[Any], Any],
+    work: Callable[[Any, Any], Any],
+    fetch_concurrency: int = 4,
+    queue_size: int = 8,
+    workers: Optional[int] = None,
+) -> Iterator[Any]:
+    """Yield work(item, fetch(item)) for every item, in input order."""
+    with _running(items, fetch, work, fetch_concurrency, queue_size, workers) as out:
+        while True:
+            res = out.get()
+            if res is _DONE:
+                break
+            if isinstance(res, _Failure):
+                raise res.exc
+            yield res
+
+
+def _imap_batches(
+    items: Iterable[Any],
+    fetch: Callable[[Any], Any],
+    work: Callable[[Any, Any], Any],
+    fetch_concurrency: int,
+    queue_size: int,
+    workers: Optional[int],
+) -> Iterator[List[Any]]:
+    """imap, yielding every result already waiting (at least one) as a list."""
+    with _running(items, fetch, work, fetch_concurrency, queue_size, workers) as out:
+        while True:
+            batch = []
+            res = out.get()
+            while res is not _DONE and not isinstance(res, _Failure):
+                batch.append(res)
+                try:
+                    res = out.get_nowait()
+                except queue.Empty:
+                    res = None
+                    break
+            if batch:
+                yield batch
+            if res is _DONE:
+                break
+            if isinstance(res, _Failure):
+                raise res.exc
+
+
+@contextmanager
+def _running(
+    items: Iterable[Any],
+    fetch: Callable[[Any], Any],
+    work: Callable[[Any, Any], Any],
+    fetch_concurrency: int,
+    queue_size: int,
+    workers: Optional[int],
+) -> Iterator["queue.Queue[Any]"]:
+    """Run the pipeline on a background thread; yields its ordered output queue."""
+    out: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_size))
+    stop = threading.Event()
+    runner = threading.Thread(
+        target=lambda: asyncio.run(
+            _run(iter(items), fetch, work, out, stop, max(1, fetch_concurrency), max(1, queue_size), workers)
+        ),
+        name="pipeline",
+        daemon=True,
+    )
+    runner.start()
+    try:
+        yield out
+    finally:
+        stop.set()
+        # unblock the emitter if it is waiting on a full output queue
+        while runner.is_alive():
+            try:
+                out.get(timeout=0.05)
+            except queue.Empty:
+                pass
+        runner.join()
+
+
+async def _put(out: "queue.Queue[Any]", stop: threading.Event, value: Any) -> bool:
+    """Hand a value to the consumer thread without blocking the event loop."""
+    while not stop.is_set():
+        try:
+            out.put_nowait(value)
+            return True
+        except queue.Full:
+            await asyncio.sleep(0.01)
+    return False
+
+
+async def _run(
+    items: Iterator[Any],
+    fetch: Callable[[Any], Any],
+    work: Callable[[Any, Any], Any],
+    out: "queue.Queue[Any]",
+    stop: threading.Event,
+    fetch_concurrency: int,
+    queue_size: int,
+    workers: Optional[int],
+) -> None:
+    loop = asyncio.get_running_loop()
+    io_pool = ThreadPoolExecutor(max_workers=fetch_concurrency + 1, thread_name_prefix="pipeline-fetch")
+    cpu_pool: Executor = (
+        ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-work")
+        if workers == 0
+        else ProcessPoolExecutor(max_workers=workers)
+    )
+    cpu_slots = 1 if workers == 0 else (workers or os.cpu_count() or 1)
+    # metrics recorded in worker processes are sent back with each result
+    collect = workers != 0 and metrics.enabled()
+    fetched: "asyncio.Queue[Any]" = asyncio.Queue(maxsize=queue_size)
+    # bounds the number of items between "read from input" and "emitted"
+    window = asyncio.Semaphore(fetch_concurrency + queue_size)
+    fetch_slots = asyncio.Semaphore(fetch_concurrency)
+    results: Dict[int, Any] = {}
+    ready = asyncio.Event()
+    total: Optional[int] = None
+    tasks = set()
+
+    async def fetch_one(idx: int, item: Any) -> None:
+        async with fetch_slots:
+            try:
+                payload = await loop.run_in_executor(io_pool, fetch, item)
+            except Exception as e:
+                results[idx] = _Failure(e)
+                ready.set()
+                return
+        await fetched.put((idx, item, payload))
+
+    async def feeder() -> None:
+        nonlocal total
+        idx = 0
+        while not stop.is_set():
+            await window.acquire()
+            # the input may itself block (e.g. a paginated search iterator)
+            try:
+                item = await loop.run_in_executor(io_pool, next, items, _DONE)
+            except Exception as e:
+                results[idx] = _Failure(e)
+                idx += 1
+                break
+            if item is _DONE:
+                window.release()
+                break
+            task = asyncio.create_task(fetch_one(idx, item))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            idx += 1
+        total = idx
+        ready.set()
+
+    async def cpu_stage() -> None:
+        while True:
+            idx, item, payload = await fetched.get()
+            try:
+                if collect:
+                    results[idx], snap = await loop.run_in_executor(cpu_pool, metrics.call_collecting, work, item, payload)
+                    metrics.merge(snap)
+                else:
+                    results[idx] = await loop.run_in_executor(cpu_pool, work, item, payload)
+            except Exception as e:
+                results[idx] = _Failure(e)
+            ready.set()
+
+    async def emitter() -> None:
+        nxt = 0
+        while not stop.is_set():
+            if nxt in results:
+                if not await _put(out, stop, results.pop(nxt)):
+                    return
+                nxt += 1
+                window.release()
+                continue
+            if total is not None and nxt >= total:
+                await _put(out, stop, _DONE)
+                return
+            ready.clear()
+            try:
+                # wake up periodically so a consumer-side stop is noticed
+                await asyncio.wait_for(ready.wait(), timeout=0.1)
+            except asyncio.TimeoutError:
+                pass
+
+    feed_task = asyncio.create_task(feeder())
+    cpu_tasks = [asyncio.create_task(cpu_stage()) for _ in range(cpu_slots)]
+    try:
+        await emitter()
+    except BaseException as e:  # pragma: no cover - defensive
+        await _put(out, stop, _Failure(e))
+    finally:
+        feed_task.cancel()
+        for t in list(tasks) + cpu_tasks:
+            t.cancel()
+        await asyncio.gather(feed_task, *tasks, *cpu_tasks, return_exceptions=True)
+        cpu_pool.shutdown(wait=False, cancel_futures=True)
+        io_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def prefetch(
+    items: Iterable[Any],
+    fetch: Callable[[Any], Any],
+    lookahead: int = 4,
+) -> Iterator[Tuple[Any, Any]]:
+    """Yield (item, fetch(item)) in order while reading ahead up to `lookahead` items.
+
+    For loops that do their own CPU work on the consumer thread (e.g. Scholar
+    harvesting): the next results are pulled from `items` and downloaded in
+    the background while the current one is being scored. Closing the
+    generator stops the read-ahead and cancels fetches that have not started.
+    lookahead <= 0 fetches serially.
+    """
+    if lookahead <= 0:
+        for item in items:
+            yield item, fetch(item)
+        return
+    yield from imap(items, fetch, _pair, fetch_concurrency=lookahead, queue_size=lookahead, workers=0)
+
+
+def prefetch_windows(
+    items: Iterable[Any],
+    fetch: Callable[[Any], Any],
+    lookahead: int = 4,
+) -> Iterator[List[Tuple[Any, Any]]]:
+    """prefetch(), yielding the (item, fetched) pairs downloaded so far, in order, as one list.
+
+    Each list holds at least one pair; lookahead <= 0 fetches serially, one
+    pair per list.
+    """
+    if lookahead <= 0:
+        for item in items:
+            yield [(item, fetch(item))]
+        return
+    yield from _imap_batches(items, fetch, _pair, lookahead, lookahead, 0)
+
+
+def _pair(item: Any, fetched: Any) -> Tuple[Any, Any]:
+    return item, fetched
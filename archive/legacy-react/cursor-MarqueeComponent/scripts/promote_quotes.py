@@ -12,15 +12,35 @@ Writes:
 
 Rules:
   - Only benefit-focused sentences; reject negatives and speculative language.
-  - No duplicates (same peptide + quote text) in final.
+  - No duplicates in final: a staging quote is dropped when it is a near
+    duplicate (MinHash, see near_dup.py) of a final quote for the same peptide.
   - Cap promotions per run if desired (default unlimited here).
+
+With --store PATH the same rules run against the SQLite quote store
+(quote_store.py): promoted rows are moved to the final collection and the
+rest of staging is deleted row by row, without rewriting either JSON file.
+Run `quote_store.py export` afterwards to refresh the files.
+
+The coverage index (quote_coverage.py) is updated with the promoted quotes
+and peptide-quotes.progress.json rewritten when the JSON files change.
 """
 from __future__ import annotations
 
+import argparse
 import json
 import re
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
+
+try:
+    from .near_dup import index_for_quotes  # type: ignore
+except Exception:
+    from near_dup import index_for_quotes  # type: ignore
+
+try:
+    from .quote_coverage import CoverageIndex, update_progress  # type: ignore
+except Exception:
+    from quote_coverage import CoverageIndex, update_progress  # type: ignore
 
 DATA_DIR = Path('src/data')
 STAGING = DATA_DIR / 'peptide-quotes.staging.json'
@@ -51,36 +71,73 @@ def is_negative(q: str) -> bool:
         return True
     return False
 
-def main() -> int:
-    staging = load_json(STAGING)
-    final = load_json(FINAL)
+def should_promote(q: Dict[str, Any], seen: Any) -> bool:
+    pep = q.get('peptide_name','')
+    qt = (q.get('quote') or '').strip()
+    if not qt or is_negative(qt):
+        return False
+    if seen.query(qt, pep) is not None:
+        # already in final (or a near-duplicate of it); drop from staging
+        return False
+    # Enforce allowed peptide list
+    if ALLOWED and pep not in ALLOWED:
+        return False
+    return True
+
+def promote_in_store(store_path: Path) -> int:
+    try:
+        from .quote_store import QuoteStore  # type: ignore
+    except Exception:
+        from quote_store import QuoteStore  # type: ignore
+    with QuoteStore(store_path) as store, store.transaction():
+        seen = index_for_quotes(store.quote_texts('final'), save=False)
+        next_id = store.max_quote_id('final') + 1
+        promoted = 0
+        for rowid, q in store.quotes('staging'):
+            if not should_promote(q, seen):
+                store.delete(rowid)
+                continue
+            changes: Dict[str, Any] = {'verification_status': 'Approved - Benefit-focused'}
+            if not isinstance(q.get('id'), int):
+                changes['id'] = next_id
+                next_id += 1
+            store.move(rowid, 'final', changes)
+            seen.add((q.get('quote') or '').strip(), q.get('peptide_name',''))
+            promoted += 1
+        total = len(store.quote_texts('final'))
+    seen.save()
+    print(f'Promoted {promoted} quotes. Final now has {total} quotes.')
+    return 0
 
+def promote(
+    staging: Dict[str, Any],
+    final: Dict[str, Any],
+    save_index: bool = True,
+    coverage: Optional[CoverageIndex] = None,
+) -> int:
+    """Move approved staging quotes into final, in memory; returns the number promoted.
+
+    `coverage`, if given, is updated to match (promoted quotes counted in
+    final, staging emptied).
+    """
     s_quotes: List[Dict[str, Any]] = staging.get('quotes', [])
     f_quotes: List[Dict[str, Any]] = final.get('quotes', [])
 
-    # Build dedupe set
-    seen = set((q.get('peptide_name',''), (q.get('quote','') or '').strip()) for q in f_quotes)
+    # Near-duplicate index over final (persisted; only new quotes are hashed)
+    seen = index_for_quotes(f_quotes, save=False)
 
     promoted: List[Dict[str, Any]] = []
-    kept_staging: List[Dict[str, Any]] = []
 
     for q in s_quotes:
+        if not should_promote(q, seen):
+            continue
         pep = q.get('peptide_name','')
         qt = (q.get('quote') or '').strip()
-        if not qt or is_negative(qt):
-            continue
-        key = (pep, qt)
-        if key in seen:
-            # already in final; drop from staging
-            continue
-        # Enforce allowed peptide list
-        if ALLOWED and pep not in ALLOWED:
-            continue
         # Promote
         nq = dict(q)
         nq['verification_status'] = 'Approved - Benefit-focused'
         promoted.append(nq)
-        seen.add(key)
+        seen.add(qt, pep)
 
     # Append promoted to final with new ids continuing sequence
     next_id = 1
@@ -92,17 +149,38 @@ def main() -> int:
             q['id'] = next_id
             next_id += 1
         f_quotes.append(q)
-
-    # Write final and staging (staging cleared of promoted and negatives)
     final['quotes'] = f_quotes
-    FINAL.write_text(json.dumps(final, indent=2), encoding='utf-8')
 
     # Keep only non-promoted and non-negative in staging
     # Note: Since we promoted all positives, we clear staging to keep it lean
     staging['quotes'] = []
+    if coverage is not None:
+        coverage.add('final', promoted)
+        coverage.replace('staging', [])
+    if save_index:
+        seen.save()
+    return len(promoted)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--store', default=None, help='Operate on this SQLite quote store instead of the JSON files')
+    args = ap.parse_args(argv)
+    if args.store:
+        return promote_in_store(Path(args.store))
+
+    coverage = CoverageIndex.load()
+    staging = load_json(STAGING)
+    final = load_json(FINAL)
+    promoted = promote(staging, final, coverage=coverage)
+
+    # Write final and staging (staging cleared of promoted and negatives)
+    FINAL.write_text(json.dumps(final, indent=2), encoding='utf-8')
     STAGING.write_text(json.dumps(staging, indent=2), encoding='utf-8')
+    coverage.mark_written('final', FINAL)
+    coverage.mark_written('staging', STAGING)
+    update_progress(coverage)
 
-    print(f'Promoted {len(promoted)} quotes. Final now has {len(f_quotes)} quotes.')
+    print(f'Promoted {promoted} quotes. Final now has {len(final["quotes"])} quotes.')
     return 0
 ALLOWED = set()
 try:
@@ -0,0 +1,151 @@
+"""
+Historical yield statistics for Scholar query templates and source domains.
+
+`_peptide_queries` / `_build_query` (scholar_integration.py) generate a fixed
+list of query templates. Some of them (e.g. the broad queries without a site
+restriction) rarely produce an accepted quote for some peptide classes but
+still cost a Scholar search plus several article downloads. QueryStats
+records, per template and per peptide class (the `category` in
+peptide-compounds.json), how many requests were spent and how many proposals
+were accepted, plus the same numbers per source domain (also per class: a
+domain useless for obscure peptides can still be the best one for others),
+and uses them to:
+
+  - order templates by smoothed yield, accepted / (searches + fetches),
+    falling back to the template's yield across all classes while a class
+    has little data
+  - prune templates (and domains) that reached PRUNE_AFTER requests without
+    a single accepted proposal; at least one template is always kept
+  - still retry each pruned template/domain on one run in EXPLORE_EVERY
+    (runs are counted in the state file; arms are spread over the runs), so
+    an arm that starts producing quotes again can recover
+
+With deterministic=True (harvest_quotes.py --deterministic) the stored
+statistics are ignored: templates keep their built-in order and nothing is
+pruned. Results are still recorded. State lives in .cache/query-stats.json.
+"""
+from __future__ import annotations
+
+import json
+import os
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from . import metrics  # type: ignore
+except Exception:  # when run as a script without package context
+    import metrics  # type: ignore
+
+STATS_PATH = Path('.cache/query-stats.json')
+COMPOUNDS_PATH = Path('src/data/peptide-compounds.json')
+PRIOR_WEIGHT = 5.0  # pseudo-requests of the fallback yield mixed into a template's own yield
+PRUNE_AFTER = 30    # requests without an accepted proposal before a template/domain is dropped
+EXPLORE_EVERY = 5   # a pruned template/domain is still tried on one run in this many
+
+Counts = Dict[str, int]
+
+
+def load_peptide_classes(path: Path = COMPOUNDS_PATH) -> Dict[str, str]:
+    """Map lowercased peptide name -> category from peptide-compounds.json."""
+    try:
+        doc = json.loads(Path(path).read_text(encoding='utf-8'))
+    except Exception:
+        return {}
+    return {p['name'].lower(): p.get('category') or 'unknown' for p in doc.get('peptides', []) if p.get('name')}
+
+
+def _cost(c: Counts) -> int:
+    return c.get('queries', 0) + c.get('fetches', 0)
+
+
+class QueryStats:
+    def __init__(
+        self,
+        path: Optional[Path] = STATS_PATH,
+        deterministic: bool = False,
+        classes: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.path = Path(path) if path is not None else None
+        self.deterministic = deterministic
+        self.classes = classes if classes is not None else load_peptide_classes()
+        self.templates: Dict[str, Dict[str, Counts]] = {}
+        self.domains: Dict[str, Dict[str, Counts]] = {}
+        self.runs = 0  # completed runs (saves); selects the runs that retry pruned arms
+        if self.path is not None and self.path.exists():
+            try:
+                doc = json.loads(self.path.read_text(encoding='utf-8'))
+                self.templates = doc.get('templates', {})
+                self.domains = doc.get('domains', {})
+                self.runs = int(doc.get('runs', 0))
+            except Exception:
+                pass
+
+    def peptide_class(self, peptide: Optional[str]) -> str:
+        return self.classes.get((peptide or '').lower(), 'unknown')
+
+    def _counts(self, cls: str, template: str) -> Counts:
+        return self.templates.setdefault(cls, {}).setdefault(template, {'queries': 0, 'fetches': 0, 'accepted': 0})
+
+    # --- recording --------------------------------------------------------
+
+    def record_query(self, template: str, peptide: Optional[str]) -> None:
+        self._counts(self.peptide_class(peptide), template)['queries'] += 1
+
+    def record_fetch(self, template: str, peptide: Optional[str], url: str, accepted: int) -> None:
+        """One article downloaded for `template`, yielding `accepted` proposals."""
+        c = self._counts(self.peptide_class(peptide), template)
+        c['fetches'] += 1
+        c['accepted'] += accepted
+        d = self.domains.setdefault(self.peptide_class(peptide), {}).setdefault(metrics.host_of(url), {'fetches': 0, 'accepted': 0})
+        d['fetches'] += 1
+        d['accepted'] += accepted
+
+    # --- decisions --------------------------------------------------------
+
+    def _overall(self, template: str) -> Tuple[int, int]:
+        accepted = cost = 0
+        for per_class in self.templates.values():
+            c = per_class.get(template)
+            if c:
+                accepted += c.get('accepted', 0)
+                cost += _cost(c)
+        return accepted, cost
+
+    def template_yield(self, template: str, peptide: Optional[str]) -> float:
+        all_acc, all_cost = self._overall(template)
+        prior = (all_acc + 1.0) / (all_cost + PRIOR_WEIGHT)
+        c = self.templates.get(self.peptide_class(peptide), {}).get(template, {})
+        return (c.get('accepted', 0) + PRIOR_WEIGHT * prior) / (_cost(c) + PRIOR_WEIGHT)
+
+    def _exploring(self, arm: str) -> bool:
+        """Whether this run retries the pruned template/domain `arm`."""
+        return (self.runs + zlib.crc32(arm.encode('utf-8'))) % EXPLORE_EVERY == 0
+
+    def is_pruned(self, template: str, peptide: Optional[str]) -> bool:
+        c = self.templates.get(self.peptide_class(peptide), {}).get(template, {})
+        return _cost(c) >= PRUNE_AFTER and c.get('accepted', 0) == 0 and not self._exploring(template)
+
+    def order(self, templates: List[Tuple[str, str]], peptide: Optional[str]) -> List[Tuple[str, str]]:
+        """Reorder/prune (template, query) pairs for `peptide`, best expected yield first."""
+        if self.deterministic or not templates:
+            return list(templates)
+        kept = [t for t in templates if not self.is_pruned(t[0], peptide)] or list(templates[:1])
+        # stable sort: ties keep the built-in order
+        return sorted(kept, key=lambda t: -self.template_yield(t[0], peptide))
+
+    def skip_domain(self, url: str, peptide: Optional[str]) -> bool:
+        if self.deterministic:
+            return False
+        domain = metrics.host_of(url)
+        d = self.domains.get(self.peptide_class(peptide), {}).get(domain, {})
+        return d.get('fetches', 0) >= PRUNE_AFTER and d.get('accepted', 0) == 0 and not self._exploring(domain)
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + '.tmp')
+        doc = {'templates': self.templates, 'domains': self.domains, 'runs': self.runs + 1}
+        tmp.write_text(json.dumps(doc, indent=2, sort_keys=True), encoding='utf-8')
+        os.replace(tmp, self.path)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Per-peptide quote coverage index and src/data/peptide-quotes.progress.json.
+
+The progress file says how many peptides are Complete / In Progress /
+Outstanding. Rather than scanning every quote file for it, CoverageIndex
+keeps the counts per collection (final, staging):
+
+  peptides   {peptide_name: quotes}
+  statuses   {verification_status: quotes}
+
+and is updated with deltas by the scripts that change the collections:
+promote_quotes.py (promoted quotes move staging -> final), cleanup_animals.py
+(removed quotes), harvest_quotes.py (staging rewritten) and maintain.py, plus
+`quote_store.py export` when the JSON files are regenerated from the store.
+Coverage questions (a peptide's verified count, the progress summary, the
+harvest targets) are then answered from the counts, never from the quote
+files.
+
+The index lives in .cache/coverage-index.json with the mtime/size of each
+quote file it describes; a file changed by anything else (a hand edit, a
+git checkout) is recounted once on load, like the near-duplicate index.
+
+A peptide's verified total is its number of quotes in the final collection;
+it is Complete at TARGET_REQUIRED quotes, In Progress with at least one and
+Outstanding with none.
+
+Run:
+  python3 scripts/quote_coverage.py             # sync the index, write progress.json
+  python3 scripts/quote_coverage.py --rebuild   # recount both collections first
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+INDEX_PATH = Path('.cache/coverage-index.json')
+DATA_DIR = Path('src/data')
+FILES = {
+    'final': DATA_DIR / 'peptide-quotes.final.json',
+    'staging': DATA_DIR / 'peptide-quotes.staging.json',
+}
+COMPOUNDS_PATH = DATA_DIR / 'peptide-compounds.json'
+PROGRESS_PATH = DATA_DIR / 'peptide-quotes.progress.json'
+TARGET_REQUIRED = 3
+
+COMPLETE = 'Complete'
+IN_PROGRESS = 'In Progress'
+OUTSTANDING = 'Outstanding'
+
+
+def _stamp(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        st = Path(path).stat()
+    except OSError:
+        return None
+    return {'path': str(path), 'mtime_ns': st.st_mtime_ns, 'size': st.st_size}
+
+
+def _bump(counts: Dict[str, int], key: Optional[str], delta: int) -> None:
+    if not key:
+        return
+    n = counts.get(key, 0) + delta
+    if n > 0:
+        counts[key] = n
+    else:
+        counts.pop(key, None)
+
+
+def peptide_names(path: Path = COMPOUNDS_PATH) -> List[str]:
+    """Peptide names in peptide-compounds.json order."""
+    try:
+        doc = json.loads(Path(path).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return []
+    return [p['name'] for p in doc.get('peptides', []) if p.get('name')]
+
+
+class CoverageIndex:
+    def __init__(self, path: Optional[Path] = INDEX_PATH) -> None:
+        self.path = Path(path) if path is not None else None
+        self.peptides: Dict[str, Dict[str, int]] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+        self.stamps: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    # --- updates ----------------------------------------------------------
+
+    def _apply(self, collection: str, quotes: Iterable[Dict[str, Any]], sign: int) -> None:
+        peptides = self.peptides.setdefault(collection, {})
+        statuses = self.statuses.setdefault(collection, {})
+        for q in quotes:
+            _bump(peptides, q.get('peptide_name'), sign)
+            _bump(statuses, q.get('verification_status'), sign)
+
+    def add(self, collection: str, quotes: Iterable[Dict[str, Any]]) -> None:
+        self._apply(collection, quotes, 1)
+
+    def remove(self, collection: str, quotes: Iterable[Dict[str, Any]]) -> None:
+        self._apply(collection, quotes, -1)
+
+    def move(self, src: str, dst: str, before: Dict[str, Any], after: Dict[str, Any]) -> None:
+        """A quote leaving `src` as `before` and entering `dst` as `after` (e.g. a promotion)."""
+        self.remove(src, [before])
+        self.add(dst, [after])
+
+    def replace(self, collection: str, quotes: Iterable[Dict[str, Any]]) -> None:
+        """Recount `collection` from its complete quote list."""
+        self.peptides[collection] = {}
+        self.statuses[collection] = {}
+        self.add(collection, quotes)
+
+    def sync(self, collection: str, path: Path) -> bool:
+        """Recount `collection` from `path` if the file changed since the index last saw it."""
+        stamp = _stamp(path)
+        if collection in self.peptides and stamp == self.stamps.get(collection):
+            return False
+        quotes: List[Dict[str, Any]] = []
+        if stamp is not None:
+            try:
+                quotes = json.loads(Path(path).read_text(encoding='utf-8')).get('quotes', [])
+            except ValueError:
+                quotes = []
+        self.replace(collection, quotes)
+        self.stamps[collection] = stamp
+        return True
+
+    def mark_written(self, collection: str, path: Path) -> None:
+        """Record that `path` now holds exactly what the index counts for `collection`."""
+        self.stamps[collection] = _stamp(path)
+
+    # --- queries ----------------------------------------------------------
+
+    def count(self, peptide: str, collection: str = 'final') -> int:
+        return self.peptides.get(collection, {}).get(peptide, 0)
+
+    def status(self, peptide: str, target: int = TARGET_REQUIRED) -> str:
+        n = self.count(peptide)
+        return COMPLETE if n >= target else IN_PROGRESS if n > 0 else OUTSTANDING
+
+    def targets(self, names: List[str], limit: int, target: int = TARGET_REQUIRED) -> List[str]:
+        """Peptides short of `target` verified quotes, least covered first (fewest staged breaks ties)."""
+        focus = [n for n in names if self.count(n) < target]
+        focus.sort(key=lambda n: (self.count(n), self.count(n, 'staging')))
+        return focus[: max(1, limit)]
+
+    def progress(self, names: List[str], target: int = TARGET_REQUIRED) -> Dict[str, Any]:
+        """The peptide-quotes.progress.json document for the peptides in `names`."""
+        items = []
+        for name in names:
+            n = self.count(name)
+            items.append({
+                'peptide': name,
+                'verified_total': n,
+                'target_required': target,
+                'remaining': max(0, target - n),
+                'status': self.status(name, target),
+            })
+        by_status = {s: sum(1 for it in items if it['status'] == s) for s in (COMPLETE, IN_PROGRESS, OUTSTANDING)}
+        return {
+            'metadata': {
+                'title': 'Peptide Quote Coverage Progress',
+                'summary': {
+                    'total_peptides': len(items),
+                    'completed': by_status[COMPLETE],
+                    'in_progress': by_status[IN_PROGRESS],
+                    'outstanding': by_status[OUTSTANDING],
+                    'covered_peptides': sorted(it['peptide'] for it in items if it['verified_total'] > 0),
+                },
+            },
+            'items': items,
+        }
+
+    # --- persistence ------------------------------------------------------
+
+    @classmethod
+    def load(cls, path: Optional[Path] = INDEX_PATH, files: Optional[Dict[str, Path]] = None) -> 'CoverageIndex':
+        """Load the index and re-sync it with the quote `files` ({collection: path}, default FILES)."""
+        index = cls(path)
+        if index.path is not None and index.path.exists():
+            try:
+                doc = json.loads(index.path.read_text(encoding='utf-8'))
+                index.peptides = doc.get('peptides', {})
+                index.statuses = doc.get('statuses', {})
+                index.stamps = doc.get('stamps', {})
+            except Exception:
+                pass
+        for collection, file_path in (FILES if files is None else files).items():
+            index.sync(collection, file_path)
+        return index
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        doc = {'peptides': self.peptides, 'statuses': self.statuses, 'stamps': self.stamps}
+        tmp = self.path.with_suffix(self.path.suffix + '.tmp')
+        tmp.write_text(json.dumps(doc, indent=1, sort_keys=True), encoding='utf-8')
+        os.replace(tmp, self.path)
+
+
+def write_progress(
+    index: CoverageIndex,
+    names: List[str],
+    path: Path = PROGRESS_PATH,
+    target: int = TARGET_REQUIRED,
+) -> bool:
+    """Write the progress file for `names` from the index; returns False if it was already current."""
+    text = json.dumps(index.progress(names, target), indent=2)
+    path = Path(path)
+    if path.exists() and path.read_text(encoding='utf-8') == text:
+        return False
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    tmp.write_text(text, encoding='utf-8')
+    os.replace(tmp, path)
+    return True
+
+
+def update_progress(index: CoverageIndex, path: Path = PROGRESS_PATH, compounds: Path = COMPOUNDS_PATH) -> None:
+    """Save the index and refresh the progress file; the common tail of the maintenance scripts."""
+    index.save()
+    if write_progress(index, peptide_names(compounds), path):
+        print(f'Wrote {path}')
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description='Sync the quote coverage index and write peptide-quotes.progress.json')
+    ap.add_argument('--index', default=str(INDEX_PATH), help='Coverage index path')
+    ap.add_argument('--out', default=str(PROGRESS_PATH), help='Progress file to write')
+    ap.add_argument('--target', type=int, default=TARGET_REQUIRED, help='Verified quotes needed for a peptide to be Complete')
+    ap.add_argument('--rebuild', action='store_true', help='Recount both collections from the quote files')
+    args = ap.parse_args(argv)
+
+    if args.rebuild:
+        index = CoverageIndex(Path(args.index))
+        for collection, file_path in FILES.items():
+            index.sync(collection, file_path)
+    else:
+        index = CoverageIndex.load(Path(args.index))
+    index.save()
+    out = Path(args.out)
+    changed = write_progress(index, peptide_names(), out, target=args.target)
+    summary = index.progress(peptide_names(), args.target)['metadata']['summary']
+    print(
+        f"{summary['total_peptides']} peptides: {summary['completed']} complete, "
+        f"{summary['in_progress']} in progress, {summary['outstanding']} outstanding"
+    )
+    print(f"{'Wrote' if changed else 'Unchanged'} {out}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
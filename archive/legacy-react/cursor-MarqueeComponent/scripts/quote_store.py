@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+SQLite-backed quote store for the staging and final quote collections.
+
+The JSON files stay the format the frontend consumes, but maintenance passes
+(promote_quotes.py, update_authors.py, cleanup_animals.py with --store) can
+work on a transactional store instead of loading and rewriting the whole
+file: each quote is one row, and only changed rows are written.
+
+Schema:
+  documents(collection, metadata)      file-level "metadata" object per collection
+  quotes(rowid, collection, position,  one row per quote; `doc` holds the full quote
+         quote_id, peptide_name, quote, object (original key order), the other columns
+         scientist, source,            are denormalized copies kept in sync for
+         verification_status, doc)     indexed lookups
+Indexes on (collection, peptide_name), source and (collection, verification_status).
+
+Run:
+  python3 scripts/quote_store.py import            # JSON files -> .cache/quotes.sqlite3
+  python3 scripts/promote_quotes.py --store .cache/quotes.sqlite3
+  python3 scripts/quote_store.py export            # store -> JSON files for the frontend
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DATA_DIR = Path('src/data')
+STORE_PATH = Path('.cache/quotes.sqlite3')
+COLLECTIONS = {
+    'final': DATA_DIR / 'peptide-quotes.final.json',
+    'staging': DATA_DIR / 'peptide-quotes.staging.json',
+}
+
+_COLUMNS = ('quote_id', 'peptide_name', 'quote', 'scientist', 'source', 'verification_status')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    collection TEXT PRIMARY KEY,
+    metadata TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS quotes (
+    rowid INTEGER PRIMARY KEY,
+    collection TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    quote_id,
+    peptide_name TEXT,
+    quote TEXT,
+    scientist TEXT,
+    source TEXT,
+    verification_status TEXT,
+    doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_quotes_collection ON quotes(collection, position);
+CREATE INDEX IF NOT EXISTS idx_quotes_peptide ON quotes(collection, peptide_name);
+CREATE INDEX IF NOT EXISTS idx_quotes_source ON quotes(source);
+CREATE INDEX IF NOT EXISTS idx_quotes_status ON quotes(collection, verification_status);
+"""
+
+
+def _columns(q: Dict[str, Any]) -> Tuple[Any, ...]:
+    qid = q.get('id')
+    return (
+        qid if isinstance(qid, (int, str)) or qid is None else json.dumps(qid),
+        q.get('peptide_name'),
+        q.get('quote'),
+        q.get('scientist'),
+        q.get('source'),
+        q.get('verification_status'),
+    )
+
+
+class QuoteStore:
+    def __init__(self, path: Path = STORE_PATH) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> 'QuoteStore':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator['QuoteStore']:
+        """Commit every change made inside the block, or none of them."""
+        with self.conn:
+            yield self
+
+    # --- collection-level -------------------------------------------------
+
+    def metadata(self, collection: str) -> Dict[str, Any]:
+        row = self.conn.execute('SELECT metadata FROM documents WHERE collection = ?', (collection,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def set_metadata(self, collection: str, metadata: Dict[str, Any]) -> None:
+        self.conn.execute(
+            'INSERT INTO documents(collection, metadata) VALUES (?, ?) '
+            'ON CONFLICT(collection) DO UPDATE SET metadata = excluded.metadata',
+            (collection, json.dumps(metadata)),
+        )
+
+    def import_json(self, collection: str, path: Path) -> int:
+        """Replace `collection` with the contents of a quotes JSON file."""
+        doc = json.loads(Path(path).read_text(encoding='utf-8')) if Path(path).exists() else {}
+        quotes = doc.get('quotes', [])
+        with self.transaction():
+            self.conn.execute('DELETE FROM quotes WHERE collection = ?', (collection,))
+            self.set_metadata(collection, doc.get('metadata', {}))
+            self.conn.executemany(
+                'INSERT INTO quotes(collection, position, quote_id, peptide_name, quote, scientist, source, verification_status, doc) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [(collection, i) + _columns(q) + (json.dumps(q),) for i, q in enumerate(quotes)],
+            )
+        return len(quotes)
+
+    def to_document(self, collection: str) -> Dict[str, Any]:
+        return {'metadata': self.metadata(collection), 'quotes': [q for _, q in self.quotes(collection)]}
+
+    def export_json(self, collection: str, path: Path) -> bool:
+        """Write `collection` in the frontend JSON format; returns False if the file was already current."""
+        text = json.dumps(self.to_document(collection), indent=2)
+        path = Path(path)
+        if path.exists() and path.read_text(encoding='utf-8') == text:
+            return False
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        tmp.write_text(text, encoding='utf-8')
+        os.replace(tmp, path)
+        return True
+
+    # --- row-level --------------------------------------------------------
+
+    def quotes(self, collection: str, where: str = '', params: Tuple[Any, ...] = ()) -> List[Tuple[int, Dict[str, Any]]]:
+        """(rowid, quote) pairs in file order, optionally filtered by an SQL condition."""
+        sql = 'SELECT rowid, doc FROM quotes WHERE collection = ?'
+        if where:
+            sql += f' AND ({where})'
+        sql += ' ORDER BY position'
+        return [(rowid, json.loads(doc)) for rowid, doc in self.conn.execute(sql, (collection,) + tuple(params))]
+
+    def by_peptide(self, collection: str, peptide: str) -> List[Tuple[int, Dict[str, Any]]]:
+        return self.quotes(collection, 'peptide_name = ?', (peptide,))
+
+    def by_source(self, collection: str, source: str) -> List[Tuple[int, Dict[str, Any]]]:
+        return self.quotes(collection, 'source = ?', (source,))
+
+    def by_status(self, collection: str, status: str) -> List[Tuple[int, Dict[str, Any]]]:
+        return self.quotes(collection, 'verification_status = ?', (status,))
+
+    def quote_texts(self, collection: str) -> List[Dict[str, Any]]:
+        """Just peptide_name/quote for every row, e.g. to sync the near-duplicate index."""
+        return [
+            {'peptide_name': pep, 'quote': quote}
+            for pep, quote in self.conn.execute(
+                'SELECT peptide_name, quote FROM quotes WHERE collection = ? ORDER BY position', (collection,)
+            )
+        ]
+
+    def get(self, rowid: int) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute('SELECT doc FROM quotes WHERE rowid = ?', (rowid,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def insert(self, collection: str, quote: Dict[str, Any]) -> int:
+        pos = self.conn.execute(
+            'SELECT COALESCE(MAX(position), -1) + 1 FROM quotes WHERE collection = ?', (collection,)
+        ).fetchone()[0]
+        cur = self.conn.execute(
+            'INSERT INTO quotes(collection, position, quote_id, peptide_name, quote, scientist, source, verification_status, doc) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (collection, pos) + _columns(quote) + (json.dumps(quote),),
+        )
+        return int(cur.lastrowid)
+
+    def update(self, rowid: int, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply field changes to one quote and return the updated quote."""
+        q = self.get(rowid)
+        if q is None:
+            raise KeyError(rowid)
+        q.update(changes)
+        self.conn.execute(
+            f"UPDATE quotes SET {', '.join(c + ' = ?' for c in _COLUMNS)}, doc = ? WHERE rowid = ?",
+            _columns(q) + (json.dumps(q), rowid),
+        )
+        return q
+
+    def delete(self, rowid: int) -> None:
+        self.conn.execute('DELETE FROM quotes WHERE rowid = ?', (rowid,))
+
+    def move(self, rowid: int, collection: str, changes: Optional[Dict[str, Any]] = None) -> None:
+        """Move a quote to the end of another collection (e.g. staging -> final)."""
+        q = self.update(rowid, changes or {})
+        pos = self.conn.execute(
+            'SELECT COALESCE(MAX(position), -1) + 1 FROM quotes WHERE collection = ?', (collection,)
+        ).fetchone()[0]
+        self.conn.execute('UPDATE quotes SET collection = ?, position = ? WHERE rowid = ?', (collection, pos, rowid))
+
+    def max_quote_id(self, collection: str) -> int:
+        row = self.conn.execute(
+            "SELECT MAX(quote_id) FROM quotes WHERE collection = ? AND typeof(quote_id) = 'integer'", (collection,)
+        ).fetchone()
+        return int(row[0] or 0)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description='Import/export the quote store')
+    ap.add_argument('command', choices=['import', 'export'])
+    ap.add_argument('--store', default=str(STORE_PATH), help='SQLite store path')
+    ap.add_argument('--collections', nargs='+', default=list(COLLECTIONS), choices=list(COLLECTIONS))
+    args = ap.parse_args(argv)
+
+    coverage = None
+    if args.command == 'export':
+        try:
+            from .quote_coverage import CoverageIndex, update_progress  # type: ignore
+        except Exception:
+            from quote_coverage import CoverageIndex, update_progress  # type: ignore
+        coverage = CoverageIndex.load()
+    with QuoteStore(Path(args.store)) as store:
+        for name in args.collections:
+            path = COLLECTIONS[name]
+            if args.command == 'import':
+                n = store.import_json(name, path)
+                print(f'Imported {n} quotes from {path} into {args.store} [{name}]')
+            else:
+                changed = store.export_json(name, path)
+                print(f"{'Wrote' if changed else 'Unchanged'} {path}")
+    if coverage is not None:
+        # the exported files are recounted by the sync in load(); store-mode
+        # passes do not touch the index until their changes reach the files
+        coverage = CoverageIndex.load()
+        update_progress(coverage)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
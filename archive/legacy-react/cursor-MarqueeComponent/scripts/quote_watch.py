@@ -0,0 +1,245 @@
+"""
+Watch mode for validate_quotes.py (--watch).
+
+A batch run pays interpreter start-up, imports, cold caches and a full
+refetch after every edit to src/data/*.json. In watch mode the validator
+stays up and keeps warm, in memory:
+
+  - results per (quote text, source, source_type): unchanged quotes are not
+    revalidated, whatever their position or id in the file
+  - the extracted text of every fetched source (LRU, TEXT_CACHE_SIZE
+    documents): a quote edited against an already-read article only costs
+    the fuzzy match (both caches are a warm_cache.WarmCache, shared with
+    validate_server.py)
+  - Europe PMC metadata per source and the DOI resolver (doi_resolver.py)
+
+The quote files are polled (mtime/size) every --watch-interval seconds. On
+a change the file is re-read, its quote set diffed against the previous
+version (added/changed/removed ids are printed), only cache misses are
+validated, and the report at --out is rewritten. A quote whose source could
+not be fetched is reported as a fetch error but not cached as settled: it is
+retried on later polls, with the wait doubling from RETRY_AFTER up to
+RETRY_MAX seconds, until the fetch succeeds. A file caught half-written
+(invalid JSON) is retried on the next change. The Scholar fallback and the
+--verified-out-dir/--proposed-out-dir outputs belong to batch runs and are
+not produced here.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .validate_quotes import (  # type: ignore
+        QuoteItem, ValidationResult, _resolve_epmc_metadata, classify_source, fetch_source,
+        load_quotes, match_source_text, report_entry, source_text, validate_from_metadata,
+    )
+    from .warm_cache import QuoteKey, WarmCache, quote_key  # type: ignore
+except Exception:  # when run as a script without package context
+    from validate_quotes import (  # type: ignore
+        QuoteItem, ValidationResult, _resolve_epmc_metadata, classify_source, fetch_source,
+        load_quotes, match_source_text, report_entry, source_text, validate_from_metadata,
+    )
+    from warm_cache import QuoteKey, WarmCache, quote_key  # type: ignore
+
+TEXT_CACHE_SIZE = 256
+RETRY_AFTER = 30.0   # first retry of a failed fetch, in seconds; doubles per failure
+RETRY_MAX = 900.0
+
+
+class WarmValidator:
+    def __init__(
+        self,
+        min_score: float,
+        use_epmc: bool = True,
+        delay: float = 0.0,
+        fetch_concurrency: int = 1,
+        resolver: Optional[Any] = None,
+        resolve_concurrency: int = 8,
+    ) -> None:
+        self.min_score = min_score
+        self.use_epmc = use_epmc
+        self.delay = delay
+        self.fetch_concurrency = max(1, fetch_concurrency)
+        self.resolver = resolver
+        self.resolve_concurrency = resolve_concurrency
+        # results are kept until prune(); extracted texts are LRU-bounded
+        self.cache = WarmCache(doc_size=TEXT_CACHE_SIZE)
+        # fetch-error results: (monotonic time of the next attempt, failures so far)
+        self.retry: Dict[QuoteKey, Tuple[float, int]] = {}
+        self.metadata: Dict[str, Any] = {}
+        self._meta_tried: set = set()
+
+    def _fetch_texts(self, sources: List[str]) -> Dict[str, str]:
+        """Fetch and extract `sources` into the text cache; returns {source: status} of failed fetches."""
+        if self.resolver is not None:
+            self.resolver.resolve_many(sources, concurrency=self.resolve_concurrency)
+
+        def one(src: str):
+            fetched = fetch_source(src)
+            if self.delay > 0 and self.fetch_concurrency == 1:
+                time.sleep(self.delay)
+            return src, fetched
+
+        if self.fetch_concurrency > 1 and len(sources) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.fetch_concurrency, len(sources))) as pool:
+                fetched = list(pool.map(one, sources))
+        else:
+            fetched = [one(s) for s in sources]
+        failed: Dict[str, str] = {}
+        for src, (data, content_type, status) in fetched:
+            if data is None:
+                # not cached: retried on a later poll (see self.retry)
+                failed[src] = status
+                continue
+            ctype = content_type or ""
+            text, notes = source_text(data, ctype, classify_source(src, None))
+            self.cache.store_document(src, (text, notes, ctype))
+        return failed
+
+    def validate(self, quotes: List[QuoteItem]) -> List[QuoteItem]:
+        """Validate the quotes without a cached result; returns those that were (re)validated."""
+        misses: Dict[QuoteKey, QuoteItem] = {}
+        now = time.monotonic()
+        for q in quotes:
+            key = quote_key(q)
+            if self.cache.result(key) is None or (key in self.retry and self.retry[key][0] <= now):
+                misses.setdefault(key, q)
+        if not misses:
+            return []
+        pending = list(misses.items())
+        if self.use_epmc:
+            new_sources = sorted({q.source for _, q in pending} - self._meta_tried)
+            if new_sources:
+                self.metadata.update(_resolve_epmc_metadata(new_sources))
+                self._meta_tried.update(new_sources)
+            rest = []
+            for key, q in pending:
+                res = validate_from_metadata(q, self.metadata[q.source], self.min_score) if q.source in self.metadata else None
+                if res is not None:
+                    self.cache.store_result(key, res)
+                    self.retry.pop(key, None)
+                else:
+                    rest.append((key, q))
+            pending = rest
+        to_fetch = sorted({q.source for _, q in pending if self.cache.document(q.source) is None})
+        failed = self._fetch_texts(to_fetch) if to_fetch else {}
+        for key, q in pending:
+            s_class = classify_source(q.source, q.context.get("source_type"))
+            doc = self.cache.document(q.source)
+            if doc is not None:
+                text, notes, ctype = doc[1]
+                self.cache.store_result(key, match_source_text(q, s_class, text, notes, ctype))
+                self.retry.pop(key, None)
+            else:
+                failures = self.retry.get(key, (0.0, 0))[1] + 1
+                self.retry[key] = (time.monotonic() + min(RETRY_MAX, RETRY_AFTER * 2 ** (failures - 1)), failures)
+                self.cache.store_result(key, ValidationResult(
+                    id=q.id,
+                    source=q.source,
+                    source_type=q.context.get("source_type"),
+                    exact_match=False,
+                    fuzzy_score=0.0,
+                    matched_excerpt=None,
+                    content_type=None,
+                    status=failed.get(q.source, "fetch_error"),
+                    notes=f"Could not fetch source ({s_class}).",
+                ))
+        return list(misses.values())
+
+    def retry_due(self) -> bool:
+        """Whether a failed fetch is due for another attempt."""
+        now = time.monotonic()
+        return any(at <= now for at, _ in self.retry.values())
+
+    def cached_result(self, q: QuoteItem) -> Optional[ValidationResult]:
+        return self.cache.result(quote_key(q))
+
+    def result_for(self, q: QuoteItem) -> ValidationResult:
+        # cached per quote content; the id and context come from the current file
+        return replace(self.cache.result(quote_key(q)), id=q.id)
+
+    def prune(self, live: List[QuoteItem]) -> None:
+        keep = {quote_key(q) for q in live}
+        for key in [k for k in self.cache.result_keys() if k not in keep]:
+            self.cache.drop_result(key)
+            self.retry.pop(key, None)
+
+
+def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _diff(old: List[QuoteItem], new: List[QuoteItem]) -> Tuple[int, int, int]:
+    before = {q.id: quote_key(q) for q in old}
+    after = {q.id: quote_key(q) for q in new}
+    added = sum(1 for i in after if i not in before)
+    removed = sum(1 for i in before if i not in after)
+    changed = sum(1 for i, k in after.items() if i in before and before[i] != k)
+    return added, changed, removed
+
+
+def _write_report(out_path: Path, paths: List[Path], quotes: Dict[Path, List[QuoteItem]], v: WarmValidator) -> None:
+    report: Dict[str, Any] = {"files": [], "results": []}
+    for path in paths:
+        qs = quotes.get(path, [])
+        report["files"].append({"file": str(path), "count": len(qs)})
+        report["results"].extend(report_entry(v.result_for(q), q, path) for q in qs if v.cached_result(q) is not None)
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    tmp.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    os.replace(tmp, out_path)
+
+
+def watch_files(paths: List[Path], out_path: Path, validator: WarmValidator, interval: float = 1.0) -> int:
+    """Validate `paths`, then revalidate changed quotes whenever a file changes. Runs until interrupted."""
+    stamps: Dict[Path, Optional[Tuple[int, int]]] = {}
+    quotes: Dict[Path, List[QuoteItem]] = {}
+    print(f"Watching {len(paths)} file(s); report: {out_path} (Ctrl-C to stop)")
+    try:
+        while True:
+            changed = [p for p in paths if _stamp(p) != stamps.get(p, ())]
+            if changed or validator.retry_due():
+                t0 = time.perf_counter()
+                revalidated: List[QuoteItem] = []
+                if not changed:
+                    # no edit: only the failed fetches that are due are retried
+                    revalidated = validator.validate([q for qs in quotes.values() for q in qs])
+                for path in changed:
+                    stamps[path] = _stamp(path)
+                    if stamps[path] is None:
+                        print(f"{path}: missing", file=sys.stderr)
+                        continue
+                    try:
+                        new = load_quotes(path)
+                    except (OSError, ValueError) as e:
+                        print(f"{path}: not readable yet ({e}); waiting for the next save", file=sys.stderr)
+                        continue
+                    if path in quotes:
+                        added, chg, removed = _diff(quotes[path], new)
+                        print(f"{path}: +{added} added, ~{chg} changed, -{removed} removed")
+                    quotes[path] = new
+                    revalidated += validator.validate(new)
+                validator.prune([q for qs in quotes.values() for q in qs])
+                _write_report(out_path, paths, quotes, validator)
+                for q in revalidated:
+                    r = validator.cached_result(q)
+                    if r is None:
+                        continue
+                    ok = r.exact_match or r.fuzzy_score >= validator.min_score
+                    print(f"  {'ok  ' if ok else 'FAIL'} {q.id}: score={r.fuzzy_score} {r.notes or ''}".rstrip())
+                if validator.resolver is not None:
+                    validator.resolver.save()
+                print(f"Revalidated {len(revalidated)} quote(s) in {time.perf_counter() - t0:.1f}s; wrote {out_path}")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        return 0
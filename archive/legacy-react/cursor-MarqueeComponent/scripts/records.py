@@ -0,0 +1,71 @@
+"""
+Compact record types for large candidate pools.
+
+Every harvest proposal and Scholar replacement suggestion is a `Candidate`:
+one sentence plus its citation. A pool holds tens of thousands of them, so
+a per-candidate dict would cost its hash table each time, and the peptide
+name, paper title, authors, URL and query repeat across every sentence of a
+paper. `Candidate` keeps the fields in __slots__, interns the repeated
+strings (`sys.intern`), and is a read-only Mapping, so
+`c.get("replacement_quote")`, `c["url"]` and `dict(c)` read it like a dict;
+`to_dict()` builds the plain dict only where JSON is written.
+
+validate_quotes.QuoteItem / ValidationResult are slotted dataclasses, with
+the repeated strings interned the same way (`intern_str`). See
+bench_records.py for the memory comparison.
+"""
+from __future__ import annotations
+
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator
+
+_UNSET: Any = object()
+
+
+def intern_str(value: Any) -> Any:
+    """sys.intern for strings; anything else is returned unchanged."""
+    return sys.intern(value) if type(value) is str else value
+
+
+class Candidate(Mapping):
+    """One harvested sentence or Scholar replacement suggestion, with its citation."""
+
+    FIELDS = (
+        "peptide_name", "replacement_quote", "paper_title", "authors", "year",
+        "url", "query", "source", "positivity_score", "fuzzy_score", "section",
+    )
+    # the sentence itself is unique; everything else repeats across candidates
+    INTERNED = frozenset(FIELDS) - {"replacement_quote", "positivity_score", "fuzzy_score"}
+
+    __slots__ = FIELDS
+
+    def __init__(self, **fields: Any) -> None:
+        for name in self.FIELDS:
+            value = fields.pop(name, _UNSET)
+            if value is _UNSET:
+                continue  # an absent key stays an empty slot (and pickles as one)
+            setattr(self, name, intern_str(value) if name in self.INTERNED else value)
+        if fields:
+            raise TypeError(f"unknown Candidate field(s): {', '.join(sorted(fields))}")
+
+    def __getitem__(self, key: str) -> Any:
+        value = getattr(self, key, _UNSET) if key in self.FIELDS else _UNSET
+        if value is _UNSET:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name in self.FIELDS if hasattr(self, name))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Candidate({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self}
+
+    def replace(self, **changes: Any) -> "Candidate":
+        return Candidate(**{**self.to_dict(), **changes})
@@ -0,0 +1,203 @@
+"""
+Streaming Scholar fallback for validate_quotes.py (--scholar-fallback).
+
+ScholarFallback calls try_scholar_replacements for the failing quotes on a
+worker thread while validation is still going: validate_quotes submits each
+result as soon as it is known, and a failing one (low score, or a
+non-academic source) is searched right away. A search can hang inside
+`scholarly` or sleep between queries, so none is left to run unbounded.
+
+  - Per-call timeout (--scholar-timeout): each search gets a deadline that
+    try_scholar_replacements honours between queries and paper fetches; a
+    call stuck inside scholarly past the deadline is abandoned (threads
+    cannot be killed, it finishes in the background and its result is
+    dropped) and the worker moves on. An abandoned call loses its access
+    to the seen-URL store and the query statistics (its next use of them
+    raises), so it cannot write to them after close(); and the next search
+    does not start until it has ended, waiting out of that search's own
+    timeout: Scholar never sees two of our clients at once.
+  - Overall budget (--scholar-budget, and the --deadline/--budget of the
+    run): no search starts once it is spent; the quotes still queued are
+    reported as skipped.
+  - Deduplication: the Scholar queries are built from the peptide and the
+    quote's keywords, so quotes with the same (peptide, query set) share one
+    search and its suggestions.
+
+Searches run one at a time, as before: Scholar throttles parallel clients.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+try:
+    from . import metrics  # type: ignore
+    from .records import Candidate  # type: ignore
+    from .scholar_integration import _build_query_templates, try_scholar_replacements  # type: ignore
+except Exception:  # when run as a script without package context
+    import metrics  # type: ignore
+    from records import Candidate  # type: ignore
+    from scholar_integration import _build_query_templates, try_scholar_replacements  # type: ignore
+
+CALL_TIMEOUT = 120.0
+
+Suggestions = Optional[List[Candidate]]
+QueryKey = Tuple[str, Tuple[str, ...]]
+
+
+def needs_fallback(exact_match: bool, fuzzy_score: float, notes: Optional[str], status: Optional[str], min_score: float) -> bool:
+    """Low-score or non-academic results get Scholar replacements; deferred ones are left alone."""
+    if status == "deferred":
+        return False
+    low_score = (not exact_match) and fuzzy_score < min_score
+    return low_score or (notes or "").find("Non-academic") >= 0
+
+
+class _Gate:
+    """Method access to a shared store that can be cut off, for a call that may be abandoned."""
+
+    def __init__(self, store: Any) -> None:
+        self._store = store
+        self._open = True
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._store, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            with self._lock:
+                if not self._open:
+                    raise RuntimeError("abandoned Scholar search")
+                return attr(*args, **kwargs)
+
+        return call
+
+    def shut(self) -> None:
+        # waits for a call in progress, so nothing is written after this returns
+        with self._lock:
+            self._open = False
+
+
+def query_key(quote: str, peptide: Optional[str], scientist: Optional[str]) -> QueryKey:
+    return ((peptide or "").lower(), tuple(q for _, q in _build_query_templates(quote, peptide, scientist)))
+
+
+class ScholarFallback:
+    def __init__(
+        self,
+        limit: int = 3,
+        seen_urls: Optional[Any] = None,
+        stats: Optional[Any] = None,
+        call_timeout: float = CALL_TIMEOUT,
+        budget: Optional[Any] = None,
+        search: Callable[..., Suggestions] = try_scholar_replacements,
+    ) -> None:
+        self.limit = limit
+        self.seen_urls = seen_urls
+        self.stats = stats
+        self.call_timeout = call_timeout
+        self.budget = budget  # validation_schedule.Budget, or None for no overall limit
+        self.search = search
+        self.suggestions: Dict[Hashable, Suggestions] = {}
+        self.counts = {"searched": 0, "deduplicated": 0, "timed_out": 0, "skipped": 0}
+        self._targets: Dict[QueryKey, List[Hashable]] = {}
+        self._done: Dict[QueryKey, Suggestions] = {}
+        self._queue: "queue.Queue[Optional[Tuple[QueryKey, str, Optional[str], Optional[str]]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._abandoned: Optional[threading.Thread] = None
+        self._thread = threading.Thread(target=self._run, name="scholar-fallback", daemon=True)
+        self._thread.start()
+
+    def _remaining(self) -> float:
+        return float("inf") if self.budget is None else self.budget.remaining()
+
+    def submit(self, target: Hashable, quote: str, peptide: Optional[str], scientist: Optional[str]) -> None:
+        """Queue a Scholar search for a failing quote; `target` identifies it in `suggestions`."""
+        key = query_key(quote, peptide, scientist)
+        with self._lock:
+            if key in self._done:
+                self.suggestions[target] = self._done[key]
+                self.counts["deduplicated"] += 1
+                return
+            if key in self._targets:
+                self._targets[key].append(target)
+                self.counts["deduplicated"] += 1
+                return
+            self._targets[key] = [target]
+        self._queue.put((key, quote, peptide, scientist))
+
+    def _call(self, quote: str, peptide: Optional[str], scientist: Optional[str]) -> Tuple[bool, Suggestions]:
+        """(finished, suggestions) of one search, bounded by the per-call timeout and the budget."""
+        timeout = min(self.call_timeout, self._remaining())
+        deadline = time.monotonic() + timeout
+        if self._abandoned is not None:
+            # the previous search is still stuck in scholarly: let it end first, on this call's time
+            self._abandoned.join(max(0.0, timeout))
+            if self._abandoned.is_alive():
+                return False, None
+            self._abandoned = None
+        box: Dict[str, Suggestions] = {}
+        seen_urls = _Gate(self.seen_urls) if self.seen_urls is not None else None
+        stats = _Gate(self.stats) if self.stats is not None else None
+        gates = [g for g in (seen_urls, stats) if g is not None]
+
+        def run() -> None:
+            try:
+                box["result"] = self.search(
+                    quote, peptide=peptide, scientist=scientist, limit=self.limit,
+                    seen_urls=seen_urls, stats=stats, deadline=deadline,
+                )
+            except Exception:
+                box["result"] = None
+
+        t = threading.Thread(target=run, name="scholar-search", daemon=True)
+        t.start()
+        # a little grace: a call past its deadline is finishing the fetch it had started
+        t.join(max(0.0, deadline - time.monotonic()) + 5.0)
+        if t.is_alive():
+            for gate in gates:
+                gate.shut()
+            self._abandoned = t
+            return False, None
+        return True, box.get("result")
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            key, quote, peptide, scientist = job
+            if self._remaining() <= 0:
+                result: Suggestions = None
+                outcome = "skipped"
+            else:
+                finished, result = self._call(quote, peptide, scientist)
+                outcome = "searched" if finished else "timed_out"
+            with self._lock:
+                self.counts[outcome] += 1
+                self._done[key] = result
+                for target in self._targets.pop(key, []):
+                    self.suggestions[target] = result
+            metrics.inc("quotes_scholar_fallback_total", outcome=outcome if outcome != "searched" else ("suggested" if result else "none"))
+
+    def close(self) -> Dict[Hashable, Suggestions]:
+        """Wait for the queued searches (within the budget) and return {target: suggestions}."""
+        self._queue.put(None)
+        while self._thread.is_alive():
+            # the worker skips what the budget no longer allows; this only bounds a stuck call
+            self._thread.join(min(1.0, max(0.1, self._remaining())))
+            if self._remaining() <= -(self.call_timeout + 5.0):
+                break
+        with self._lock:
+            return {t: s for t, s in self.suggestions.items() if s}
+
+    def summary(self) -> str:
+        c = self.counts
+        return (
+            f"Scholar fallback: {c['searched']} search(es), {c['deduplicated']} deduplicated, "
+            f"{c['timed_out']} timed out, {c['skipped']} skipped (budget)"
+        )
@@ -9,13 +9,26 @@ Usage (from validator): try_scholar_replacements(quote_text, peptide, scientist)
 
 Notes:
 - Requires: pip install scholarly
-- Respects a small delay internally to be polite.
+- Respects a small delay internally to be polite (skipped when replaying a
+  cassette), and stops starting new queries or fetches once an optional
+  `deadline` has passed.
+- Scholar result streams go through the active HTTP cassette, if any
+  (see http_cassette.py), so searches can be recorded and replayed.
+- Result URLs are checked against a SeenUrls store (see seen_urls.py) before
+  any download: papers already processed for the peptide this run, or
+  rejected on an earlier run, are not fetched again.
+- With a QueryStats object (see query_stats.py) query templates are tried in
+  order of their historical yield for the peptide's class, and templates or
+  domains that never produce accepted quotes are pruned.
 """
 from __future__ import annotations
 
+import functools
+import itertools
 import re
 import time
-from typing import Any, Dict, List, Optional
+from contextlib import closing
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 try:
     from scholarly import scholarly  # type: ignore
@@ -23,14 +36,59 @@ except Exception:
     scholarly = None  # type: ignore
 
 try:
-    from bs4 import BeautifulSoup  # type: ignore
+    from .validate_quotes import html_to_text, best_fuzzy_contains, classify_source  # type: ignore
+except Exception:  # when run as a script without package context
+    from validate_quotes import html_to_text, best_fuzzy_contains, classify_source  # type: ignore
+
+try:
+    from .http_cassette import active_cassette, cassette_search_pubs, permanent_failure, replaying  # type: ignore
 except Exception:
-    BeautifulSoup = None  # type: ignore
+    from http_cassette import active_cassette, cassette_search_pubs, permanent_failure, replaying  # type: ignore
 
 try:
-    from .validate_quotes import html_to_text, fetch_url, best_fuzzy_contains, classify_source  # type: ignore
-except Exception:  # when run as a script without package context
-    from validate_quotes import html_to_text, fetch_url, best_fuzzy_contains, classify_source  # type: ignore
+    from .near_dup import NearDupIndex  # type: ignore
+except Exception:
+    from near_dup import NearDupIndex  # type: ignore
+
+try:
+    from .pipeline import prefetch_windows  # type: ignore
+except Exception:
+    from pipeline import prefetch_windows  # type: ignore
+
+try:
+    from .section_segmenter import pick_sections, select_sections  # type: ignore
+except Exception:
+    from section_segmenter import pick_sections, select_sections  # type: ignore
+
+try:
+    from .jats import fetch_article, is_jats, jats_text, parse_jats  # type: ignore
+except Exception:
+    from jats import fetch_article, is_jats, jats_text, parse_jats  # type: ignore
+
+try:
+    from .doi_resolver import doi_from_url, resolve_url  # type: ignore
+except Exception:
+    from doi_resolver import doi_from_url, resolve_url  # type: ignore
+
+try:
+    from . import metrics  # type: ignore
+except Exception:
+    import metrics  # type: ignore
+
+try:
+    from .seen_urls import SeenUrls  # type: ignore
+except Exception:
+    from seen_urls import SeenUrls  # type: ignore
+
+try:
+    from .query_stats import QueryStats  # type: ignore
+except Exception:
+    from query_stats import QueryStats  # type: ignore
+
+try:
+    from .records import Candidate  # type: ignore
+except Exception:
+    from records import Candidate  # type: ignore
 
 # Lightweight synonym dictionaries to improve recall
 PEPTIDE_SYNONYMS = {
@@ -161,6 +219,9 @@ EXCLUDE_TERMS = [
     "ahk-200", "cucumis", "melon genotype", "plant",
 ]
 
+# classify_source() types worth downloading when harvesting
+ACADEMIC_SOURCE_TYPES = {"pmc_html", "pubmed_html", "journal_html", "doi_landing", "pdf"}
+
 # Exclude animal/preclinical contexts (human-only marketing)
 ANIMAL_TERMS = [
     "rat", "rats", "mouse", "mice", "murine", "hamster", "guinea pig",
@@ -171,6 +232,15 @@ ANIMAL_TERMS = [
 ]
 
 
+def _scholar_available() -> bool:
+    # A replay cassette can serve Scholar results without scholarly installed
+    return bool(scholarly) or active_cassette() is not None
+
+
+def _search_pubs(query: str):
+    return cassette_search_pubs(query, lambda q: scholarly.search_pubs(q))
+
+
 def _keywords_from_quote(quote: str) -> List[str]:
     # crude keyword selection: words >=5 chars, dedup, take up to 5
     words = re.findall(r"[A-Za-z][A-Za-z\-]{4,}", quote)
@@ -200,6 +270,11 @@ def _expand_with_synonyms(peptide: Optional[str], quote: str) -> List[str]:
 
 
 def _build_query(quote: str, peptide: Optional[str], scientist: Optional[str]) -> List[str]:
+    return [q for _, q in _build_query_templates(quote, peptide, scientist)]
+
+
+def _build_query_templates(quote: str, peptide: Optional[str], scientist: Optional[str]) -> List[Tuple[str, str]]:
+    """(template, query) pairs; the template names the query shape for QueryStats."""
     base_parts = []
     if peptide:
         base_parts.append(peptide)
@@ -209,16 +284,16 @@ def _build_query(quote: str, peptide: Optional[str], scientist: Optional[str]) -
         base_parts = quote.split()[:4]
 
     # create multiple query variants with synonyms
-    variants: List[str] = []
+    variants: List[Tuple[str, str]] = []
     expansions = _expand_with_synonyms(peptide, quote)
     # primary
-    variants.append(" ".join(base_parts))
+    variants.append(("{keywords}", " ".join(base_parts)))
     # add synonyms in permutations (limited)
     for e in expansions[:4]:
-        variants.append(" ".join(base_parts + [e]))
+        variants.append(("{keywords} {synonym}", " ".join(base_parts + [e])))
     # favor peer-reviewed hits
-    variants = [v + " review randomized site:pmc.ncbi.nlm.nih.gov" for v in variants]
-    return variants
+    suffix = " review randomized site:pmc.ncbi.nlm.nih.gov"
+    return [("replacement:" + t + suffix, v + suffix) for t, v in variants]
 
 
 def try_scholar_replacements(
@@ -227,34 +302,66 @@ def try_scholar_replacements(
     scientist: Optional[str] = None,
     limit: int = 3,
     delay: float = 1.0,
-) -> Optional[List[Dict[str, Any]]]:
-    if not scholarly:
+    seen_urls: Optional[SeenUrls] = None,
+    stats: Optional[QueryStats] = None,
+    deadline: Optional[float] = None,
+) -> Optional[List[Candidate]]:
+    """Scholar-sourced replacement quotes for `quote_text`, or None.
+
+    With `deadline` (time.monotonic() value) no new query or paper fetch is
+    started after it; whatever was found so far is returned.
+    """
+    if not _scholar_available():
         return None
-    queries = _build_query(quote_text, peptide, scientist)
-    suggestions: List[Dict[str, Any]] = []
-    for query in queries:
+
+    def expired() -> bool:
+        return deadline is not None and time.monotonic() >= deadline
+
+    queries = _build_query_templates(quote_text, peptide, scientist)
+    if stats is not None:
+        queries = stats.order(queries, peptide)
+    # query variants overlap heavily; fetch each paper once per call
+    tried = set()
+    suggestions: List[Candidate] = []
+    for template, query in queries:
+        if expired():
+            break
+        if stats is not None:
+            stats.record_query(template, peptide)
         try:
-            search = scholarly.search_pubs(query)
+            search = _search_pubs(query)
         except Exception:
             continue
         for i, paper in enumerate(search):
-            if i >= max(1, limit):
+            if i >= max(1, limit) or expired():
                 break
             bib = paper.get("bib", {}) if isinstance(paper, dict) else {}
             title = bib.get("title")
             year = bib.get("pub_year")
             authors = bib.get("author")
             url = paper.get("pub_url") or paper.get("eprint_url")
-            if not url:
+            if not url or url in tried:
+                continue
+            tried.add(url)
+            if seen_urls is not None and seen_urls.should_skip(url) is not None:
+                continue
+            final_url = resolve_url(url)
+            if stats is not None and stats.skip_domain(final_url, peptide):
                 continue
-            data, content_type, status = fetch_url(url)
+            data, content_type, status = fetch_article(final_url)
             if not data:
+                _reject_failed_fetch(seen_urls, url, status)
+                if stats is not None:
+                    stats.record_fetch(template, peptide, final_url, 0)
                 continue
-            try:
-                html = data.decode("utf-8", errors="ignore")
-            except Exception:
-                html = data.decode("latin-1", errors="ignore")
-            text = html_to_text(html)
+            if is_jats(data, content_type):
+                text = jats_text(data)
+            else:
+                try:
+                    html = data.decode("utf-8", errors="ignore")
+                except Exception:
+                    html = data.decode("latin-1", errors="ignore")
+                text = html_to_text(html)
             score, excerpt = best_fuzzy_contains(quote_text, text)
             matched_sentence = None
             if score >= 0.8 and excerpt:
@@ -270,44 +377,53 @@ def try_scholar_replacements(
                         matched_sentence = s.strip()
                         break
             if matched_sentence:
-                suggestions.append(
-                    {
-                        "replacement_quote": matched_sentence[:600],
-                        "paper_title": title,
-                        "authors": authors,
-                        "year": year,
-                        "url": url,
-                        "fuzzy_score": round(float(score), 3),
-                        "query": query,
-                    }
-                )
+                suggestions.append(Candidate(
+                    replacement_quote=matched_sentence[:600],
+                    paper_title=title,
+                    authors=authors,
+                    year=year,
+                    url=url,
+                    fuzzy_score=round(float(score), 3),
+                    query=query,
+                ))
+            if stats is not None:
+                stats.record_fetch(template, peptide, final_url, 1 if matched_sentence else 0)
         if suggestions:
             break
-        time.sleep(delay)
+        if not replaying():
+            time.sleep(delay if deadline is None else max(0.0, min(delay, deadline - time.monotonic())))
 
     return suggestions or None
 
 
 def _peptide_queries(peptide: str) -> List[str]:
+    return [q for _, q in _peptide_query_templates(peptide)]
+
+
+def _peptide_query_templates(peptide: str) -> List[Tuple[str, str]]:
+    """(template, query) pairs in the built-in order; the template is the unfilled query."""
     p = peptide.lower()
     terms = [peptide]
     if p in PEPTIDE_SYNONYMS:
         terms += PEPTIDE_SYNONYMS[p]
     # Bias toward human clinical content
-    base = [
-        f"{peptide} human randomized site:pmc.ncbi.nlm.nih.gov",
-        f"{peptide} human clinical site:pmc.ncbi.nlm.nih.gov",
-        f"{peptide} humans review site:pmc.ncbi.nlm.nih.gov",
-        f"{peptide} patients efficacy site:pmc.ncbi.nlm.nih.gov",
+    templates = [
+        "{peptide} human randomized site:pmc.ncbi.nlm.nih.gov",
+        "{peptide} human clinical site:pmc.ncbi.nlm.nih.gov",
+        "{peptide} humans review site:pmc.ncbi.nlm.nih.gov",
+        "{peptide} patients efficacy site:pmc.ncbi.nlm.nih.gov",
     ]
-    for t in terms[:4]:
-        base.append(f"{t} site:pmc.ncbi.nlm.nih.gov")
+    base = [(t, t.format(peptide=peptide)) for t in templates]
+    for i, t in enumerate(terms[:4]):
+        base.append(("{peptide} site:pmc.ncbi.nlm.nih.gov" if i == 0 else "{synonym} site:pmc.ncbi.nlm.nih.gov",
+                     f"{t} site:pmc.ncbi.nlm.nih.gov"))
     # add broader queries without site restriction as backup
-    base += [
-        f"{peptide} randomized clinical human",
-        f"{peptide} efficacy patients",
-        f"{peptide} review clinical",
-    ]
+    for t in [
+        "{peptide} randomized clinical human",
+        "{peptide} efficacy patients",
+        "{peptide} review clinical",
+    ]:
+        base.append((t, t.format(peptide=peptide)))
     return base
 
 
@@ -317,179 +433,222 @@ def harvest_peptide_quotes(
     max_papers: int = 15,
     positive_only: bool = True,
     delay: float = 1.0,
-) -> Optional[List[Dict[str, Any]]]:
-    if not scholarly:
+    known: Optional[NearDupIndex] = None,
+    lookahead: int = 4,
+    seen_urls: Optional[SeenUrls] = None,
+    stats: Optional[QueryStats] = None,
+) -> Optional[List[Candidate]]:
+    """Collect up to `min_quotes` candidate sentences for `peptide` from Scholar hits.
+
+    Sentences that near-duplicate each other, or a quote already in `known`
+    (typically the final set, see near_dup.py), are skipped. Up to
+    `lookahead` Scholar results are read and downloaded in the background
+    while the current article is scored; the read-ahead is stopped as soon
+    as enough proposals are collected.
+
+    Result URLs are classified before download. Papers returned by more than
+    one query, or rejected in `seen_urls` (non-academic, no usable sentences
+    for this peptide), are skipped; new rejections are recorded there. Without
+    a `seen_urls` store only the within-run dedup applies.
+
+    With `stats`, templates are ordered/pruned by historical yield and every
+    search and download is recorded there.
+    """
+    if not _scholar_available():
         return None
-    queries = _peptide_queries(peptide)
-    seen_sentences = set()
-    proposals: List[Dict[str, Any]] = []
-
-    for query in queries:
+    if seen_urls is None:
+        seen_urls = SeenUrls(path=None)
+    queries = _peptide_query_templates(peptide)
+    if stats is not None:
+        queries = stats.order(queries, peptide)
+    seen_sentences = NearDupIndex()
+    proposals: List[Candidate] = []
+
+    for template, query in queries:
+        if stats is not None:
+            stats.record_query(template, peptide)
         try:
-            search = scholarly.search_pubs(query)
+            search = _search_pubs(query)
         except Exception:
             continue
-        count = 0
-        for paper in search:
-            if count >= max_papers:
-                break
-            count += 1
+        results = _unseen_papers(itertools.islice(search, max(0, max_papers)), peptide, seen_urls, stats)
+        papers = prefetch_windows(results, _fetch_paper, lookahead)
+        record = functools.partial(stats.record_fetch, template, peptide) if stats is not None else None
+        with closing(papers):
+            done = _harvest_papers(
+                papers, peptide, query, min_quotes, proposals, seen_sentences, known, seen_urls, record
+            )
+        if done:
+            return proposals
+        if not replaying():
+            time.sleep(delay)
+    return proposals or None
+
+
+def _paper_url(paper: Any) -> Optional[str]:
+    if not isinstance(paper, dict):
+        return None
+    return paper.get("pub_url") or paper.get("eprint_url")
+
+
+def _unseen_papers(papers: Any, peptide: str, seen_urls: SeenUrls, stats: Optional[QueryStats] = None) -> Any:
+    """Drop results that are non-academic, already seen or from a pruned domain, before they are fetched.
+
+    Yields (paper, final URL): the URL a DOI link resolves to, else the link itself.
+    """
+    for paper in papers:
+        url = _paper_url(paper)
+        if not url or seen_urls.should_skip(url, peptide) is not None:
+            continue
+        # DOI links: judge the publisher URL they resolve to, before downloading
+        final_url = resolve_url(url)
+        if stats is not None and stats.skip_domain(final_url, peptide):
+            continue
+        stype = _classify_resolved(url, final_url)
+        if stype not in ACADEMIC_SOURCE_TYPES:
+            seen_urls.reject(url, f"non_academic:{stype}")
+            continue
+        seen_urls.mark_seen(url, peptide)
+        yield paper, final_url
+
+
+def _classify_resolved(url: str, final_url: str) -> str:
+    """classify_source of the resolved URL; a DOI landing on an unlisted publisher stays doi_landing."""
+    stype = classify_source(final_url, None)
+    if stype == "web_html" and doi_from_url(url) is not None:
+        return "doi_landing"
+    return stype
+
+
+def _reject_failed_fetch(seen_urls: Optional[SeenUrls], url: str, status: str) -> None:
+    # Only permanent client errors (404, 403, 410...) are worth remembering;
+    # timeouts, throttling (408, 429) and 5xx responses are retried next run
+    if seen_urls is not None and permanent_failure(status):
+        seen_urls.reject(url, status)
+
+
+def _fetch_paper(item: Tuple[Any, str]):
+    _, final_url = item
+    return fetch_article(final_url)
+
+
+def _harvest_papers(
+    papers: Any,
+    peptide: str,
+    query: str,
+    min_quotes: int,
+    proposals: List[Candidate],
+    seen_sentences: NearDupIndex,
+    known: Optional[NearDupIndex],
+    seen_urls: Optional[SeenUrls] = None,
+    record: Optional[Any] = None,
+) -> bool:
+    """Score prefetched ((paper, final URL), fetched) pairs into `proposals`; True once `min_quotes` is reached.
+
+    `papers` yields lists of pairs (the downloads that were ready together,
+    see pipeline.prefetch_windows); each list is ranked as one batch.
+    `record(url, accepted)` is called once per downloaded paper (QueryStats.record_fetch),
+    with the final URL from _unseen_papers: the domain skip_domain() checks.
+    """
+    for window in papers:
+        # one scoring batch per download window: every article that arrived with a body
+        scored = [i for i, (_, fetched) in enumerate(window) if fetched[0]]
+        ranked = dict(zip(scored, rank_articles([window[i][1][:2] for i in scored], peptide, positive_only=True)))
+        for i, ((paper, final_url), (data, content_type, status)) in enumerate(window):
             bib = paper.get("bib", {}) if isinstance(paper, dict) else {}
             title = bib.get("title")
             year = bib.get("pub_year")
             authors = bib.get("author")
-            url = paper.get("pub_url") or paper.get("eprint_url")
+            url = _paper_url(paper)
             if not url:
                 continue
-            data, content_type, status = fetch_url(url)
             if not data:
+                _reject_failed_fetch(seen_urls, url, status)
+                if record is not None:
+                    record(final_url, 0)
                 continue
-            # Filter non-academic domains using classify_source
-            stype = classify_source(url, None)
-            if stype not in {"pmc_html", "pubmed_html", "journal_html", "doi_landing", "pdf"}:
-                continue
-            try:
-                html = data.decode("utf-8", errors="ignore")
-            except Exception:
-                html = data.decode("latin-1", errors="ignore")
-
-            candidates = extract_marketing_sentences(html, peptide, positive_only=True)
+            candidates = ranked[i]
+            if not candidates and seen_urls is not None:
+                seen_urls.reject(url, "no_sentences", peptide)
+            before = len(proposals)
             for s, score, section in candidates:
-                key = (s.lower()[:400])
-                if key in seen_sentences:
-                    continue
-                seen_sentences.add(key)
-                proposals.append({
-                    "peptide_name": peptide,
-                    "replacement_quote": s.strip()[:600],
-                    "paper_title": title,
-                    "authors": authors,
-                    "year": year,
-                    "url": url,
-                    "query": query,
-                    "positivity_score": round(score, 2),
-                    "section": section,
-                })
                 if len(proposals) >= min_quotes:
-                    return proposals
-        time.sleep(delay)
-    return proposals or None
+                    break
+                if known is not None and known.query(s, peptide) is not None:
+                    continue
+                if not seen_sentences.add_if_new(s, peptide):
+                    continue
+                proposals.append(Candidate(
+                    peptide_name=peptide,
+                    replacement_quote=s.strip()[:600],
+                    paper_title=title,
+                    authors=authors,
+                    year=year,
+                    url=url,
+                    query=query,
+                    positivity_score=round(score, 2),
+                    section=section,
+                ))
+            record_harvest_fetch(len(proposals) - before)
+            if record is not None:
+                record(final_url, len(proposals) - before)
+            if len(proposals) >= min_quotes:
+                return True
+    return False
+
+
+def record_harvest_fetch(accepted: int) -> None:
+    """Metrics for one scored article: proposals accepted from it."""
+    metrics.inc("quotes_harvest_fetches_total")
+    metrics.inc("quotes_harvest_accepted_total", accepted)
+    metrics.observe("quotes_harvest_accepted_per_fetch", accepted)
 
 
 def extract_marketing_sentences(html: str, peptide: str, positive_only: bool = True) -> List[tuple[str, float, str]]:
     """Extract sentences from Abstract/Conclusion first, rank by positivity and relevance."""
-    # Clean helper
-    def strip_citations(s: str) -> str:
-        # remove any bracketed citations like [1], [12, 13], or multi-line like [ 12 ]
-        s = re.sub(r"\[[^\]]+\]", "", s)
-        # remove in-text citations like (ref. 12) loosely
-        s = re.sub(r"\(ref\.?\s*\d+\)", "", s, flags=re.I)
-        s = re.sub(r"\s+", " ", s).strip()
-        return s
-
-    sections: List[tuple[str, str]] = []  # (section_name, text)
-    if BeautifulSoup is not None:
-        soup = BeautifulSoup(html, "html.parser")
-        # Prefer explicit abstract/conclusion containers
-        abstract_nodes = []
-        for sel in [
-            {'name': 'section', 'attrs': {'id': re.compile('abstract', re.I)}},
-            {'name': 'div', 'attrs': {'class': re.compile('abstract', re.I)}},
-            {'name': 'div', 'attrs': {'id': re.compile('abstract', re.I)}},
-        ]:
-            abstract_nodes += soup.find_all(sel['name'], attrs=sel['attrs'])
-        for node in abstract_nodes:
-            txt = node.get_text(" ", strip=True)
-            if txt:
-                sections.append(("abstract", txt))
-
-        conclusion_nodes = []
-        for header in soup.find_all(["h1", "h2", "h3", "strong"]):
-            hn = (header.get_text(" ", strip=True) or "").lower()
-            if any(key in hn for key in ["conclusion", "conclusions"]):
-                texts = []
-                for sib in header.next_siblings:
-                    if getattr(sib, "name", None) in ["h1", "h2", "h3", "strong"]:
-                        break
-                    texts.append(getattr(sib, "get_text", lambda **k: str(sib))(" ", strip=True))
-                sec_text = " ".join([t for t in texts if t]).strip()
-                if sec_text:
-                    sections.append(("conclusion", sec_text))
-        # Fallback: entire article text
-        if not sections:
-            body_text = soup.get_text("\n")
-            sections.append(("fulltext", body_text))
+    try:
+        from .sentence_scoring import rank_sentences  # type: ignore
+    except Exception:
+        from sentence_scoring import rank_sentences  # type: ignore
+    return rank_sentences([(peptide, extract_sections(html))], positive_only=positive_only)[0]
+
+
+def extract_article_sentences(
+    data: bytes, content_type: Optional[str], peptide: str, positive_only: bool = True
+) -> List[tuple[str, float, str]]:
+    """extract_marketing_sentences for a downloaded article: JATS XML (see jats.py) or HTML."""
+    return rank_articles([(data, content_type)], peptide, positive_only=positive_only)[0]
+
+
+def rank_articles(
+    articles: Sequence[Tuple[bytes, Optional[str]]], peptide: str, positive_only: bool = True
+) -> List[List[tuple[str, float, str]]]:
+    """Ranked sentences of each downloaded (body, content type), scored as one batch (sentence_scoring.py)."""
+    try:
+        from .sentence_scoring import rank_sentences  # type: ignore
+    except Exception:
+        from sentence_scoring import rank_sentences  # type: ignore
+    docs = [(peptide, article_sections(data, content_type)) for data, content_type in articles]
+    return rank_sentences(docs, positive_only=positive_only)
+
+
+def article_sections(data: bytes, content_type: Optional[str]) -> List[tuple[str, str]]:
+    """extract_sections for a downloaded article: JATS XML (see jats.py) or HTML."""
+    t0 = time.perf_counter()
+    kind = "jats" if is_jats(data, content_type) else "html"
+    if kind == "jats":
+        sections = pick_sections(parse_jats(data), ("abstract", "conclusion"))
     else:
-        # Fallback to plain text conversion
-        from .validate_quotes import html_to_text  # type: ignore
-        sections.append(("fulltext", html_to_text(html)))
-
-    targets = [peptide.lower()]
-    if peptide.lower() in PEPTIDE_SYNONYMS:
-        targets += [t.lower() for t in PEPTIDE_SYNONYMS[peptide.lower()]]
-
-    sentences_ranked: List[tuple[str, float, str]] = []
-    for section_name, text in sections:
-        # If fulltext and positive_only, skip to avoid noise; we want Abstract/Conclusions
-        if section_name == "fulltext" and positive_only:
-            continue
-        # Split into sentences
-        sents = re.split(r"(?<=[.!?])\s+", text)
-        for s in sents:
-            s_clean = strip_citations(s)
-            sl = s_clean.lower()
-            if not sl or len(s_clean) < 60 or len(s_clean) > 350:
-                continue
-            # filter out navigation/boilerplate/noise
-            noise_terms = [
-                "skip to main content",
-                "official website",
-                "view in nlm catalog",
-                "add to search",
-                "open in a new tab",
-                "figure",
-                "table",
-                "supplementary",
-                "copyright",
-                "license",
-                "click here",
-                "journal list",
-                "pmc",
-            ]
-            if any(t in sl for t in noise_terms):
-                continue
-            if not any(t in sl for t in targets):
-                continue
-            # Exclude mechanistic/assay-heavy sentences
-            if any(t in sl for t in EXCLUDE_TERMS):
-                continue
-            # Exclude animal contexts
-            if any(t in sl for t in ANIMAL_TERMS):
-                continue
-            # Positivity scoring
-            score = 0.0
-            for k, w in KEYWORD_WEIGHTS.items():
-                if k in sl:
-                    score += w
-            # Require clear benefit terms for marketing value
-            if not any(bt in sl for bt in BENEFIT_TERMS):
-                continue
-            # Boost sentences mentioning RCT/meta-analysis/systematic review
-            if any(tag in sl for tag in ["randomized", "double-blind", "placebo-controlled", "meta-analysis", "systematic review", "trial"]):
-                score += 0.8
-            # Boost human clinical context (patients, participants, adults)
-            if any(tag in sl for tag in ["patients", "participants", "adults", "men", "women", "human"]):
-                score += 0.5
-            # Prefer quantified outcomes
-            if re.search(r"\b\d+\s?%|\b(p\s?<\s?0\.[0-9]+)\b", sl):
-                score += 0.5
-            if positive_only and score <= 0:
-                continue
-            # Lightly prefer Abstract/Conclusion
-            if any(tag in section_name for tag in ["abstract", "conclusion", "conclusions"]):
-                score += 0.7
-            sentences_ranked.append((s_clean, score, section_name))
-
-    sentences_ranked.sort(key=lambda t: t[1], reverse=True)
-    # Return top 2 from strong sections, then more if needed
-    return sentences_ranked[:5]
+        try:
+            html = data.decode("utf-8", errors="ignore")
+        except Exception:
+            html = data.decode("latin-1", errors="ignore")
+        sections = extract_sections(html)
+    metrics.inc("quotes_documents_parsed_total", kind=kind)
+    metrics.observe("quotes_parse_seconds", time.perf_counter() - t0, kind=kind)
+    return sections
+
+
+def extract_sections(html: str) -> List[tuple[str, str]]:
+    """(section_name, text) pairs: abstract and conclusion blocks, else the full text."""
+    return select_sections(html, ("abstract", "conclusion"))
@@ -0,0 +1,198 @@
+"""
+Single-pass article section segmenter.
+
+extract_marketing_sentences used BeautifulSoup to find abstract containers
+(three find_all passes) and then walked `next_siblings` from every
+h1/h2/h3/strong header looking for "Conclusions", re-reading the same
+siblings for every header on pages with many <strong> tags, and re-parsed
+the whole text when nothing matched. `segment()` walks the HTML once with
+html.parser and returns a SectionMap {name: [text spans]} for:
+
+  abstract     <section>/<div> whose id or class contains "abstract"
+               (outermost container only), or a heading named Abstract
+  results      \
+  discussion    } text after a heading naming the section, up to the next
+  conclusion   /  heading among its siblings or the end of its parent element
+  fulltext     all visible text (used when nothing else matched)
+
+A heading is h1-h3 or strong; "Results and Discussion" counts as
+discussion, "Conclusions" as conclusion. Text inside an abstract container
+that also follows e.g. a <strong>Conclusions:</strong> label belongs to both
+sections, as before.
+
+Maps are cached by content hash (LRU), so the same page scored for several
+peptides, or by several passes, is segmented once.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import OrderedDict
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Sequence, Tuple
+
+SECTION_NAMES = ("abstract", "results", "discussion", "conclusion")
+CACHE_SIZE = 64
+
+HEADING_TAGS = {"h1", "h2", "h3", "strong"}
+_SKIP_TAGS = {"script", "style", "noscript", "template"}
+_VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr",
+}
+_ABSTRACT_RE = re.compile("abstract", re.I)
+# checked in order: "Results and Discussion" -> discussion
+_HEADING_KEYS = (
+    ("conclusion", "conclusion"),
+    ("discussion", "discussion"),
+    ("results", "results"),
+    ("abstract", "abstract"),
+)
+
+SectionMap = Dict[str, List[str]]
+
+
+def heading_section(text: str) -> Optional[str]:
+    t = text.lower()
+    for key, name in _HEADING_KEYS:
+        if key in t:
+            return name
+    return None
+
+
+class _Segmenter(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.stack: List[str] = []
+        self.skip_depth: Optional[int] = None
+        self.abstract_depth: Optional[int] = None
+        self.abstract_parts: List[str] = []
+        # heading being read: (depth of the heading element, text parts)
+        self.heading: Optional[Tuple[int, List[str]]] = None
+        # open heading section: (name, depth of the heading's parent, text parts)
+        self.open: Optional[Tuple[str, int, List[str]]] = None
+        self.sections: SectionMap = {}
+        self.fulltext: List[str] = []
+
+    # --- helpers ------------------------------------------------------------
+
+    def _emit(self, name: str, parts: List[str]) -> None:
+        text = " ".join(parts).strip()
+        if text:
+            self.sections.setdefault(name, []).append(text)
+
+    def _close_open(self) -> None:
+        if self.open is not None:
+            name, _, parts = self.open
+            self.open = None
+            self._emit(name, parts)
+
+    # --- HTMLParser callbacks -----------------------------------------------
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag in _VOID_TAGS:
+            return
+        depth = len(self.stack)
+        self.stack.append(tag)
+        if self.skip_depth is None and tag in _SKIP_TAGS:
+            self.skip_depth = depth
+        if (
+            self.abstract_depth is None
+            and tag in ("section", "div")
+            and any(k in ("id", "class") and v and _ABSTRACT_RE.search(v) for k, v in attrs)
+        ):
+            self.abstract_depth = depth
+        if tag in HEADING_TAGS and self.heading is None:
+            # a heading among the open section's siblings ends that section
+            if self.open is not None and depth - 1 == self.open[1]:
+                self._close_open()
+            self.heading = (depth, [])
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        pass
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _VOID_TAGS or tag not in self.stack:
+            return
+        # implicitly close unclosed children (e.g. <p> without </p>)
+        while self.stack:
+            depth = len(self.stack) - 1
+            closed = self.stack.pop()
+            self._closed(closed, depth)
+            if closed == tag:
+                break
+
+    def _closed(self, tag: str, depth: int) -> None:
+        if self.skip_depth == depth:
+            self.skip_depth = None
+        if self.heading is not None and self.heading[0] == depth:
+            _, parts = self.heading
+            self.heading = None
+            name = heading_section(" ".join(parts))
+            inside_abstract = self.abstract_depth is not None
+            if name is not None and not (name == "abstract" and inside_abstract):
+                self._close_open()
+                self.open = (name, depth - 1, [])
+        if self.open is not None and depth <= self.open[1]:
+            self._close_open()
+        if self.abstract_depth == depth:
+            self.abstract_depth = None
+            self._emit("abstract", self.abstract_parts)
+            self.abstract_parts = []
+
+    def handle_data(self, data: str) -> None:
+        if self.skip_depth is not None:
+            return
+        text = data.strip()
+        if not text:
+            return
+        self.fulltext.append(text)
+        if self.abstract_depth is not None:
+            self.abstract_parts.append(text)
+        if self.heading is not None:
+            self.heading[1].append(text)
+        elif self.open is not None:
+            self.open[2].append(text)
+
+    def finish(self) -> SectionMap:
+        self.close()
+        while self.stack:
+            depth = len(self.stack) - 1
+            self._closed(self.stack.pop(), depth)
+        self._close_open()
+        if self.abstract_parts:
+            self._emit("abstract", self.abstract_parts)
+        self.sections["fulltext"] = ["\n".join(self.fulltext)]
+        return self.sections
+
+
+_cache: "OrderedDict[str, SectionMap]" = OrderedDict()
+
+
+def segment(html: str) -> SectionMap:
+    """Section name -> text spans for `html` (cached by content hash)."""
+    key = hashlib.sha1(html.encode("utf-8", "surrogatepass")).hexdigest()
+    hit = _cache.get(key)
+    if hit is not None:
+        _cache.move_to_end(key)
+        return hit
+    parser = _Segmenter()
+    try:
+        parser.feed(html)
+        sections = parser.finish()
+    except Exception:
+        sections = {"fulltext": [re.sub(r"<[^>]+>", " ", html)]}
+    _cache[key] = sections
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return sections
+
+
+def pick_sections(sections: SectionMap, wanted: Sequence[str] = ("abstract", "conclusion")) -> List[Tuple[str, str]]:
+    """(name, text) spans for the `wanted` sections in that order, or the full text if none exist."""
+    out = [(name, text) for name in wanted for text in sections.get(name, [])]
+    return out or [("fulltext", t) for t in sections.get("fulltext", [])]
+
+
+def select_sections(html: str, wanted: Sequence[str] = ("abstract", "conclusion")) -> List[Tuple[str, str]]:
+    return pick_sections(segment(html), wanted)
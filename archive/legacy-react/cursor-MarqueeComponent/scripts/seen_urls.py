@@ -0,0 +1,134 @@
+"""
+Cross-query and cross-run URL dedup with a negative cache of rejected sources.
+
+The same paper often comes back for several of the `_peptide_queries`
+variants, and a source rejected once (non-academic domain, no usable
+sentences) stays useless on later runs. SeenUrls keeps:
+
+  - a per-run set of (peptide, url) pairs already processed, so a paper is
+    fetched at most once per peptide per run regardless of the query
+  - a persistent Bloom filter of every URL ever processed, used as a cheap
+    front before consulting the negative cache
+  - a persistent negative cache {url: {scope: {reason, at}}} with a TTL,
+    where scope is a lowercased peptide name for peptide-specific rejections
+    (e.g. "no_sentences", which only apply to that peptide) or "" for a
+    rejection that applies to everyone; each scope expires on its own and
+    rejecting a URL for one scope never replaces another's entry
+
+Harvest (scholar_integration.harvest_peptide_quotes, harvest_quotes.harvest_via_epmc)
+and the Scholar fallback (try_scholar_replacements) call `should_skip()`
+before any network request. State lives in .cache/seen-urls.json.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Tuple
+
+try:
+    from . import metrics  # type: ignore
+except Exception:  # when run as a script without package context
+    import metrics  # type: ignore
+
+SEEN_PATH = Path('.cache/seen-urls.json')
+NEGATIVE_TTL_DAYS = 30.0
+
+
+class BloomFilter:
+    def __init__(self, size_bits: int = 1 << 20, hashes: int = 7, bits: Optional[bytearray] = None) -> None:
+        self.size = size_bits
+        self.hashes = hashes
+        self.bits = bits if bits is not None else bytearray(size_bits // 8)
+
+    def _positions(self, item: str):
+        d = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(d[:8], 'big')
+        h2 = int.from_bytes(d[8:], 'big') | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for p in self._positions(item):
+            self.bits[p >> 3] |= 1 << (p & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'size': self.size, 'hashes': self.hashes, 'bits': base64.b64encode(bytes(self.bits)).decode('ascii')}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> 'BloomFilter':
+        return cls(int(d['size']), int(d['hashes']), bytearray(base64.b64decode(d['bits'])))
+
+
+class SeenUrls:
+    def __init__(self, path: Optional[Path] = SEEN_PATH, ttl_days: float = NEGATIVE_TTL_DAYS) -> None:
+        self.path = Path(path) if path is not None else None
+        self.ttl = ttl_days * 86400.0
+        self.bloom = BloomFilter()
+        self.negative: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._run: Set[Tuple[str, str]] = set()
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            try:
+                doc = json.loads(self.path.read_text(encoding='utf-8'))
+                self.bloom = BloomFilter.from_dict(doc['bloom'])
+                self.negative = doc.get('negative', {})
+            except Exception:
+                pass
+
+    def _live(self, entry: Optional[Dict[str, Any]]) -> bool:
+        return bool(entry) and time.time() - float(entry.get('at', 0)) <= self.ttl
+
+    def should_skip(self, url: str, peptide: Optional[str] = None) -> Optional[str]:
+        """Reason to skip `url` without fetching it, or None if it should be fetched."""
+        reason = self._skip_reason(url, peptide)
+        metrics.inc('quotes_cache_requests_total', cache='seen_urls', result='hit' if reason else 'miss')
+        return reason
+
+    def _skip_reason(self, url: str, peptide: Optional[str]) -> Optional[str]:
+        if not url:
+            return 'no_url'
+        with self._lock:
+            if ((peptide or '').lower(), url) in self._run:
+                return 'seen_this_run'
+            if url not in self.bloom:
+                return None
+            scopes = self.negative.get(url) or {}
+            for scope in ('', (peptide or '').lower()):
+                entry = scopes.get(scope)
+                if self._live(entry):
+                    return entry.get('reason') or 'rejected'
+            return None
+
+    def mark_seen(self, url: str, peptide: Optional[str] = None) -> None:
+        with self._lock:
+            self._run.add(((peptide or '').lower(), url))
+            self.bloom.add(url)
+
+    def reject(self, url: str, reason: str, peptide: Optional[str] = None) -> None:
+        """Record that `url` is useless (for `peptide` only, if given)."""
+        with self._lock:
+            self.bloom.add(url)
+            self.negative.setdefault(url, {})[(peptide or '').lower()] = {'reason': reason, 'at': time.time()}
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._lock:
+            negative = {}
+            for url, scopes in self.negative.items():
+                kept = {s: e for s, e in scopes.items() if self._live(e)}
+                if kept:
+                    negative[url] = kept
+            doc = {'bloom': self.bloom.to_dict(), 'negative': negative}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + '.tmp')
+        tmp.write_text(json.dumps(doc, indent=1, sort_keys=True), encoding='utf-8')
+        os.replace(tmp, self.path)
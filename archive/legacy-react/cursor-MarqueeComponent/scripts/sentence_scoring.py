@@ -0,0 +1,329 @@
+"""
+Batch sentence scoring for extract_marketing_sentences.
+
+Sentences are split out of each document's sections and cleaned in Python
+(citation stripping, length filter), then scored together; the Scholar
+harvest passes every article of its download window in one batch:
+
+  - the lowercased sentences of the whole batch are joined into one buffer;
+    every lexicon term (noise, peptide targets, EXCLUDE_TERMS, ANIMAL_TERMS,
+    BENEFIT_TERMS, KEYWORD_WEIGHTS, boost tags) is a column of a sparse
+    term-presence matrix, found with one scan of the buffer; the matches of
+    a whole mask are mapped back to sentence rows with one np.searchsorted
+  - exclusion masks, positivity scores and boosts are array operations on
+    those columns; after each mask the buffer is rebuilt from the surviving
+    sentences, so the later (and more numerous) columns scan less text
+  - the top-k per document is picked with np.partition instead of sorting
+    every sentence
+
+Scores match the per-sentence Python loop exactly: each sentence receives
+the same float additions in the same order (KEYWORD_WEIGHTS column by column
+in dict order, then the boosts), and ties keep document order like the
+stable sort did. `score_candidates_py` is that loop (with the same partial
+top-k, heapq.nlargest), used below BATCH_MIN_SENTENCES, when numpy is not
+installed, and as the reference in bench_scoring.py, which checks parity and
+times both paths.
+"""
+from __future__ import annotations
+
+import heapq
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - optional
+    np = None  # type: ignore
+
+try:
+    from .scholar_integration import (  # type: ignore
+        ANIMAL_TERMS,
+        BENEFIT_TERMS,
+        EXCLUDE_TERMS,
+        KEYWORD_WEIGHTS,
+        PEPTIDE_SYNONYMS,
+    )
+except Exception:
+    from scholar_integration import (  # type: ignore
+        ANIMAL_TERMS,
+        BENEFIT_TERMS,
+        EXCLUDE_TERMS,
+        KEYWORD_WEIGHTS,
+        PEPTIDE_SYNONYMS,
+    )
+
+TOP_K = 5
+BATCH_MIN_SENTENCES = 150  # break-even measured with bench_scoring.py
+
+# filter out navigation/boilerplate/noise
+NOISE_TERMS = [
+    "skip to main content",
+    "official website",
+    "view in nlm catalog",
+    "add to search",
+    "open in a new tab",
+    "figure",
+    "table",
+    "supplementary",
+    "copyright",
+    "license",
+    "click here",
+    "journal list",
+    "pmc",
+]
+TRIAL_TAGS = ["randomized", "double-blind", "placebo-controlled", "meta-analysis", "systematic review", "trial"]
+HUMAN_TAGS = ["patients", "participants", "adults", "men", "women", "human"]
+STRONG_SECTIONS = ["abstract", "conclusion", "conclusions"]
+QUANT_RE = re.compile(r"\b\d+\s?%|\b(p\s?<\s?0\.[0-9]+)\b")
+
+# any of these drops a sentence (noise, mechanistic/assay, animal context)
+_REJECT_TERMS = NOISE_TERMS + EXCLUDE_TERMS + ANIMAL_TERMS
+
+Sections = Sequence[Tuple[str, str]]
+Ranked = List[Tuple[str, float, str]]
+
+
+_BRACKET_RE = re.compile(r"\[[^\]]+\]")
+_REF_RE = re.compile(r"\(ref\.?\s*\d+\)", re.I)
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def strip_citations(s: str) -> str:
+    # remove any bracketed citations like [1], [12, 13], or multi-line like [ 12 ]
+    if "[" in s:
+        s = _BRACKET_RE.sub("", s)
+    # remove in-text citations like (ref. 12) loosely
+    if "(" in s:
+        s = _REF_RE.sub("", s)
+    # same as re.sub(r"\s+", " ", s).strip(): both use str.isspace()
+    return " ".join(s.split())
+
+
+def peptide_targets(peptide: str) -> List[str]:
+    targets = [peptide.lower()]
+    if peptide.lower() in PEPTIDE_SYNONYMS:
+        targets += [t.lower() for t in PEPTIDE_SYNONYMS[peptide.lower()]]
+    return targets
+
+
+def _candidates(sections: Sections, positive_only: bool) -> List[Tuple[str, str, str]]:
+    """(cleaned sentence, lowercased, section) for sentences of a plausible length."""
+    out = []
+    for section_name, text in sections:
+        # If fulltext and positive_only, skip to avoid noise; we want Abstract/Conclusions
+        if section_name == "fulltext" and positive_only:
+            continue
+        for s in _SENTENCE_RE.split(text):
+            s_clean = strip_citations(s)
+            sl = s_clean.lower()
+            if not sl or len(s_clean) < 60 or len(s_clean) > 350:
+                continue
+            out.append((s_clean, sl, section_name))
+    return out
+
+
+def rank_sentences(docs: Sequence[Tuple[str, Sections]], positive_only: bool = True, k: int = TOP_K) -> List[Ranked]:
+    """Top-k (sentence, score, section) per (peptide, sections) document.
+
+    Batches smaller than BATCH_MIN_SENTENCES (e.g. one article) use the loop:
+    per-term scans of a short buffer cost more than they save there.
+    """
+    candidates = [_candidates(sections, positive_only) for _, sections in docs]
+    peptides = [peptide for peptide, _ in docs]
+    if np is None or sum(len(c) for c in candidates) < BATCH_MIN_SENTENCES:
+        return [score_candidates_py(p, c, positive_only, k) for p, c in zip(peptides, candidates)]
+    return score_candidates_np(peptides, candidates, positive_only, k)
+
+
+def score_candidates_py(peptide: str, candidates: List[Tuple[str, str, str]], positive_only: bool = True, k: int = TOP_K) -> Ranked:
+    targets = peptide_targets(peptide)
+    sentences_ranked: Ranked = []
+    for s_clean, sl, section_name in candidates:
+        if any(t in sl for t in NOISE_TERMS):
+            continue
+        if not any(t in sl for t in targets):
+            continue
+        # Exclude mechanistic/assay-heavy sentences
+        if any(t in sl for t in EXCLUDE_TERMS):
+            continue
+        # Exclude animal contexts
+        if any(t in sl for t in ANIMAL_TERMS):
+            continue
+        # Positivity scoring
+        score = 0.0
+        for kw, w in KEYWORD_WEIGHTS.items():
+            if kw in sl:
+                score += w
+        # Require clear benefit terms for marketing value
+        if not any(bt in sl for bt in BENEFIT_TERMS):
+            continue
+        # Boost sentences mentioning RCT/meta-analysis/systematic review
+        if any(tag in sl for tag in TRIAL_TAGS):
+            score += 0.8
+        # Boost human clinical context (patients, participants, adults)
+        if any(tag in sl for tag in HUMAN_TAGS):
+            score += 0.5
+        # Prefer quantified outcomes
+        if QUANT_RE.search(sl):
+            score += 0.5
+        if positive_only and score <= 0:
+            continue
+        # Lightly prefer Abstract/Conclusion
+        if any(tag in section_name for tag in STRONG_SECTIONS):
+            score += 0.7
+        sentences_ranked.append((s_clean, score, section_name))
+
+    # same order as a stable descending sort, without sorting every sentence
+    return heapq.nlargest(k, sentences_ranked, key=lambda t: t[1])
+
+
+_MINIMAL: Dict[Tuple[str, ...], List[str]] = {}
+
+
+def _minimal_terms(terms: Tuple[str, ...]) -> List[str]:
+    """Drop terms that contain another term of the set ("in rats" when "rat" is
+    there): for an OR mask they can never add a row."""
+    out = _MINIMAL.get(terms)
+    if out is None:
+        uniq = list(dict.fromkeys(terms))
+        out = _MINIMAL[terms] = [t for t in uniq if not any(u != t and u in t for u in uniq)]
+    return out
+
+
+class _Batch:
+    """Lowercased sentences joined into one NUL-separated buffer.
+
+    A term column is built by scanning the buffer with str.find (a C-level
+    search over all sentences at once); match offsets map back to rows with
+    np.searchsorted, giving the sparse (row, term) entries of the
+    term-presence matrix. Terms never contain NUL, so a match cannot span two
+    sentences.
+    """
+
+    def __init__(self, texts: List[str]) -> None:
+        self.texts = texts
+        self.n = len(texts)
+        # a stray NUL inside a sentence would shift the row offsets; no term contains \x01 either
+        self.buf = "\x00".join(t.replace("\x00", "\x01") if "\x00" in t else t for t in texts)
+        lengths = np.fromiter((len(t) + 1 for t in texts), dtype=np.int64, count=self.n)
+        self.starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) if self.n else np.zeros(0, dtype=np.int64)
+
+    def _offsets(self, term: str, offsets: List[int], lo: int = 0, hi: Optional[int] = None) -> None:
+        """Append the offset of the first match of `term` in each row of [lo, hi) that has one."""
+        buf, find = self.buf, self.buf.find
+        start = int(self.starts[lo]) if lo < self.n else len(buf)
+        stop = int(self.starts[hi]) if hi is not None and hi < self.n else len(buf)
+        i = find(term, start, stop)
+        while i >= 0:
+            offsets.append(i)
+            # presence is all that matters: resume at the next sentence
+            end = find("\x00", i, stop)
+            if end < 0:
+                break
+            i = find(term, end + 1, stop)
+
+    def _flag(self, offsets: List[int]):
+        col = np.zeros(self.n, dtype=bool)
+        if offsets:
+            col[np.searchsorted(self.starts, np.asarray(offsets, dtype=np.int64), side="right") - 1] = True
+        return col
+
+    def column(self, term: str):
+        offsets: List[int] = []
+        self._offsets(term, offsets)
+        return self._flag(offsets)
+
+    def mask(self, terms: Sequence[str], lo: int = 0, hi: Optional[int] = None):
+        """Row contains any of `terms` (OR of their columns), for rows in [lo, hi)."""
+        offsets: List[int] = []
+        for t in _minimal_terms(tuple(terms)):
+            self._offsets(t, offsets, lo, hi)
+        return self._flag(offsets)
+
+    def subset(self, keep) -> "_Batch":
+        return _Batch([self.texts[i] for i in np.flatnonzero(keep).tolist()])
+
+
+def score_candidates_np(
+    peptides: Sequence[str],
+    candidates: Sequence[List[Tuple[str, str, str]]],
+    positive_only: bool = True,
+    k: int = TOP_K,
+) -> List[Ranked]:
+    """Top-k per document, given each document's peptide and _candidates() output."""
+    # peptide targets differ per document: lay rows out grouped by target list
+    # so each group's target columns scan one contiguous slice of the buffer
+    groups: Dict[Tuple[str, ...], List[int]] = {}
+    for d, peptide in enumerate(peptides):
+        groups.setdefault(tuple(peptide_targets(peptide)), []).append(d)
+    rows: List[Tuple[str, str, str]] = []
+    doc_of: List[int] = []
+    spans: List[Tuple[Tuple[str, ...], int, int]] = []
+    for targets, ds in groups.items():
+        lo = len(rows)
+        for d in ds:
+            rows.extend(candidates[d])
+            doc_of.extend([d] * len(candidates[d]))
+        spans.append((targets, lo, len(rows)))
+    out: List[Ranked] = [[] for _ in peptides]
+    if not rows:
+        return out
+
+    batch = _Batch([r[1] for r in rows])
+    doc = np.array(doc_of, dtype=np.int64)
+    idx = np.arange(batch.n)
+
+    def narrow(keep) -> None:
+        # drop rejected rows so later columns scan a smaller buffer
+        nonlocal batch, doc, idx
+        batch, doc, idx = batch.subset(keep), doc[keep], idx[keep]
+
+    # the masks commute; the peptide mention is the most selective, so it goes first
+    target_mask = np.zeros(batch.n, dtype=bool)
+    for targets, lo, hi in spans:
+        target_mask |= batch.mask(targets, lo, hi)
+    narrow(target_mask)
+    narrow(~batch.mask(_REJECT_TERMS) & batch.mask(BENEFIT_TERMS))
+    if not batch.n:
+        return out
+
+    score = np.zeros(batch.n, dtype=np.float64)
+    for kw, w in KEYWORD_WEIGHTS.items():
+        # one column at a time, in dict order: the same additions as the Python loop
+        score[batch.column(kw)] += w
+    score[batch.mask(TRIAL_TAGS)] += 0.8
+    score[batch.mask(HUMAN_TAGS)] += 0.5
+    # Unicode \d/\s/\b semantics: run the str regex on the (few) survivors
+    quant = np.fromiter((QUANT_RE.search(t) is not None for t in batch.texts), dtype=bool, count=batch.n)
+    score[quant] += 0.5
+    if positive_only:
+        positive = score > 0
+        score, doc, idx = score[positive], doc[positive], idx[positive]
+    strong = np.fromiter(
+        (any(tag in rows[i][2] for tag in STRONG_SECTIONS) for i in idx.tolist()), dtype=bool, count=len(idx)
+    )
+    score[strong] += 0.7
+
+    by_doc = np.argsort(doc, kind="stable")
+    docs_present, first = np.unique(doc[by_doc], return_index=True)
+    for d, sel in zip(docs_present.tolist(), np.split(by_doc, first[1:])):
+        for j in _top_k(score[sel], k):
+            i = int(idx[sel[j]])
+            out[d].append((rows[i][0], float(score[sel[j]]), rows[i][2]))
+    return out
+
+
+def _top_k(scores, k: int) -> List[int]:
+    """Positions of the k highest scores, ordered like a stable descending sort."""
+    n = len(scores)
+    if k <= 0:
+        return []
+    if n > k:
+        kth = np.partition(scores, n - k)[n - k]
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[: k - len(above)]
+        cand = np.concatenate([above, ties])
+    else:
+        cand = np.arange(n)
+    order = np.lexsort((cand, -scores[cand]))
+    return cand[order].tolist()
@@ -0,0 +1,5 @@
+"""Run the tests against the scripts as they are imported when run directly (python3 scripts/x.py)."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
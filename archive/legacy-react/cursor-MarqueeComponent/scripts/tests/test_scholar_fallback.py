@@ -0,0 +1,52 @@
+"""validate_quotes.py --scholar-fallback with a stubbed Scholar search."""
+from __future__ import annotations
+
+import json
+
+import scholar_fallback
+import validate_quotes
+from records import Candidate
+from scholar_fallback import ScholarFallback
+
+SUGGESTION = {
+    "replacement_quote": "Semaglutide reduced body weight by 15% in adults with obesity.",
+    "paper_title": "Once-weekly semaglutide in adults with overweight or obesity",
+    "authors": "Wilding JPH, Batterham RL",
+    "year": "2021",
+    "url": "https://www.ncbi.nlm.nih.gov/pmc/articles/PMC1234567/",
+    "fuzzy_score": 0.95,
+    "query": "semaglutide randomized trial",
+}
+
+
+def test_failing_quote_gets_suggestions(tmp_path, monkeypatch):
+    """Candidate suggestions from the search reach the report and the proposed file as plain JSON."""
+    searched = []
+
+    def search(quote, **kwargs):
+        searched.append(quote)
+        return [Candidate(**SUGGESTION)]
+
+    class Stubbed(ScholarFallback):
+        def __init__(self, **kwargs):
+            super().__init__(search=search, **kwargs)
+
+    monkeypatch.setattr(scholar_fallback, "ScholarFallback", Stubbed)
+    monkeypatch.chdir(tmp_path)  # .cache/ stores (seen URLs, query stats, history) stay in tmp_path
+    quotes = tmp_path / "quotes.json"
+    # nothing listens on port 9: the fetch fails and the quote goes to the fallback
+    quotes.write_text(json.dumps({"quotes": [
+        {"id": 1, "quote": "Semaglutide cut weight.", "source": "http://127.0.0.1:9/article", "peptide_name": "Semaglutide"},
+    ]}), encoding="utf-8")
+    out = tmp_path / "report.json"
+
+    assert validate_quotes.main([
+        "--files", str(quotes), "--out", str(out), "--no-epmc", "--delay", "0", "--scholar-fallback",
+        "--verified-out-dir", str(tmp_path / "verified"), "--proposed-out-dir", str(tmp_path / "proposed"),
+    ]) == 0
+
+    assert searched == ["Semaglutide cut weight."]
+    (row,) = json.loads(out.read_text(encoding="utf-8"))["results"]
+    assert row["scholar_suggestions"] == [SUGGESTION]
+    proposed = json.loads((tmp_path / "proposed" / "quotes.verified.proposed.json").read_text(encoding="utf-8"))
+    assert proposed["proposed_quotes"] == [SUGGESTION]
@@ -0,0 +1,125 @@
+"""validate_server.py against a local http.server stub publisher."""
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from validate_server import ValidationService
+
+ARTICLE = (
+    "<html><body><h2>Abstract</h2><p>Semaglutide reduced body weight by 15% in adults with obesity "
+    "over 68 weeks compared with placebo.</p></body></html>"
+).encode("utf-8")
+QUOTE = "Semaglutide reduced body weight by 15% in adults with obesity over 68 weeks compared with placebo."
+
+
+@pytest.fixture
+def publisher():
+    """A stub publisher that serves ARTICLE slowly (so requests overlap) and counts GETs per path."""
+    hits = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits[self.path] = hits.get(self.path, 0) + 1
+            time.sleep(0.3)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(ARTICLE)))
+            self.end_headers()
+            self.wfile.write(ARTICLE)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", hits
+    server.shutdown()
+    server.server_close()
+
+
+def _post(port: int, payload) -> tuple:
+    req = urllib.request.Request(f"http://127.0.0.1:{port}/validate", data=json.dumps(payload).encode("utf-8"), method="POST")
+    try:
+        with urllib.request.urlopen(req, timeout=10) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def _run(service: ValidationService, requests):
+    """POST each payload concurrently to the service on an ephemeral port; returns [(status, doc)]."""
+
+    async def main():
+        server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.gather(*(loop.run_in_executor(None, _post, port, p) for p in requests))
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    return asyncio.run(main())
+
+
+@pytest.fixture
+def make_service():
+    services = []
+
+    def make(**kwargs) -> ValidationService:
+        services.append(ValidationService(**kwargs))
+        return services[-1]
+
+    yield make
+    for service in services:
+        service.pool.shutdown(wait=False)
+
+
+def test_concurrent_requests_share_one_fetch(publisher, make_service):
+    base, hits = publisher
+    service = make_service(min_score=0.9, fetch_concurrency=8)
+    n = 8
+    # different quote ids and texts, so only the document fetch can be shared
+    payloads = [{"id": i, "quote": QUOTE if i % 2 else QUOTE[:60], "source": f"{base}/article"} for i in range(n)]
+    out = _run(service, payloads)
+    assert hits == {"/article": 1}
+    assert service.stats["fetches"] == 1
+    assert service.stats["coalesced"] + service.stats["doc_hits"] + service.stats["result_hits"] == n - 1
+    assert all(status == 200 and doc["result"]["verified"] for status, doc in out)
+
+
+def test_results_expire_with_their_document(publisher, make_service):
+    base, hits = publisher
+    now = [1000.0]
+    service = make_service(doc_ttl=60.0, clock=lambda: now[0])
+    payload = {"quote": QUOTE, "source": f"{base}/ttl"}
+    _run(service, [payload])
+    now[0] += 59.0
+    _run(service, [payload])
+    assert hits["/ttl"] == 1 and service.stats["result_hits"] == 1
+    now[0] += 2.0
+    _run(service, [payload])
+    assert hits["/ttl"] == 2
+
+
+def test_non_string_fields_are_bad_requests(publisher, make_service):
+    base, hits = publisher
+    service = make_service()
+    single, batch = _run(service, [
+        {"quote": 5, "source": f"{base}/x"},
+        {"quotes": [{"quote": QUOTE, "source": ["not", "a", "url"]}, {"quote": QUOTE, "source": f"{base}/ok"}]},
+    ])
+    assert single[0] == 400 and "'quote' must be a string" in single[1]["error"]
+    assert batch[0] == 200
+    first, second = batch[1]["results"]
+    assert "'source' must be a string" in first["error"]
+    assert second["verified"]
+    assert "/x" not in hits
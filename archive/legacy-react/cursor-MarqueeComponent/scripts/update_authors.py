@@ -14,17 +14,29 @@ Logic:
     from meta tags (citation_author) or page author blocks (PMC pages).
   - If 'scientist' contains a comma-separated author list, trim to the first
     author.
-  - Write updated files in place.
+  - PMC/PubMed sources are first resolved in bulk through Europe PMC
+    (epmc_metadata.py); the remaining placeholder sources are grouped by
+    URL and resolved concurrently; only
+    the <head> is parsed when it carries citation_author meta tags.
+    URL -> first author results are cached across runs in
+    .cache/author-cache.json (fetch failures are not cached).
+  - Write updated files in place, or with --store PATH update only the
+    affected rows of the SQLite quote store (quote_store.py).
 """
 from __future__ import annotations
 
+import argparse
 import json
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 DATA_DIR = Path('src/data')
 FILES = [DATA_DIR / 'peptide-quotes.final.json', DATA_DIR / 'peptide-quotes.staging.json']
+AUTHOR_CACHE = Path('.cache/author-cache.json')
 
 PLACEHOLDERS = {
     'study authors', 'review authors', 'systematic review authors',
@@ -43,28 +55,88 @@ try:
 except Exception:
     urllib_request = None  # type: ignore
 
+try:
+    from .http_cassette import add_cassette_args, cassette_fetch, configure_from_args  # type: ignore
+except Exception:
+    from http_cassette import add_cassette_args, cassette_fetch, configure_from_args  # type: ignore
+
+try:
+    from .epmc_metadata import resolve_metadata  # type: ignore
+except Exception:
+    from epmc_metadata import resolve_metadata  # type: ignore
+
 UA = (
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
     "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
 )
 
 
-def fetch(url: str) -> Optional[str]:
+def _fetch_live(url: str):
     if not urllib_request:
-        return None
+        return None, None, 'urllib not available'
     try:
         req = urllib_request.Request(url, headers={'User-Agent': UA})
         with urllib_request.urlopen(req, timeout=30) as resp:
-            data = resp.read()
-        try:
-            return data.decode('utf-8', errors='ignore')
-        except Exception:
-            return data.decode('latin-1', errors='ignore')
+            return resp.read(), resp.headers.get('Content-Type'), 'ok'
+    except Exception as e:
+        return None, None, f'fetch_error: {e}'
+
+
+def fetch(url: str) -> Optional[str]:
+    data, _, _ = cassette_fetch(url, _fetch_live)
+    if data is None:
+        return None
+    try:
+        return data.decode('utf-8', errors='ignore')
+    except Exception:
+        return data.decode('latin-1', errors='ignore')
+
+
+_HEAD_END = re.compile(r'</head\s*>|<body[\s>]', re.I)
+_HEAD_SCAN_LIMIT = 256 * 1024
+
+
+class _FirstAuthorFound(Exception):
+    pass
+
+
+class _HeadMetaParser(HTMLParser):
+    """Collects the first citation_author meta tag and stops right there."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.author: Optional[str] = None
+
+    def handle_starttag(self, tag: str, attrs: List[Any]) -> None:
+        if tag != 'meta':
+            return
+        a = {k.lower(): (v or '') for k, v in attrs}
+        if a.get('name', '').lower() == 'citation_author' and a.get('content', '').strip():
+            self.author = a['content'].strip()
+            raise _FirstAuthorFound()
+
+
+def extract_first_author_from_head(html: str) -> Optional[str]:
+    """Fast path: scan only the <head> for citation_author, without building a soup."""
+    if not html:
+        return None
+    m = _HEAD_END.search(html, 0, _HEAD_SCAN_LIMIT)
+    head = html[: m.start()] if m else html[:_HEAD_SCAN_LIMIT]
+    parser = _HeadMetaParser()
+    try:
+        parser.feed(head)
+        parser.close()
+    except _FirstAuthorFound:
+        pass
     except Exception:
         return None
+    return parser.author
 
 
 def extract_first_author_from_html(html: str) -> Optional[str]:
+    head_author = extract_first_author_from_head(html)
+    if head_author:
+        return head_author
     if not BeautifulSoup or not html:
         return None
     soup = BeautifulSoup(html, 'html.parser')
@@ -101,10 +173,71 @@ def extract_first_author_from_html(html: str) -> Optional[str]:
     return None
 
 
-def normalize_scientist(current: Optional[str], source_url: Optional[str]) -> Optional[str]:
+def is_placeholder(current: Optional[str]) -> bool:
     s = (current or '').strip()
-    sl = s.lower()
-    if not s or sl in PLACEHOLDERS:
+    return not s or s.lower() in PLACEHOLDERS
+
+
+def load_author_cache(path: Path = AUTHOR_CACHE) -> Dict[str, Optional[str]]:
+    try:
+        return json.loads(path.read_text(encoding='utf-8')).get('authors', {})
+    except Exception:
+        return {}
+
+
+def save_author_cache(cache: Dict[str, Optional[str]], path: Path = AUTHOR_CACHE) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + '.tmp')
+    tmp.write_text(json.dumps({'authors': cache}, indent=2, sort_keys=True), encoding='utf-8')
+    os.replace(tmp, path)
+
+
+_FETCH_FAILED = object()
+
+
+def _resolve_one(url: str) -> Any:
+    html = fetch(url)
+    if html is None:
+        return _FETCH_FAILED
+    return extract_first_author_from_html(html)
+
+
+def resolve_first_authors(
+    urls: List[str],
+    cache: Optional[Dict[str, Optional[str]]] = None,
+    concurrency: int = 8,
+    use_epmc: bool = True,
+) -> Dict[str, Optional[str]]:
+    """Resolve first authors for many source URLs, fetching each distinct URL once.
+
+    PMC/PubMed URLs are looked up in batches via Europe PMC first; only what
+    is left is scraped. `cache` is updated in place; pages that could not be
+    fetched are left out so they are retried on the next run.
+    """
+    cache = cache if cache is not None else {}
+    todo = sorted({u for u in urls if u and u not in cache})
+    if use_epmc and todo:
+        for url, meta in resolve_metadata(todo).items():
+            if meta.first_author:
+                cache[url] = meta.first_author
+        todo = [u for u in todo if u not in cache]
+    if todo:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as ex:
+            for url, author in zip(todo, ex.map(_resolve_one, todo)):
+                if author is not _FETCH_FAILED:
+                    cache[url] = author
+    return {u: cache.get(u) for u in urls if u}
+
+
+def normalize_scientist(
+    current: Optional[str],
+    source_url: Optional[str],
+    authors: Optional[Dict[str, Optional[str]]] = None,
+) -> Optional[str]:
+    s = (current or '').strip()
+    if is_placeholder(current):
+        if authors is not None and source_url in authors:
+            return authors[source_url] or current
         # need to fetch
         html = fetch(source_url) if source_url else None
         a = extract_first_author_from_html(html) if html else None
@@ -117,28 +250,109 @@ def normalize_scientist(current: Optional[str], source_url: Optional[str]) -> Op
     return current
 
 
-def process_file(path: Path) -> int:
-    if not path.exists():
-        return 0
-    doc = json.loads(path.read_text(encoding='utf-8'))
-    quotes = doc.get('quotes', [])
+def placeholder_sources(quotes: List[Dict[str, Any]]) -> List[str]:
+    return [q['source'] for q in quotes if q.get('source') and is_placeholder(q.get('scientist'))]
+
+
+def normalize_quotes(quotes: List[Dict[str, Any]], authors: Optional[Dict[str, Optional[str]]] = None) -> int:
+    """Normalize 'scientist' on loaded quotes in place; returns the number changed."""
     changed = 0
     for q in quotes:
         before = q.get('scientist')
-        after = normalize_scientist(before, q.get('source'))
+        after = normalize_scientist(before, q.get('source'), authors)
         if after and after != before:
             q['scientist'] = after
             changed += 1
+    return changed
+
+
+def process_file(path: Path, authors: Optional[Dict[str, Optional[str]]] = None) -> int:
+    if not path.exists():
+        return 0
+    doc = json.loads(path.read_text(encoding='utf-8'))
+    quotes = doc.get('quotes', [])
+    if authors is None:
+        authors = resolve_first_authors(placeholder_sources(quotes))
+    changed = normalize_quotes(quotes, authors)
     if changed:
         path.write_text(json.dumps(doc, indent=2), encoding='utf-8')
     print(f"Updated {changed} quotes in {path}")
     return changed
 
 
-def main() -> int:
+def _store_candidates_sql() -> Tuple[str, Tuple[Any, ...]]:
+    """SQL filter for rows normalize_scientist may change: placeholders and author lists."""
+    marks = ', '.join('?' for _ in PLACEHOLDERS)
+    where = (
+        "scientist IS NULL OR trim(scientist) = '' "
+        f"OR lower(trim(scientist)) IN ({marks}) OR scientist LIKE '%,%'"
+    )
+    return where, tuple(sorted(PLACEHOLDERS))
+
+
+def store_placeholder_sources(store: Any) -> List[str]:
+    where, params = _store_candidates_sql()
+    urls: List[str] = []
+    for coll in ('final', 'staging'):
+        urls += placeholder_sources([q for _, q in store.quotes(coll, where, params)])
+    return urls
+
+
+def process_store(store: Any, authors: Dict[str, Optional[str]]) -> int:
+    where, params = _store_candidates_sql()
+    changed = 0
+    with store.transaction():
+        for coll in ('final', 'staging'):
+            for rowid, q in store.quotes(coll, where, params):
+                before = q.get('scientist')
+                after = normalize_scientist(before, q.get('source'), authors)
+                if after and after != before:
+                    store.update(rowid, {'scientist': after})
+                    changed += 1
+    print(f"Updated {changed} quotes in {store.path}")
+    return changed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--concurrency', type=int, default=8, help='Concurrent source fetches for author resolution')
+    ap.add_argument('--cache', default=str(AUTHOR_CACHE), help='URL -> first author cache file')
+    ap.add_argument('--no-cache', action='store_true', help='Ignore and do not update the author cache')
+    ap.add_argument('--no-epmc', action='store_true', help='Scrape PMC/PubMed pages instead of batch-resolving authors via Europe PMC')
+    ap.add_argument('--store', default=None, help='Update this SQLite quote store instead of the JSON files')
+    add_cassette_args(ap)
+    args = ap.parse_args(argv)
+    configure_from_args(args)
+
+    # Group placeholder sources across all files so each URL is fetched once
+    cache_path = Path(args.cache)
+    cache = {} if args.no_cache else load_author_cache(cache_path)
+    store = None
+    if args.store:
+        try:
+            from .quote_store import QuoteStore  # type: ignore
+        except Exception:
+            from quote_store import QuoteStore  # type: ignore
+        store = QuoteStore(Path(args.store))
+        urls = store_placeholder_sources(store)
+    else:
+        urls = []
+        for f in FILES:
+            if f.exists():
+                urls += placeholder_sources(json.loads(f.read_text(encoding='utf-8')).get('quotes', []))
+    authors = resolve_first_authors(urls, cache, concurrency=args.concurrency, use_epmc=not args.no_epmc)
+    if not args.no_cache:
+        save_author_cache(cache, cache_path)
+
+    if store is not None:
+        with store:
+            total = process_store(store, authors)
+        print(f"Total updated: {total}")
+        return 0
+
     total = 0
     for f in FILES:
-        total += process_file(f)
+        total += process_file(f, authors)
     print(f"Total updated: {total}")
     return 0
 
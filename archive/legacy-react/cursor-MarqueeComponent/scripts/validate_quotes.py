@@ -7,6 +7,14 @@ validate that the quoted text appears in the cited source. Works best with
 HTML sources (PMC, PubMed, Frontiers, etc.). PDF parsing and HTML parsing are
 optional if third-party libraries are available.
 
+PMC sources are checked against the Europe PMC JATS XML of the article when
+it is available (scripts/jats.py), falling back to the HTML page. doi.org
+sources are resolved once, concurrently, and fetched from the cached final
+URL (scripts/doi_resolver.py, .cache/doi-resolved.json). When one mirror of
+an article (JATS XML, PMC page, DOI) is slow, the next can be requested
+after --hedge-after seconds (opt-in; scripts/mirrors.py). A DOI body is
+only taken over the other mirrors when the quote matches it.
+
 Outputs a JSON report with per-quote validation results.
 Optionally emits filtered, high-quality JSON files (only academically
 validated quotes) next to the inputs or in a specified directory.
@@ -16,7 +24,36 @@ Run:
     --files src/data/scientific-quotes.json src/data/peptide-specific-quotes.json \
     --out validation_report.json
 
-Note: Network access is required to fetch sources.
+With --deadline HH:MM or --budget 45m the quotes that need a download are
+ordered riskiest-first (never validated, failing, oldest result; slow hosts
+last) and the run stops when time is up; unreached quotes are reported as
+"deferred" with their previous result (scripts/validation_schedule.py).
+
+With --scholar-fallback, failing quotes are searched on Google Scholar while
+the remaining quotes are still being validated, within --scholar-timeout per
+search and --scholar-budget overall (see scripts/scholar_fallback.py).
+
+Watch mode keeps the validator running with warm caches and revalidates only
+added or changed quotes after each save (see scripts/quote_watch.py):
+  python3 scripts/validate_quotes.py --files src/data/*.json --watch
+
+Large runs can be split across machines with --shard i/N (1-based). Every
+shard computes the same plan from the --files: a host stays on one shard, so
+its requests (and --delay politeness) stay on one machine, except a host with
+more than a fair share of the quotes (PMC, usually), whose sources are spread
+over all shards, each fetching from it with --delay times N. Shard reports are
+combined, and the .verified.json/.verified.proposed.json outputs written,
+by scripts/merge_shards.py:
+  python3 scripts/validate_quotes.py --files ... --shard 2/4 --out report.2.json
+  python3 scripts/merge_shards.py report.*.json --out validation_report.json \
+    --verified-out-dir src/data
+
+--metrics-out PATH writes fetch/parse/match/cache metrics for the run to
+PATH.prom (Prometheus textfile collector) and PATH.json (scripts/metrics.py).
+
+Note: Network access is required to fetch sources, unless replaying a
+cassette recorded earlier with --record DIR (see scripts/http_cassette.py):
+  python3 scripts/validate_quotes.py --files ... --replay .cassettes/run1
 """
 
 from __future__ import annotations
@@ -26,9 +63,11 @@ import json
 import re
 import sys
 import time
-from dataclasses import dataclass, asdict
+import urllib.parse
+from contextlib import closing
+from dataclasses import dataclass, fields
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 try:
     # Optional, for better HTML parsing
@@ -48,6 +87,26 @@ try:
 except Exception:  # pragma: no cover - standard lib
     SequenceMatcher = None  # type: ignore
 
+try:
+    from . import fuzzy_parallel  # type: ignore
+except Exception:  # when run as a script without package context
+    import fuzzy_parallel  # type: ignore
+
+try:
+    from . import metrics  # type: ignore
+except Exception:  # when run as a script without package context
+    import metrics  # type: ignore
+
+try:
+    from . import mirrors  # type: ignore
+except Exception:  # when run as a script without package context
+    import mirrors  # type: ignore
+
+try:
+    from .records import intern_str  # type: ignore
+except Exception:  # when run as a script without package context
+    from records import intern_str  # type: ignore
+
 try:
     # Standard library HTTP
     import urllib.request as urllib_request
@@ -56,6 +115,16 @@ except Exception:
     urllib_request = None  # type: ignore
     urllib_error = None  # type: ignore
 
+try:
+    from .http_cassette import add_cassette_args, cassette_fetch, configure_from_args  # type: ignore
+except Exception:  # when run as a script without package context
+    from http_cassette import add_cassette_args, cassette_fetch, configure_from_args  # type: ignore
+
+try:
+    from .pipeline import imap  # type: ignore
+except Exception:
+    from pipeline import imap  # type: ignore
+
 
 FETCH_TIMEOUT = 30
 USER_AGENT = (
@@ -64,7 +133,11 @@ USER_AGENT = (
 )
 
 
-@dataclass
+# slotted records (no per-instance __dict__); repeated strings are interned (records.py)
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_SLOTS)
 class QuoteItem:
     id: Any
     quote: str
@@ -72,7 +145,7 @@ class QuoteItem:
     context: Dict[str, Any]
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ValidationResult:
     id: Any
     source: str
@@ -85,6 +158,16 @@ class ValidationResult:
     notes: Optional[str]
     file: Optional[str] = None
 
+    def __post_init__(self) -> None:
+        self.source = intern_str(self.source)
+        self.source_type = intern_str(self.source_type)
+        self.content_type = intern_str(self.content_type)
+        self.status = intern_str(self.status)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of the fields (shallow; asdict() would deep-copy every value)."""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
 
 def load_quotes(file_path: Path) -> List[QuoteItem]:
     data = json.loads(file_path.read_text(encoding="utf-8"))
@@ -98,23 +181,41 @@ def load_quotes(file_path: Path) -> List[QuoteItem]:
             QuoteItem(
                 id=q.get("id"),
                 quote=quote_text.strip(),
-                source=source.strip(),
-                context={k: v for k, v in q.items() if k not in ("id", "quote", "source")},
+                source=intern_str(source.strip()),
+                context={k: intern_str(v) for k, v in q.items() if k not in ("id", "quote", "source")},
             )
         )
     return quotes
 
 
 def fetch_url(url: str) -> Tuple[Optional[bytes], Optional[str], str]:
+    """Fetch `url`, honouring the active record/replay cassette if any."""
+    return cassette_fetch(url, _fetch_live)
+
+
+def _fetch_live(url: str) -> Tuple[Optional[bytes], Optional[str], str]:
     if urllib_request is None:
         return None, None, "urllib not available"
     req = urllib_request.Request(url, headers={"User-Agent": USER_AGENT})
+    host = metrics.host_of(url) or "unknown"
+    t0 = time.perf_counter()
     try:
         with urllib_request.urlopen(req, timeout=FETCH_TIMEOUT) as resp:
             content_type = resp.headers.get("Content-Type")
             data = resp.read()
+            metrics.observe("quotes_fetch_seconds", time.perf_counter() - t0, host=host)
+            metrics.inc("quotes_fetch_bytes_total", len(data), host=host)
             return data, content_type, "ok"
     except Exception as e:  # pragma: no cover - network issues
+        metrics.observe("quotes_fetch_seconds", time.perf_counter() - t0, host=host)
+        code = getattr(e, "code", None)
+        if code in (429, 503):
+            metrics.inc("quotes_fetch_throttled_total", host=host)
+        if isinstance(code, int):
+            kind = "http_4xx" if code < 500 else "http_5xx"
+        else:
+            kind = "timeout" if "timed out" in str(e).lower() else "other"
+        metrics.inc("quotes_fetch_errors_total", host=host, kind=kind)
         return None, None, f"fetch_error: {e}"
 
 
@@ -186,12 +287,19 @@ def best_fuzzy_contains(needle: str, haystack: str) -> Tuple[float, Optional[str
     best_span: Optional[Tuple[int, int]] = None
     step = max(20, n_len // 4)
     window = min(len(h), max(1000, n_len + 200))
-    for i in range(0, len(h), step):
-        segment = h[i : i + window]
-        ratio = SequenceMatcher(None, n, segment).ratio()
-        if ratio > best:
-            best = ratio
+    # --fuzzy-workers: split the window scan across processes (see fuzzy_parallel.py)
+    scanned = fuzzy_parallel.scan_windows(n, h, step, window)
+    if scanned is not None:
+        best, i = scanned
+        if i >= 0:
             best_span = (i, min(i + window, len(h)))
+    else:
+        for i in range(0, len(h), step):
+            segment = h[i : i + window]
+            ratio = SequenceMatcher(None, n, segment).ratio()
+            if ratio > best:
+                best = ratio
+                best_span = (i, min(i + window, len(h)))
     excerpt = None
     if best_span is not None:
         s, e = best_span
@@ -228,15 +336,63 @@ def classify_source(source: str, source_type: Optional[str]) -> str:
     return "web_html"
 
 
+def fetch_source(
+    url: str, accept: Optional[Callable[[bytes, Optional[str]], bool]] = None
+) -> Tuple[Optional[bytes], Optional[str], str]:
+    """fetch_url, going straight to the resolved URL of DOI sources (doi_resolver.py),
+    preferring Europe PMC JATS XML over the HTML page for PMC articles (jats.py) and
+    hedging slow mirrors of the same article (mirrors.py). `accept` decides whether
+    an equivalent mirror's body is the article (see jats.fetch_article)."""
+    try:
+        from .doi_resolver import resolve_url  # type: ignore
+        from .jats import fetch_article  # type: ignore
+    except Exception:
+        from doi_resolver import resolve_url  # type: ignore
+        from jats import fetch_article  # type: ignore
+    return fetch_article(resolve_url(url), alternates=mirrors.equivalents(url), accept=accept)
+
+
 def validate_single(quote: QuoteItem) -> ValidationResult:
-    s_type_hint = quote.context.get("source_type")
-    s_class = classify_source(quote.source, s_type_hint)
-    data, content_type, status = fetch_url(quote.source)
+    return analyze_fetched(quote, fetch_source(quote.source))
+
+
+def fetch_quote_source(
+    quote: QuoteItem,
+    delay: float = 0.0,
+    timings: Optional[Dict[Tuple[str, str], float]] = None,
+    min_score: Optional[float] = None,
+) -> Tuple[Optional[bytes], Optional[str], str]:
+    """I/O half of validate_single; sleeps `delay` afterwards to stay polite.
+
+    With `timings`, the fetch's own duration (without the delay) is stored
+    under (source, quote) for the per-host history (validation_schedule.py).
+    With `min_score`, a body from an equivalent mirror (the DOI) is only
+    taken if the quote matches it.
+    """
+    accept = None
+    if min_score is not None:
+        accept = lambda body, ctype: _accepted(analyze_fetched(quote, (body, ctype, "ok")), min_score)  # noqa: E731
+    t0 = time.monotonic()
+    fetched = fetch_source(quote.source, accept=accept)
+    if timings is not None:
+        timings[(quote.source, quote.quote)] = time.monotonic() - t0
+    if delay > 0:
+        time.sleep(delay)
+    return fetched
+
+
+def analyze_fetched(quote: QuoteItem, fetched: Tuple[Optional[bytes], Optional[str], str]) -> ValidationResult:
+    """CPU half of validate_single: decode, extract text and fuzzy-match.
+
+    Module-level so it can run in a worker process (see pipeline.py).
+    """
+    s_class = classify_source(quote.source, quote.context.get("source_type"))
+    data, content_type, status = fetched
     if data is None:
         return ValidationResult(
             id=quote.id,
             source=quote.source,
-            source_type=s_type_hint,
+            source_type=quote.context.get("source_type"),
             exact_match=False,
             fuzzy_score=0.0,
             matched_excerpt=None,
@@ -244,15 +400,18 @@ def validate_single(quote: QuoteItem) -> ValidationResult:
             status=status,
             notes=f"Could not fetch source ({s_class}).",
         )
-
     ctype = content_type or ""
+    text, notes = source_text(data, ctype, s_class)
+    return match_source_text(quote, s_class, text, notes, ctype)
+
+
+def source_text(data: bytes, ctype: str, s_class: str) -> Tuple[str, Optional[str]]:
+    """(plain text, extraction notes) of a downloaded source: PDF, JATS XML or HTML."""
     text = ""
     notes = None
-    exact = False
-    score = 0.0
-    excerpt = None
-
-    if "pdf" in ctype or s_class == "pdf":
+    t0 = time.perf_counter()
+    kind = "pdf" if ("pdf" in ctype or s_class == "pdf") else "jats" if "jats" in ctype else "html"
+    if kind == "pdf":
         if PyPDF2 is None:
             notes = "PDF detected but PyPDF2 not installed; skipping text extraction."
         else:
@@ -268,6 +427,12 @@ def validate_single(quote: QuoteItem) -> ValidationResult:
                 text = "\n".join(pages_text)
             except Exception as e:
                 notes = f"PDF extraction error: {e}"
+    elif "jats" in ctype:
+        try:
+            from .jats import jats_text  # type: ignore
+        except Exception:
+            from jats import jats_text  # type: ignore
+        text = jats_text(data)
     else:
         # Treat as HTML/text
         try:
@@ -276,9 +441,23 @@ def validate_single(quote: QuoteItem) -> ValidationResult:
         except Exception:
             html = data.decode("latin-1", errors="ignore")
         text = html_to_text(html)
+    metrics.inc("quotes_documents_parsed_total", kind=kind)
+    metrics.observe("quotes_parse_seconds", time.perf_counter() - t0, kind=kind)
+    return text, notes
+
 
+def match_source_text(
+    quote: QuoteItem, s_class: str, text: str, notes: Optional[str], ctype: str
+) -> ValidationResult:
+    """Fuzzy-match `quote` against the extracted `text` of its source."""
+    s_type_hint = quote.context.get("source_type")
+    exact = False
+    score = 0.0
+    excerpt = None
     if text:
+        t0 = time.perf_counter()
         score, excerpt = best_fuzzy_contains(quote.quote, text)
+        metrics.observe("quotes_match_seconds", time.perf_counter() - t0)
         exact = score >= 0.999
 
     # Heuristics for clear non-academic sources
@@ -306,6 +485,192 @@ def validate_single(quote: QuoteItem) -> ValidationResult:
     )
 
 
+def validate_from_metadata(quote: QuoteItem, meta: Any, min_score: float) -> Optional[ValidationResult]:
+    """Validate against a Europe PMC abstract (see epmc_metadata.py) without fetching the page.
+
+    Returns None when the abstract does not contain the quote well enough, so
+    the caller falls back to downloading the article.
+    """
+    text = "\n".join(t for t in (meta.title, meta.abstract) if t)
+    if not text:
+        return None
+    score, excerpt = best_fuzzy_contains(quote.quote, text)
+    if score < min_score:
+        return None
+    ident = meta.pmcid or (f"PMID {meta.pmid}" if meta.pmid else "Europe PMC")
+    return ValidationResult(
+        id=quote.id,
+        source=quote.source,
+        source_type=quote.context.get("source_type"),
+        exact_match=score >= 0.999,
+        fuzzy_score=round(float(score), 3),
+        matched_excerpt=(excerpt[:400] if excerpt else None),
+        content_type="application/json",
+        status="ok",
+        notes=f"Matched in Europe PMC abstract ({ident})",
+        file=None,
+    )
+
+
+def _resolve_epmc_metadata(sources: List[str]) -> Dict[str, Any]:
+    try:
+        from .epmc_metadata import resolve_metadata  # type: ignore
+    except Exception:
+        from epmc_metadata import resolve_metadata  # type: ignore
+    resolved = resolve_metadata(sources)
+    for url, meta in resolved.items():
+        # the publisher page is one more mirror of a PMC article
+        if meta.doi and meta.pmcid and meta.pmcid.upper() in url.upper():
+            mirrors.register(url, f"https://doi.org/{meta.doi}")
+    return resolved
+
+
+def report_entry(res: ValidationResult, q: QuoteItem, path: Path) -> Dict[str, Any]:
+    """Report row for one quote: the validation result enriched with minimal context."""
+    entry = res.to_dict()
+    entry["quote_text"] = q.quote
+    entry["scientist"] = q.context.get("scientist")
+    entry["peptide_name"] = q.context.get("peptide_name")
+    entry["file"] = str(path)
+    return entry
+
+
+def _accepted(res: ValidationResult, min_score: float) -> bool:
+    return bool(res.exact_match or res.fuzzy_score >= min_score)
+
+
+def _deferred_result(quote: QuoteItem, last: Optional[Dict[str, Any]]) -> ValidationResult:
+    """Stand-in for a quote skipped by --deadline/--budget: its previous outcome, if any."""
+    if last is None:
+        notes = "Deferred: validation budget spent; never validated"
+    else:
+        when = time.strftime("%Y-%m-%d", time.localtime(float(last.get("at", 0))))
+        notes = f"Deferred: validation budget spent; last validated {when}"
+        if last.get("notes"):
+            notes += f" ({last['notes']})"
+    return ValidationResult(
+        id=quote.id,
+        source=quote.source,
+        source_type=quote.context.get("source_type"),
+        exact_match=bool(last and last.get("exact_match")),
+        fuzzy_score=float(last.get("fuzzy_score") or 0.0) if last else 0.0,
+        matched_excerpt=None,
+        content_type=None,
+        status="deferred",
+        notes=notes,
+    )
+
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """(index, count) from '2/4'; the index is 1-based."""
+    m = re.match(r"^\s*(\d+)\s*/\s*(\d+)\s*$", text or "")
+    if not m or not 1 <= int(m.group(1)) <= int(m.group(2)):
+        raise ValueError(f"invalid shard: {text!r} (use i/N with 1 <= i <= N)")
+    return int(m.group(1)), int(m.group(2))
+
+
+def plan_shards(sources: List[str], count: int) -> Tuple[Dict[str, int], Set[str]]:
+    """({source: 1-based shard}, hosts split across shards) for the sources of every quote.
+
+    A host with more quotes than a fair share (total / count) and more than one
+    source is split: its sources are placed one by one. Other hosts are placed
+    whole. Placement is largest first onto the least-loaded shard, with ties
+    broken by name, so every shard computes the same plan from the same files.
+    """
+    by_host: Dict[str, Dict[str, int]] = {}
+    for src in sources:
+        per_source = by_host.setdefault(metrics.host_of(src), {})
+        per_source[src] = per_source.get(src, 0) + 1
+    fair = len(sources) / max(1, count)
+    split = {h for h, per in by_host.items() if count > 1 and sum(per.values()) > fair and len(per) > 1}
+    # (quotes, key, sources): a split host's sources are placed one by one
+    items: List[Tuple[int, str, List[str]]] = []
+    for host, per in by_host.items():
+        if host in split:
+            items.extend((n, src, [src]) for src, n in per.items())
+        else:
+            items.append((sum(per.values()), host, list(per)))
+    loads = [0] * max(1, count)
+    plan: Dict[str, int] = {}
+    for n, _, srcs in sorted(items, key=lambda it: (-it[0], it[1])):
+        k = min(range(len(loads)), key=lambda j: (loads[j], j))
+        loads[k] += n
+        for src in srcs:
+            plan[src] = k + 1
+    return plan, split
+
+
+def write_outputs(
+    report: Dict[str, Any],
+    files: List[str],
+    min_score: float,
+    verified_out_dir: Optional[str] = None,
+    proposed_out_dir: Optional[str] = None,
+) -> None:
+    """Write .verified.json (and .verified.proposed.json) for each input file from a full report.
+
+    Proposed replacements are the "scholar_suggestions" of the report rows, so a
+    merged shard report produces the same files as a single run.
+    """
+    if not verified_out_dir:
+        return
+    out_dir = Path(verified_out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # Load original JSONs to preserve metadata
+    for f in files:
+        srcp = Path(f)
+        original = json.loads(srcp.read_text(encoding="utf-8"))
+        quotes = original.get("quotes", [])
+        # Join with results
+        file_results = [r for r in report["results"] if r.get("file") == str(srcp)]
+        # Decide acceptance criteria
+        verified_quotes = []
+        for q in quotes:
+            rid = q.get("id")
+            rlist = [r for r in file_results if r.get("id") == rid]
+            if not rlist:
+                continue
+            r = rlist[0]
+            sclass = classify_source(q.get("source", ""), q.get("source_type"))
+            academic = sclass in {"pmc_html","pubmed_html","journal_html","doi_landing","pdf"}
+            non_ac_flag = (r.get("notes") or "").find("Non-academic") >= 0
+            ok = (r.get("exact_match") or 0) or (r.get("fuzzy_score", 0.0) >= min_score)
+            if academic and ok and not non_ac_flag:
+                verified_quotes.append(q)
+        # Rebuild document
+        new_doc = dict(original)
+        new_doc["quotes"] = verified_quotes
+        # Update metadata counts
+        if "metadata" in new_doc and isinstance(new_doc["metadata"], dict):
+            new_doc["metadata"]["total_quotes"] = len(verified_quotes)
+            new_doc["metadata"]["verification_status"] = f"Filtered: {len(verified_quotes)} academically verified quotes"
+        # Write with .verified.json suffix
+        dst = out_dir / (srcp.stem + ".verified.json")
+        dst.write_text(json.dumps(new_doc, indent=2), encoding="utf-8")
+        print(f"Wrote verified JSON: {dst}")
+
+        # Optionally, also write proposed replacements alongside
+        if proposed_out_dir:
+            pdir = Path(proposed_out_dir)
+            pdir.mkdir(parents=True, exist_ok=True)
+            proposed = [s for r in file_results for s in r.get("scholar_suggestions") or []]
+            proposed_doc = {
+                "metadata": {
+                    "title": original.get("metadata", {}).get("title", "Proposed Academic Replacements"),
+                    "note": "These are Scholar-proposed candidate quotes for items that failed validation or were non-academic. Review before use."
+                },
+                "proposed_quotes": proposed,
+            }
+            dstp = pdir / (srcp.stem + ".verified.proposed.json")
+            dstp.write_text(json.dumps(proposed_doc, indent=2), encoding="utf-8")
+            print(f"Wrote proposed JSON: {dstp}")
+
+
+def _validate_serial(quotes: List[QuoteItem], fetch: Callable[[QuoteItem], Tuple[Optional[bytes], Optional[str], str]]):
+    for q in quotes:
+        yield analyze_fetched(q, fetch(q))
+
+
 def main(argv: Optional[List[str]] = None) -> int:
     p = argparse.ArgumentParser()
     p.add_argument("--files", nargs="+", required=True, help="JSON files to validate")
@@ -315,114 +680,255 @@ def main(argv: Optional[List[str]] = None) -> int:
     p.add_argument("--verified-out-dir", default=None, help="If set, emit filtered high-quality JSONs here with .verified.json suffix")
     p.add_argument("--scholar-fallback", action="store_true", help="Attempt Google Scholar fallback for non-academic or low-score quotes if scholarly is installed")
     p.add_argument("--scholar-max", type=int, default=3, help="Max results per fallback search")
+    p.add_argument("--scholar-timeout", type=float, default=120.0, help="Seconds allowed per Scholar fallback search")
+    p.add_argument("--scholar-budget", default=None, help="Overall time for the Scholar fallback (e.g. 600, 10m); also bounded by --deadline/--budget")
+    p.add_argument("--deterministic", action="store_true", help="Scholar fallback: ignore stored query yield statistics (built-in query order)")
     p.add_argument("--proposed-out-dir", default=None, help="If set, emit a parallel .verified.proposed.json containing Scholar-proposed replacements for filtered items")
+    p.add_argument("--no-epmc", action="store_true", help="Do not batch-resolve PMC/PubMed abstracts via Europe PMC before fetching article pages")
+    p.add_argument("--fetch-concurrency", type=int, default=1, help="Concurrent fetches; above 1, fetching overlaps parsing/matching in a process pool")
+    p.add_argument("--workers", type=int, default=None, help="Worker processes for parse/match when --fetch-concurrency > 1 (default: CPU count)")
+    p.add_argument("--fuzzy-workers", type=int, default=0, help="Processes for the fuzzy window scan of unmatched quotes; the scan stops at the first window reaching --min-score (default: serial)")
+    p.add_argument("--hedge-after", type=float, default=0.0, help="Seconds before a slow article fetch is hedged to the next mirror (JATS XML, PMC page, DOI); opt-in, e.g. 2 (hedged requests do not wait for --delay); 0 disables")
+    p.add_argument("--doi-cache", default=None, help="DOI -> final URL cache (default: .cache/doi-resolved.json)")
+    p.add_argument("--resolve-concurrency", type=int, default=8, help="Concurrent DOI redirect lookups before fetching")
+    p.add_argument("--deadline", default=None, help="Stop starting new validations at this time (HH:MM local, or ISO date-time); riskiest quotes first")
+    p.add_argument("--budget", default=None, help="Time budget for this run (e.g. 900, 15m, 1.5h); riskiest quotes first")
+    p.add_argument("--history", default=".cache/validation-history.json", help="Per-quote validation history used to prioritise --deadline/--budget runs")
+    p.add_argument("--shard", default=None, help="Validate only shard i/N (1-based, stable by source host); combine the reports with merge_shards.py")
+    p.add_argument("--metrics-out", default=None, help="Write run metrics to PATH.prom (Prometheus text file) and PATH.json")
+    p.add_argument("--watch", action="store_true", help="Keep running: revalidate only added/changed quotes whenever a file changes and rewrite --out")
+    p.add_argument("--watch-interval", type=float, default=1.0, help="Seconds between file change checks in --watch mode")
+    add_cassette_args(p)
     args = p.parse_args(argv)
+    cassette = configure_from_args(args)
+    if args.metrics_out:
+        metrics.configure("validate_quotes")
+    fuzzy_parallel.configure(args.fuzzy_workers, threshold=args.min_score)
+    mirrors.configure(args.hedge_after)
+    try:
+        from .doi_resolver import DOI_CACHE_PATH, DoiResolver, use_resolver  # type: ignore
+    except Exception:
+        from doi_resolver import DOI_CACHE_PATH, DoiResolver, use_resolver  # type: ignore
+    resolver = DoiResolver(Path(args.doi_cache) if args.doi_cache else DOI_CACHE_PATH)
+    use_resolver(resolver)
+    delay = 0.0 if cassette is not None and cassette.mode == "replay" else args.delay
+    try:
+        shard = parse_shard(args.shard) if args.shard else None
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    if args.watch:
+        if shard is not None:
+            print("--shard cannot be combined with --watch", file=sys.stderr)
+            return 2
+        try:
+            from .quote_watch import WarmValidator, watch_files  # type: ignore
+        except Exception:
+            from quote_watch import WarmValidator, watch_files  # type: ignore
+        validator = WarmValidator(
+            args.min_score,
+            use_epmc=not args.no_epmc,
+            delay=delay,
+            fetch_concurrency=args.fetch_concurrency,
+            resolver=resolver,
+            resolve_concurrency=args.resolve_concurrency,
+        )
+        return watch_files([Path(f) for f in args.files], Path(args.out), validator, interval=args.watch_interval)
+
+    try:
+        from .validation_schedule import Budget, ValidationHistory, parse_deadline, parse_duration  # type: ignore
+    except Exception:
+        from validation_schedule import Budget, ValidationHistory, parse_deadline, parse_duration  # type: ignore
+    history = ValidationHistory(Path(args.history))
+    scheduled = bool(args.deadline or args.budget)
+    try:
+        budget = Budget(
+            parse_duration(args.budget) if args.budget else None,
+            parse_deadline(args.deadline) if args.deadline else None,
+        )
+        scholar_budget = Budget(parse_duration(args.scholar_budget) if args.scholar_budget else None, budget.ends_at)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
 
     all_results: Dict[str, Any] = {"files": [], "results": []}
+    if shard is not None:
+        all_results["shard"] = {"index": shard[0], "count": shard[1]}
     per_file_quotes: Dict[str, List[QuoteItem]] = {}
     per_file_results: Dict[str, List[Dict[str, Any]]] = {}
+    per_file_pre: Dict[str, Dict[int, ValidationResult]] = {}
+    per_file_positions: Dict[str, List[int]] = {}
+    loaded: List[Tuple[Path, List[QuoteItem]]] = []
     for f in args.files:
         path = Path(f)
         if not path.exists():
             print(f"File not found: {path}", file=sys.stderr)
             return 2
-        quotes = load_quotes(path)
-        per_file_quotes[str(path)] = quotes
+        loaded.append((path, load_quotes(path)))
+    split_hosts: Set[str] = set()
+    if shard is not None:
+        plan, split_hosts = plan_shards([q.source for _, quotes in loaded for q in quotes], shard[1])
+        sizes = [0] * shard[1]
+        for _, quotes in loaded:
+            for q in quotes:
+                sizes[plan[q.source] - 1] += 1
+        print(f"Shard plan (quotes per shard): {', '.join(f'{i + 1}: {n}' for i, n in enumerate(sizes))}")
+        if split_hosts:
+            print(f"Split across shards, with --delay x{shard[1]} per shard: {', '.join(sorted(split_hosts))}")
+        if sizes and max(sizes) > 1.5 * sum(sizes) / len(sizes):
+            print("Warning: the shard plan is unbalanced (single sources with many quotes); fewer shards may do as well", file=sys.stderr)
+        all_results["shard"]["quotes"] = sizes[shard[0] - 1]
+    for path, quotes in loaded:
         all_results["files"].append({"file": str(path), "count": len(quotes)})
-        file_results: List[Dict[str, Any]] = []
-        for q in quotes:
-            res = validate_single(q)
-            # enrich with minimal context
-            entry = asdict(res)
-            entry["quote_text"] = q.quote
-            entry["scientist"] = q.context.get("scientist")
-            entry["peptide_name"] = q.context.get("peptide_name")
-            entry["file"] = str(path)
-            file_results.append(entry)
-            time.sleep(args.delay)
-        per_file_results[str(path)] = file_results
-        all_results["results"].extend(file_results)
-
-    # Optional: Scholar fallback to suggest replacements
-    proposed_per_file: Dict[str, List[Dict[str, Any]]] = {}
+        if shard is not None:
+            # rows keep their position in the file so merge_shards.py can restore the order
+            positions = [i for i, q in enumerate(quotes) if plan[q.source] == shard[0]]
+            per_file_positions[str(path)] = positions
+            quotes = [quotes[i] for i in positions]
+        per_file_quotes[str(path)] = quotes
+        # PMC/PubMed quotes found in their batch-resolved abstract skip the page fetch
+        metadata = {} if args.no_epmc else _resolve_epmc_metadata([q.source for q in quotes])
+        pre_validated: Dict[int, ValidationResult] = {}
+        for i, q in enumerate(quotes):
+            if q.source in metadata:
+                res = validate_from_metadata(q, metadata[q.source], args.min_score)
+                if res is not None:
+                    pre_validated[i] = res
+        per_file_pre[str(path)] = pre_validated
+
+    # Optional: Scholar fallback to suggest replacements, searching for each
+    # failing quote while the rest are still being validated (scholar_fallback.py)
+    fallback = None
     if args.scholar_fallback:
         try:
-            from .scholar_integration import try_scholar_replacements  # type: ignore
+            from .scholar_fallback import ScholarFallback, needs_fallback  # type: ignore
         except Exception:
             try:
-                from scholar_integration import try_scholar_replacements  # type: ignore
+                from scholar_fallback import ScholarFallback, needs_fallback  # type: ignore
             except Exception:
-                try_scholar_replacements = None  # type: ignore
-        if try_scholar_replacements is not None:
-            for file_path, file_results in per_file_results.items():
-                for r in file_results:
-                    low_score = (not r.get("exact_match")) and (r.get("fuzzy_score", 0.0) < args.min_score)
-                    non_ac = (r.get("notes") or "").find("Non-academic") >= 0
-                    if low_score or non_ac:
-                        qtxt = r.get("quote_text", "")
-                        peptide = r.get("peptide_name")
-                        scientist = r.get("scientist")
-                        suggestions = try_scholar_replacements(qtxt, peptide=peptide, scientist=scientist, limit=args.scholar_max)
-                        if suggestions:
-                            r["scholar_suggestions"] = suggestions
-                            proposed_per_file.setdefault(file_path, []).extend(suggestions)
+                ScholarFallback = None  # type: ignore
+        if ScholarFallback is not None:
+            try:
+                from .seen_urls import SeenUrls  # type: ignore
+            except Exception:
+                from seen_urls import SeenUrls  # type: ignore
+            try:
+                from .query_stats import QueryStats  # type: ignore
+            except Exception:
+                from query_stats import QueryStats  # type: ignore
+            # shared with harvest_quotes.py: skip sources rejected on earlier runs,
+            # try the historically most productive query templates first
+            seen_urls = SeenUrls()
+            stats = QueryStats(deterministic=args.deterministic)
+            fallback = ScholarFallback(
+                limit=args.scholar_max, seen_urls=seen_urls, stats=stats,
+                call_timeout=args.scholar_timeout, budget=scholar_budget,
+            )
+
+    def consider_fallback(fp: str, i: int, q: QuoteItem, res: ValidationResult) -> None:
+        if fallback is not None and needs_fallback(res.exact_match, res.fuzzy_score, res.notes, res.status, args.min_score):
+            fallback.submit((fp, i), q.quote, q.context.get("peptide_name"), q.context.get("scientist"))
+
+    for fp, pre_validated in per_file_pre.items():
+        for i, res in pre_validated.items():
+            consider_fallback(fp, i, per_file_quotes[fp][i], res)
+
+    # quotes that need their source downloaded, across all files: (file, index, quote)
+    jobs = [
+        (fp, i, q)
+        for fp, quotes in per_file_quotes.items()
+        for i, q in enumerate(quotes)
+        if i not in per_file_pre[fp]
+    ]
+    if scheduled:
+        # --deadline/--budget: riskiest first (see validation_schedule.py)
+        jobs = history.order(jobs, key=lambda job: (job[2].source, job[2].quote))
+    # follow doi.org redirects for all sources at once; fetches then use the final URLs
+    resolver.resolve_many([q.source for _, _, q in jobs], concurrency=args.resolve_concurrency)
+    to_fetch = [q for _, _, q in jobs]
+    # per-quote fetch durations, measured on the fetch threads: with concurrent
+    # fetches the gaps between results say nothing about a host's speed
+    timings: Dict[Tuple[str, str], float] = {}
+
+    def fetch_job(q: QuoteItem) -> Tuple[Optional[bytes], Optional[str], str]:
+        # a host split across N shards is fetched N times slower on each: same total rate
+        scale = shard[1] if shard is not None and metrics.host_of(q.source) in split_hosts else 1
+        return fetch_quote_source(q, delay=delay * scale, timings=timings, min_score=args.min_score)
+
+    if args.fetch_concurrency > 1:
+        validated = imap(
+            to_fetch,
+            fetch_job,
+            analyze_fetched,
+            fetch_concurrency=args.fetch_concurrency,
+            workers=args.workers,
+        )
+    else:
+        validated = _validate_serial(to_fetch, fetch_job)
+    fetched_results: Dict[Tuple[str, int], ValidationResult] = {}
+    with closing(validated):
+        for fp, i, q in jobs:
+            if budget.spent():
+                break
+            res = next(validated)
+            fetched_results[(fp, i)] = res
+            consider_fallback(fp, i, q, res)
+            history.record(q.source, q.quote, _accepted(res, args.min_score), res.to_dict(), secs=timings.get((q.source, q.quote)))
+    deferred = [(fp, i, q) for fp, i, q in jobs if (fp, i) not in fetched_results]
+    history.deferred = [{"file": fp, "id": q.id, "source": q.source} for fp, i, q in deferred]
+    for fp, i, q in deferred:
+        fetched_results[(fp, i)] = _deferred_result(q, history.last(q.source, q.quote))
+
+    for fp, quotes in per_file_quotes.items():
+        pre_validated = per_file_pre[fp]
+        file_results: List[Dict[str, Any]] = []
+        for i, q in enumerate(quotes):
+            res = pre_validated[i] if i in pre_validated else fetched_results[(fp, i)]
+            if i in pre_validated:
+                history.record(q.source, q.quote, _accepted(res, args.min_score), res.to_dict())
+            entry = report_entry(res, q, Path(fp))
+            if shard is not None:
+                entry["position"] = per_file_positions[fp][i]
+            file_results.append(entry)
+            if res.status == "deferred":
+                # not validated this run: kept out of quotes_validated_total and the per-minute rate
+                metrics.inc("quotes_deferred_total")
+            else:
+                via = "metadata" if i in pre_validated else "fetch"
+                metrics.inc("quotes_validated_total", via=via, outcome="verified" if _accepted(res, args.min_score) else "failed")
+        per_file_results[fp] = file_results
+        all_results["results"].extend(file_results)
+    if scheduled:
+        all_results["deferred"] = history.deferred
+        print(f"Validated {len(jobs) - len(deferred)} of {len(jobs)} fetched quotes; deferred {len(deferred)} (budget spent)" if deferred else f"Validated all {len(jobs)} fetched quotes within the budget")
+    history.save()
+
+    if fallback is not None:
+        suggested = fallback.close()
+        for fp, file_results in per_file_results.items():
+            for i, r in enumerate(file_results):
+                if (fp, i) in suggested:
+                    r["scholar_suggestions"] = [s.to_dict() for s in suggested[(fp, i)]]
+        print(fallback.summary())
+        seen_urls.save()
+        stats.save()
+
+    resolver.save()
+    if args.metrics_out:
+        prom, _ = metrics.write(Path(args.metrics_out))
+        print(f"Wrote metrics to {prom} (+ .json)")
 
     out_path = Path(args.out)
     out_path.write_text(json.dumps(all_results, indent=2), encoding="utf-8")
     print(f"Wrote report to {out_path}")
 
     # Optionally emit filtered high-quality JSON files
-    if args.verified_out_dir:
-        out_dir = Path(args.verified_out_dir)
-        out_dir.mkdir(parents=True, exist_ok=True)
-        # Load original JSONs to preserve metadata
-        for f in args.files:
-            srcp = Path(f)
-            original = json.loads(srcp.read_text(encoding="utf-8"))
-            quotes = original.get("quotes", [])
-            # Join with results
-            file_results = [r for r in all_results["results"] if r.get("file") == str(srcp)]
-            # Decide acceptance criteria
-            verified_quotes = []
-            for q in quotes:
-                rid = q.get("id")
-                rlist = [r for r in file_results if r.get("id") == rid]
-                if not rlist:
-                    continue
-                r = rlist[0]
-                sclass = classify_source(q.get("source", ""), q.get("source_type"))
-                academic = sclass in {"pmc_html","pubmed_html","journal_html","doi_landing","pdf"}
-                non_ac_flag = (r.get("notes") or "").find("Non-academic") >= 0
-                ok = (r.get("exact_match") or 0) or (r.get("fuzzy_score", 0.0) >= args.min_score)
-                if academic and ok and not non_ac_flag:
-                    verified_quotes.append(q)
-            # Rebuild document
-            new_doc = dict(original)
-            new_doc["quotes"] = verified_quotes
-            # Update metadata counts
-            if "metadata" in new_doc and isinstance(new_doc["metadata"], dict):
-                new_doc["metadata"]["total_quotes"] = len(verified_quotes)
-                new_doc["metadata"]["verification_status"] = f"Filtered: {len(verified_quotes)} academically verified quotes"
-            # Write with .verified.json suffix
-            dst = out_dir / (srcp.stem + ".verified.json")
-            dst.write_text(json.dumps(new_doc, indent=2), encoding="utf-8")
-            print(f"Wrote verified JSON: {dst}")
-
-            # Optionally, also write proposed replacements alongside
-            if args.proposed_out_dir:
-                pdir = Path(args.proposed_out_dir)
-                pdir.mkdir(parents=True, exist_ok=True)
-                proposed = proposed_per_file.get(str(srcp), [])
-                proposed_doc = {
-                    "metadata": {
-                        "title": original.get("metadata", {}).get("title", "Proposed Academic Replacements"),
-                        "note": "These are Scholar-proposed candidate quotes for items that failed validation or were non-academic. Review before use."
-                    },
-                    "proposed_quotes": proposed,
-                }
-                dstp = pdir / (srcp.stem + ".verified.proposed.json")
-                dstp.write_text(json.dumps(proposed_doc, indent=2), encoding="utf-8")
-                print(f"Wrote proposed JSON: {dstp}")
+    if shard is not None:
+        if args.verified_out_dir:
+            print("Shard run: .verified.json outputs are written by merge_shards.py once all shards are done")
+    else:
+        write_outputs(all_results, args.files, args.min_score, args.verified_out_dir, args.proposed_out_dir)
     return 0
 
 
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Local quote validation service (asyncio, stdlib only).
+
+Checking one quote with validate_quotes.py means a temp JSON file, a new
+interpreter, every import again and cold caches. This service keeps the
+validator loaded and answers over HTTP on 127.0.0.1 (for content editors
+and the Astro build):
+
+  POST /validate   {"quote": "...", "source": "https://...", "source_type": "...", "id": ...}
+                   -> {"result": {...ValidationResult..., "verified": true}}
+                   {"quotes": [{...}, {...}]}
+                   -> {"results": [{...}, {...}]}   (an invalid item gets {"error": ...})
+  GET  /health     -> {"ok": true, "stats": {...}}
+
+It uses the same halves as validate_quotes.validate_single: fetch_source()
+(DOI resolution, JATS for PMC), source_text() and match_source_text()
+(best_fuzzy_contains, classify_source), and keeps warm (warm_cache.WarmCache,
+shared with watch mode):
+
+  - a document cache: extracted text per source URL (LRU, --doc-cache-size
+    documents, --doc-ttl seconds)
+  - a response cache: results per (quote, source, source_type), expiring
+    with the document they were matched against (--doc-ttl)
+  - in-flight fetches: concurrent requests for the same source URL await
+    one download instead of fetching it again
+
+Failed fetches are not cached. Fetches run on a thread pool limited to
+--fetch-concurrency. "verified" uses --min-score like the batch validator.
+
+Run:
+  python3 scripts/validate_server.py --port 8787
+  curl -s localhost:8787/validate -d '{"quote": "...", "source": "https://pmc.ncbi.nlm.nih.gov/articles/PMC123/"}'
+
+Any local HTTP server can act as a stub publisher (sources are plain URLs),
+e.g. `python3 -m http.server 8765 -d fixtures/` with sources pointing at
+http://127.0.0.1:8765/...; --replay DIR serves sources from a cassette.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from .validate_quotes import (  # type: ignore
+        QuoteItem, ValidationResult, classify_source, fetch_source, match_source_text, source_text,
+    )
+    from .http_cassette import add_cassette_args, configure_from_args  # type: ignore
+    from .doi_resolver import DOI_CACHE_PATH, DoiResolver, use_resolver  # type: ignore
+    from .warm_cache import SourceText, WarmCache, quote_key  # type: ignore
+except Exception:  # when run as a script without package context
+    from validate_quotes import (  # type: ignore
+        QuoteItem, ValidationResult, classify_source, fetch_source, match_source_text, source_text,
+    )
+    from http_cassette import add_cassette_args, configure_from_args  # type: ignore
+    from doi_resolver import DOI_CACHE_PATH, DoiResolver, use_resolver  # type: ignore
+    from warm_cache import SourceText, WarmCache, quote_key  # type: ignore
+
+MAX_BODY = 5 * 1024 * 1024
+MAX_BATCH = 500
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _quote_item(payload: Any) -> QuoteItem:
+    if not isinstance(payload, dict):
+        raise BadRequest("expected an object with 'quote' and 'source'")
+    for name in ("quote", "source", "source_type"):
+        if payload.get(name) is not None and not isinstance(payload[name], str):
+            raise BadRequest(f"'{name}' must be a string")
+    quote = (payload.get("quote") or "").strip()
+    source = (payload.get("source") or "").strip()
+    if not quote or not source:
+        raise BadRequest("'quote' and 'source' are required")
+    context = {k: v for k, v in payload.items() if k not in ("id", "quote", "source")}
+    return QuoteItem(id=payload.get("id"), quote=quote, source=source, context=context)
+
+
+class ValidationService:
+    def __init__(
+        self,
+        min_score: float = 0.9,
+        fetch_concurrency: int = 4,
+        doc_cache_size: int = 256,
+        doc_ttl: float = 3600.0,
+        result_cache_size: int = 4096,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.min_score = min_score
+        # results are stored with the fetch time of the document they were matched against
+        self.cache = WarmCache(doc_size=doc_cache_size, result_size=result_cache_size, ttl=doc_ttl, clock=clock)
+        self.inflight: Dict[str, "asyncio.Future[Any]"] = {}
+        self.pool = ThreadPoolExecutor(max_workers=max(1, fetch_concurrency), thread_name_prefix="fetch")
+        self.stats = {"requests": 0, "quotes": 0, "result_hits": 0, "doc_hits": 0, "fetches": 0, "coalesced": 0, "fetch_errors": 0}
+
+    # --- validation ---------------------------------------------------------
+
+    async def document(self, url: str) -> Tuple[Optional[SourceText], str, float]:
+        """(extracted source text, status, fetch time); concurrent callers for one URL share a single fetch."""
+        hit = self.cache.document(url)
+        if hit is not None:
+            self.stats["doc_hits"] += 1
+            return hit[1], "ok", hit[0]
+        pending = self.inflight.get(url)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+        loop = asyncio.get_running_loop()
+        fut: "asyncio.Future[Any]" = loop.create_future()
+        self.inflight[url] = fut
+        try:
+            self.stats["fetches"] += 1
+            at = self.cache.clock()
+            data, content_type, status = await loop.run_in_executor(self.pool, fetch_source, url)
+            if data is None:
+                self.stats["fetch_errors"] += 1
+                out: Tuple[Optional[SourceText], str, float] = (None, status, at)
+            else:
+                ctype = content_type or ""
+                text, notes = await loop.run_in_executor(self.pool, source_text, data, ctype, classify_source(url, None))
+                self.cache.store_document(url, (text, notes, ctype), at)
+                out = ((text, notes, ctype), status, at)
+            fut.set_result(out)
+            return out
+        except BaseException as e:
+            fut.set_exception(e)
+            fut.exception()  # retrieved here, so waiters alone report it
+            raise
+        finally:
+            del self.inflight[url]
+
+    async def validate(self, q: QuoteItem) -> ValidationResult:
+        self.stats["quotes"] += 1
+        key = quote_key(q)
+        hit = self.cache.result(key)
+        if hit is not None:
+            self.stats["result_hits"] += 1
+            return replace(hit, id=q.id)
+        s_class = classify_source(q.source, q.context.get("source_type"))
+        doc, status, fetched_at = await self.document(q.source)
+        if doc is None:
+            return ValidationResult(
+                id=q.id,
+                source=q.source,
+                source_type=q.context.get("source_type"),
+                exact_match=False,
+                fuzzy_score=0.0,
+                matched_excerpt=None,
+                content_type=None,
+                status=status,
+                notes=f"Could not fetch source ({s_class}).",
+            )
+        text, notes, ctype = doc
+        loop = asyncio.get_running_loop()
+        res = await loop.run_in_executor(self.pool, match_source_text, q, s_class, text, notes, ctype)
+        self.cache.store_result(key, res, fetched_at)
+        return res
+
+    def _result_doc(self, res: ValidationResult) -> Dict[str, Any]:
+        doc = res.to_dict()
+        doc["verified"] = bool(res.exact_match or res.fuzzy_score >= self.min_score)
+        return doc
+
+    async def handle_payload(self, payload: Any) -> Dict[str, Any]:
+        if isinstance(payload, dict) and "quotes" in payload:
+            items = payload["quotes"]
+            if not isinstance(items, list):
+                raise BadRequest("'quotes' must be a list")
+            if len(items) > MAX_BATCH:
+                raise BadRequest(f"at most {MAX_BATCH} quotes per request")
+
+            async def one(item: Any) -> Dict[str, Any]:
+                try:
+                    return self._result_doc(await self.validate(_quote_item(item)))
+                except BadRequest as e:
+                    return {"error": str(e)}
+
+            return {"results": list(await asyncio.gather(*(one(i) for i in items)))}
+        return {"result": self._result_doc(await self.validate(_quote_item(payload)))}
+
+    # --- HTTP ---------------------------------------------------------------
+
+    async def route(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        self.stats["requests"] += 1
+        if path == "/health" and method == "GET":
+            documents, results = self.cache.counts()
+            return 200, {"ok": True, "documents": documents, "results": results, "stats": self.stats}
+        if path == "/validate":
+            if method != "POST":
+                return 405, {"error": "use POST"}
+            try:
+                payload = json.loads(body.decode("utf-8") or "null")
+            except ValueError as e:
+                return 400, {"error": f"invalid JSON: {e}"}
+            try:
+                return 200, await self.handle_payload(payload)
+            except BadRequest as e:
+                return 400, {"error": str(e)}
+        return 404, {"error": "not found"}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            status, doc = await self._read_and_route(reader)
+        except Exception as e:  # pragma: no cover - unexpected failures still get an answer
+            status, doc = 500, {"error": f"{type(e).__name__}: {e}"}
+        data = json.dumps(doc).encode("utf-8")
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large"}.get(status, "Error")
+        head = (
+            f"HTTP/1.1 {status} {reason}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        try:
+            writer.write(head.encode("latin-1") + data)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _read_and_route(self, reader: asyncio.StreamReader) -> Tuple[int, Dict[str, Any]]:
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        parts = request_line.split()
+        if len(parts) < 2:
+            return 400, {"error": "bad request line"}
+        method, target = parts[0].upper(), parts[1]
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            return 400, {"error": "bad Content-Length"}
+        if length > MAX_BODY:
+            return 413, {"error": f"body larger than {MAX_BODY} bytes"}
+        body = await reader.readexactly(length) if length > 0 else b""
+        return await self.route(method, urllib.parse.urlsplit(target).path, body)
+
+
+async def serve(service: ValidationService, host: str, port: int) -> None:
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    addrs = ", ".join(str(s.getsockname()) for s in server.sockets)
+    print(f"Validation service listening on {addrs}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(description="Local quote validation service")
+    p.add_argument("--host", default="127.0.0.1", help="Bind address")
+    p.add_argument("--port", type=int, default=8787, help="Port")
+    p.add_argument("--min-score", type=float, default=0.9, help="Minimum fuzzy score reported as verified if not exact")
+    p.add_argument("--fetch-concurrency", type=int, default=4, help="Concurrent source downloads")
+    p.add_argument("--doc-cache-size", type=int, default=256, help="Extracted source documents kept in memory")
+    p.add_argument("--doc-ttl", type=float, default=3600.0, help="Seconds before a cached source document is fetched again")
+    p.add_argument("--doi-cache", default=str(DOI_CACHE_PATH), help="DOI -> final URL cache")
+    add_cassette_args(p)
+    args = p.parse_args(argv)
+    configure_from_args(args)
+    resolver = DoiResolver(Path(args.doi_cache))
+    use_resolver(resolver)
+    service = ValidationService(
+        min_score=args.min_score,
+        fetch_concurrency=args.fetch_concurrency,
+        doc_cache_size=args.doc_cache_size,
+        doc_ttl=args.doc_ttl,
+    )
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        resolver.save()
+        service.pool.shutdown(wait=False, cancel_futures=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,150 @@
+"""
+Validation history and deadline-aware ordering for validate_quotes.py.
+
+A full validation pass walks the quote files in order; when the nightly
+window ends early, whatever comes last is never checked, however risky.
+ValidationHistory remembers, per quote (hash of source + quote text), when
+it was last validated and with what outcome, plus a moving average of the
+fetch+match time per source host. With --deadline/--budget the quotes that
+need a download are ordered by:
+
+  1. never validated
+  2. failing last time
+  3. oldest result first
+  4. hosts that are usually slow (>= SLOW_HOST_SECS) last within each group
+
+and the run stops starting new quotes once the budget is spent. Quotes that
+were not reached are "deferred": the report carries their previous result
+(status "deferred") so verified outputs do not lose quotes that passed
+before, and the deferred list is kept in the history file for the next run.
+
+History is updated on every run, scheduled or not. State lives in
+.cache/validation-history.json.
+"""
+from __future__ import annotations
+
+import datetime as _dt
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from . import metrics  # type: ignore
+except Exception:  # when run as a script without package context
+    import metrics  # type: ignore
+
+HISTORY_PATH = Path('.cache/validation-history.json')
+SLOW_HOST_SECS = 10.0
+HOST_EWMA = 0.3  # weight of the newest observation in the per-host time average
+
+_DURATION_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smh]?)\s*$", re.I)
+
+
+def parse_duration(text: str) -> float:
+    """Seconds from '900', '900s', '15m' or '1.5h'."""
+    m = _DURATION_RE.match(text or "")
+    if not m:
+        raise ValueError(f"invalid duration: {text!r} (use e.g. 900, 15m, 1.5h)")
+    return float(m.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600}[m.group(2).lower()]
+
+
+def parse_deadline(text: str, now: Optional[_dt.datetime] = None) -> float:
+    """Epoch seconds from 'HH:MM' (next occurrence, local time) or an ISO date-time."""
+    now = now or _dt.datetime.now()
+    m = re.match(r"^\s*(\d{1,2}):(\d{2})\s*$", text or "")
+    if m:
+        at = now.replace(hour=int(m.group(1)), minute=int(m.group(2)), second=0, microsecond=0)
+        if at <= now:
+            at += _dt.timedelta(days=1)
+        return at.timestamp()
+    try:
+        return _dt.datetime.fromisoformat(text.strip()).timestamp()
+    except ValueError:
+        raise ValueError(f"invalid deadline: {text!r} (use HH:MM or an ISO date-time)") from None
+
+
+class Budget:
+    """Wall-clock budget: `seconds` from now and/or an absolute `deadline`, whichever ends first."""
+
+    def __init__(self, seconds: Optional[float] = None, deadline: Optional[float] = None) -> None:
+        ends = [t for t in ((time.time() + seconds) if seconds is not None else None, deadline) if t is not None]
+        self.ends_at = min(ends) if ends else None
+
+    def remaining(self) -> float:
+        return float("inf") if self.ends_at is None else self.ends_at - time.time()
+
+    def spent(self) -> bool:
+        return self.remaining() <= 0
+
+
+def quote_key(source: str, quote: str) -> str:
+    return hashlib.sha1(f"{source}\n{quote}".encode('utf-8')).hexdigest()[:20]
+
+
+class ValidationHistory:
+    def __init__(self, path: Optional[Path] = HISTORY_PATH) -> None:
+        self.path = Path(path) if path is not None else None
+        self.quotes: Dict[str, Dict[str, Any]] = {}
+        self.hosts: Dict[str, Dict[str, float]] = {}
+        self.deferred: List[Dict[str, Any]] = []
+        if self.path is not None and self.path.exists():
+            try:
+                doc = json.loads(self.path.read_text(encoding='utf-8'))
+                self.quotes = doc.get('quotes', {})
+                self.hosts = doc.get('hosts', {})
+            except Exception:
+                pass
+
+    # --- ordering -----------------------------------------------------------
+
+    def host_secs(self, source: str) -> float:
+        return float(self.hosts.get(metrics.host_of(source), {}).get('secs', 0.0))
+
+    def priority(self, source: str, quote: str) -> Tuple[int, int, float, float]:
+        h = self.quotes.get(quote_key(source, quote))
+        secs = self.host_secs(source)
+        slow = 1 if secs >= SLOW_HOST_SECS else 0
+        if h is None:
+            return (0, slow, 0.0, secs)
+        return (1 if not h.get('ok') else 2, slow, float(h.get('at', 0.0)), secs)
+
+    def order(self, items: Sequence[Any], key=lambda q: (q.source, q.quote)) -> List[Any]:
+        """`items` sorted by priority (stable); `key(item)` gives (source, quote text)."""
+        return sorted(items, key=lambda it: self.priority(*key(it)))
+
+    # --- recording ----------------------------------------------------------
+
+    def last(self, source: str, quote: str) -> Optional[Dict[str, Any]]:
+        return self.quotes.get(quote_key(source, quote))
+
+    def record(self, source: str, quote: str, ok: bool, result: Dict[str, Any], secs: Optional[float] = None) -> None:
+        self.quotes[quote_key(source, quote)] = {
+            'at': time.time(),
+            'ok': bool(ok),
+            'exact_match': bool(result.get('exact_match')),
+            'fuzzy_score': result.get('fuzzy_score', 0.0),
+            'status': result.get('status'),
+            'notes': result.get('notes'),
+        }
+        if secs is not None:
+            h = self.hosts.setdefault(metrics.host_of(source), {'secs': secs, 'n': 0})
+            h['secs'] = secs if h['n'] == 0 else (1 - HOST_EWMA) * h['secs'] + HOST_EWMA * secs
+            h['n'] += 1
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        doc = {
+            'quotes': self.quotes,
+            'hosts': self.hosts,
+            'deferred': self.deferred,
+            'updated_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        }
+        tmp = self.path.with_suffix(self.path.suffix + '.tmp')
+        tmp.write_text(json.dumps(doc, indent=1, sort_keys=True), encoding='utf-8')
+        os.replace(tmp, self.path)
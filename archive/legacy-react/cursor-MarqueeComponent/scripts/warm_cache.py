@@ -0,0 +1,102 @@
+"""
+In-memory caches shared by the long-running validators: watch mode
+(quote_watch.py) and the local validation service (validate_server.py).
+
+Both keep the validator loaded between checks and reuse two kinds of work:
+
+  - documents: the extracted text of a fetched source URL (`SourceText`),
+    LRU-bounded, so a quote edited or re-posted against an article already
+    read only costs the fuzzy match
+  - results: ValidationResult per `quote_key` (quote text, source,
+    source_type); the id and the rest of the context do not take part, so
+    a quote that moves within a file or arrives with a new id is a hit
+
+Entries carry the time they were stored (`clock`, time.monotonic by
+default); with a `ttl` they expire that many seconds later. A result can be
+stored with the fetch time of the document it was matched against, so it
+expires together with that document. `doc_size`/`result_size` of None keep
+everything (watch mode prunes results itself, see `drop_result`).
+Not thread-safe: each owner uses it from a single thread or event loop.
+"""
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterator, Optional, Tuple
+
+try:
+    from .validate_quotes import QuoteItem, ValidationResult  # type: ignore
+except Exception:  # when run as a script without package context
+    from validate_quotes import QuoteItem, ValidationResult  # type: ignore
+
+QuoteKey = Tuple[str, str, Optional[str]]
+SourceText = Tuple[str, Optional[str], str]  # (text, extraction notes, content type)
+
+
+def quote_key(q: QuoteItem) -> QuoteKey:
+    return (q.quote, q.source, q.context.get("source_type"))
+
+
+class _Lru:
+    """(stored at, value) per key, oldest first; bounded by `size`, expiring after `ttl` seconds."""
+
+    def __init__(self, size: Optional[int], ttl: Optional[float], clock: Callable[[], float]) -> None:
+        self.size = size
+        self.ttl = ttl
+        self.clock = clock
+        self.entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Tuple[float, Any]]:
+        hit = self.entries.get(key)
+        if hit is None:
+            return None
+        if self.ttl is not None and self.clock() - hit[0] > self.ttl:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return hit
+
+    def put(self, key: Hashable, value: Any, at: Optional[float] = None) -> None:
+        self.entries[key] = (self.clock() if at is None else at, value)
+        self.entries.move_to_end(key)
+        if self.size is not None:
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+
+class WarmCache:
+    def __init__(
+        self,
+        doc_size: Optional[int] = 256,
+        result_size: Optional[int] = None,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.clock = clock
+        self.docs = _Lru(doc_size, ttl, clock)  # url -> SourceText
+        self.results = _Lru(result_size, ttl, clock)  # QuoteKey -> ValidationResult
+
+    def document(self, url: str) -> Optional[Tuple[float, SourceText]]:
+        """(stored at, extracted text) of `url`, or None when absent or expired."""
+        return self.docs.get(url)
+
+    def store_document(self, url: str, doc: SourceText, at: Optional[float] = None) -> None:
+        self.docs.put(url, doc, at)
+
+    def result(self, key: QuoteKey) -> Optional[ValidationResult]:
+        hit = self.results.get(key)
+        return None if hit is None else hit[1]
+
+    def store_result(self, key: QuoteKey, res: ValidationResult, at: Optional[float] = None) -> None:
+        self.results.put(key, res, at)
+
+    def drop_result(self, key: QuoteKey) -> None:
+        self.results.entries.pop(key, None)
+
+    def result_keys(self) -> Iterator[QuoteKey]:
+        return iter(list(self.results.entries))
+
+    def counts(self) -> Tuple[int, int]:
+        """(documents, results) currently held, expired ones included until looked up."""
+        return len(self.docs.entries), len(self.results.entries)
+